@@ -0,0 +1,138 @@
+import copy
+import time
+from collections import OrderedDict
+from functools import partial
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.shortcuts import get_object_or_404
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import datetime_to_epoch
+
+from api.cache import get_version, object_scope
+
+User = get_user_model()
+
+# Поля пользователя, которые токен переносит в подписанных claims.
+PRINCIPAL_CLAIMS = ("username", "role", "is_staff")
+VERSION_CLAIM = "ver"
+ISSUED_AT_CLAIM = "iat"
+# Смена этих полей или удаление пользователя отзывает claims выданных
+# токенов (см. api.signals).
+AUTH_FIELDS = (*PRINCIPAL_CLAIMS, "is_superuser", "is_active")
+
+
+def auth_scope(user_id):
+    return object_scope(User, user_id)
+
+
+def issue_token(user):
+    """Токен доступа с ролью пользователя в claims и версией его прав."""
+    token = AccessToken.for_user(user)
+    for claim in PRINCIPAL_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = get_version(auth_scope(user.pk))
+    token[ISSUED_AT_CLAIM] = datetime_to_epoch(token.current_time)
+    return token
+
+
+def claims_trusted(validated_token):
+    """Можно ли брать права из claims токена с актуальной версией.
+
+    Версии прав в кэше процесса (LocMemCache) сдвигаются только в
+    процессе, изменившем пользователя: остальные процессы до конца жизни
+    токена видели бы старую роль. Поэтому без общего кэша claims
+    принимаются только у токенов моложе AUTH_PRINCIPAL_CACHE_TIMEOUT —
+    того же предела устаревания, что у PrincipalCache.
+    """
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return True
+    issued = validated_token.get(ISSUED_AT_CLAIM)
+    return issued is not None and (
+        time.time() - issued < settings.AUTH_PRINCIPAL_CACHE_TIMEOUT
+    )
+
+
+class PrincipalCache:
+    """LRU пользователей, загруженных из базы, в памяти процесса.
+
+    Ключ включает версию прав пользователя, поэтому смена роли делает
+    запись недоступной сразу. Срок жизни записи ограничивает
+    устаревание, если версии не общие для процессов. Поля, не влияющие
+    на права, у найденного в LRU пользователя могут быть устаревшими,
+    поэтому он помечается principal_only.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key, load):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(key)
+                user = copy.copy(entry[0])
+                user.principal_only = True
+                return user
+        user = load()
+        with self.lock:
+            self.entries[key] = (
+                user, now + settings.AUTH_PRINCIPAL_CACHE_TIMEOUT
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_PRINCIPAL_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return copy.copy(user)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+principals = PrincipalCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без чтения пользователя из базы.
+
+    Если версия прав в токене совпадает с текущей и claims_trusted
+    разрешает им верить, пользователь собирается из claims токена без
+    остальных полей (principal_only). Иначе — токен выдан до смены роли,
+    удаления или блокировки, без claims или слишком давно для кэша
+    процесса — пользователь читается из базы через PrincipalCache, и
+    роль берётся оттуда.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        version = get_version(auth_scope(user_id))
+        if validated_token.get(VERSION_CLAIM) == version and (
+            claims_trusted(validated_token)
+        ):
+            user = User(
+                is_active=True,
+                **{api_settings.USER_ID_FIELD: user_id},
+                **{claim: validated_token[claim]
+                   for claim in PRINCIPAL_CLAIMS},
+            )
+            user.principal_only = True
+            return user
+        return principals.get(
+            (user_id, version), partial(super().get_user, validated_token)
+        )
+
+
+def current_user(request):
+    """Пользователь запроса со всеми актуальными полями из базы."""
+    if getattr(request.user, "principal_only", False):
+        return get_object_or_404(User, pk=request.user.pk)
+    return request.user
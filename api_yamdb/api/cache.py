@@ -0,0 +1,118 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = "yamdb:version:{}"
+# Меняется при смене или удалении имени пользователя, которое выводится
+# в поле author отзывов и комментариев.
+USERNAME_SCOPE = "reviews.user:username"
+
+
+def model_scope(model):
+    return model._meta.label_lower
+
+
+def get_version(scope):
+    """Возвращает текущую версию данных области scope.
+
+    Отсутствующая в кэше версия инициализируется текущим временем, чтобы
+    после очистки кэша не совпасть ни с одной из выданных ранее.
+    """
+    key = VERSION_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*scopes):
+    keys = {VERSION_KEY.format(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    return tuple(
+        found[key] if key in found else get_version(scope)
+        for key, scope in keys.items()
+    )
+
+
+def bump_versions(*scopes):
+    """Сбрасывает всё закэшированное для перечисленных областей."""
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def object_scope(model, pk):
+    return f"{model_scope(model)}:{pk}"
+
+
+RESPONSE_KEY = "yamdb:response:{}:{}"
+RESPONSE_STATS_KEY = "yamdb:response-cache:{}"
+RESPONSE_STATS = ("hits", "misses")
+
+
+def normalize_query(request, ignored=()):
+    return urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        if key not in ignored
+        for value in values
+    ))
+
+
+def count_response(outcome):
+    key = RESPONSE_STATS_KEY.format(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_response_stats():
+    keys = {RESPONSE_STATS_KEY.format(name): name for name in RESPONSE_STATS}
+    found = cache.get_many(keys)
+    return {name: found.get(key, 0) for key, name in keys.items()}
+
+
+def reset_response_stats():
+    cache.delete_many(
+        [RESPONSE_STATS_KEY.format(name) for name in RESPONSE_STATS]
+    )
+
+
+def cached_response(request, scopes, respond):
+    """Отдаёт данные ответа из кэша или вызывает respond и кэширует их.
+
+    Ключ строится из версий scopes, хоста, пути и отсортированных
+    параметров запроса, поэтому запись в любую из областей делает
+    старые ответы недостижимыми без явного удаления.
+    """
+    location = hashlib.md5(
+        f"{request.get_host()}{request.path}?{normalize_query(request)}"
+        .encode()
+    ).hexdigest()
+    key = RESPONSE_KEY.format(
+        ":".join(str(version) for version in get_versions(*scopes)),
+        location,
+    )
+    data = cache.get(key)
+    if data is not None:
+        count_response("hits")
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return response
+    count_response("misses")
+    response = respond()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+    response["X-Cache"] = "MISS"
+    return response
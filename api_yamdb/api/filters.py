@@ -1,13 +1,111 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.models import Category, Title
+from reviews.search import search_titles
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+
+
+class AliasOrderingFilter(OrderingFilter):
+    """``?ordering=`` с публичными именами полей ответа.
+
+    ``ordering_aliases`` вьюсета сопоставляет имя поля ответа столбцу
+    модели. К выбранной сортировке добавляется id, чтобы страницы не
+    перемешивались на равных значениях, а столбцы сортировки дочитываются
+    в queryset с ``only()``: по ним строится курсор.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering or request.query_params.get(
+            self.ordering_param
+        ) is None:
+            return ordering
+        aliases = getattr(view, 'ordering_aliases', {})
+        columns = []
+        for term in ordering:
+            name = term.lstrip('-')
+            columns.append(term[:-len(name)] + aliases.get(name, name))
+        if not any(term.lstrip('-') in ('id', 'pk') for term in columns):
+            columns.append('id')
+        return columns
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = super().filter_queryset(request, queryset, view)
+        names, deferred = queryset.query.deferred_loading
+        if names and not deferred:
+            queryset = queryset.only(*names, *(
+                term.lstrip('-') for term in queryset.query.order_by
+            ))
+        return queryset
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Список значений через запятую: ``?genre=drama,comedy``."""
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=((MATCH_ANY, 'Любой из жанров'), (MATCH_ALL, 'Все жанры')),
+        method='filter_genre_match',
+    )
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_category(self, queryset, name, value):
+        slugs = list(dict.fromkeys(slug for slug in value if slug))
+        if not slugs:
+            return queryset
+        if len(slugs) == 1:
+            # Равенство по category_id сохраняет порядок индекса
+            # title_category_year_name_idx и обходится без сортировки.
+            return queryset.filter(category__slug=slugs[0])
+        # Список категорий проверяется через EXISTS: выбор по индексу
+        # category_id с последующей сортировкой всей выборки дороже обхода
+        # индекса сортировки.
+        return queryset.filter(
+            Exists(
+                Category.objects.filter(
+                    pk=OuterRef('category_id'), slug__in=slugs
+                )
+            )
+        )
+
+    def filter_genre(self, queryset, name, value):
+        # EXISTS вместо JOIN: произведения выбираются по индексу сортировки,
+        # промежуточная таблица проверяется точечно и строки не дублируются.
+        slugs = list(dict.fromkeys(slug for slug in value if slug))
+        if not slugs:
+            return queryset
+        if self.form.cleaned_data.get('genre_match') == MATCH_ALL:
+            groups = [[slug] for slug in slugs]
+        else:
+            groups = [slugs]
+        for group in groups:
+            queryset = queryset.filter(
+                Exists(
+                    Title.genre.through.objects.filter(
+                        title=OuterRef('pk'), genre__slug__in=group
+                    )
+                )
+            )
+        return queryset
+
+    def filter_genre_match(self, queryset, name, value):
+        # Учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,85 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+USERNAME = "username"
+IP = "ip"
+
+KEY = "yamdb:lockout:{}:{}"
+LOCKED = "Слишком много неверных кодов подтверждения."
+
+
+def attempt_keys(request):
+    """Ключи счётчиков неверных попыток: по IP-адресу и, если он есть в
+    запросе, по имени пользователя.
+
+    Имя берётся из тела запроса до проверки сериализатором, поэтому в
+    ключ попадает его хэш: ключ остаётся коротким и без пробелов и
+    управляющих символов при любом присланном имени.
+    """
+    keys = {IP: KEY.format(IP, BaseThrottle().get_ident(request))}
+    data = request.data
+    username = data.get(USERNAME) if hasattr(data, "get") else None
+    if isinstance(username, str) and username:
+        keys[USERNAME] = KEY.format(
+            USERNAME, hashlib.md5(username.encode()).hexdigest()
+        )
+    return keys
+
+
+def lockout_delay(scope, failures):
+    """Блокировка после failures неверных попыток: с порога области она
+    удваивается на каждую следующую попытку до AUTH_LOCKOUT_MAX_DELAY."""
+    extra = failures - settings.AUTH_LOCKOUT_FAILURES[scope]
+    if extra < 0:
+        return 0
+    return min(
+        settings.AUTH_LOCKOUT_BASE_DELAY * 2 ** extra,
+        settings.AUTH_LOCKOUT_MAX_DELAY,
+    )
+
+
+def check_attempts(keys):
+    """Отклоняет запрос со статусом 429, пока заблокирован любой из
+    ключей. Стоит одно чтение кэша и не обращается к базе."""
+    cache = caches[settings.AUTH_LOCKOUT_CACHE]
+    now = time.time()
+    wait = max(
+        (until - now for _, until in cache.get_many(keys.values()).values()),
+        default=0,
+    )
+    if wait > 0:
+        raise Throttled(wait, detail=LOCKED)
+
+
+def record_failure(keys):
+    """Учитывает неверную попытку.
+
+    Счётчик живёт AUTH_LOCKOUT_WINDOW секунд после конца блокировки.
+    Как и в api.throttling.CacheBucketStore, чтение и запись — отдельные
+    операции кэша, поэтому при одновременных попытках с одним ключом
+    часть из них может не учесться.
+    """
+    cache = caches[settings.AUTH_LOCKOUT_CACHE]
+    now = time.time()
+    entries = cache.get_many(keys.values())
+    for scope, key in keys.items():
+        failures = entries.get(key, (0, now))[0] + 1
+        delay = lockout_delay(scope, failures)
+        cache.set(
+            key,
+            (failures, now + delay),
+            timeout=delay + settings.AUTH_LOCKOUT_WINDOW,
+        )
+
+
+def reset_attempts(keys):
+    """Сбрасывает счётчик пользователя после верного кода. Счётчик IP
+    остаётся: иначе перебор можно было бы прерывать входом в свой
+    аккаунт."""
+    if USERNAME in keys:
+        caches[settings.AUTH_LOCKOUT_CACHE].delete(keys[USERNAME])
@@ -0,0 +1,127 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from reviews.search import TOKEN
+
+User = get_user_model()
+
+ENDPOINTS = (
+    "/api/v1/categories/",
+    "/api/v1/genres/",
+    "/api/v1/users/",
+    "/api/v1/titles/",
+    "/api/v1/titles/?cursor=",
+    "/api/v1/titles/?year={year}",
+    "/api/v1/titles/?genre={genre}",
+    "/api/v1/titles/?category={category}",
+    "/api/v1/titles/?category={category},{category}-other",
+    "/api/v1/titles/?genre={genre},{genre}-other",
+    "/api/v1/titles/?genre={genre},{genre}-other&genre_match=all",
+    "/api/v1/titles/?year_min={year}&year_max={year}&rating_min=1",
+    "/api/v1/titles/?include=reviews",
+    "/api/v1/titles/?ordering=-reviews_count",
+    "/api/v1/titles/?ordering=-reviews_count&cursor=",
+    "/api/v1/titles/{title_id}/",
+    "/api/v1/titles/{title_id}/?include=reviews&reviews_limit=5",
+    "/api/v1/titles/{title_id}/reviews/",
+    "/api/v1/titles/{title_id}/reviews/?cursor=",
+    "/api/v1/titles/{title_id}/reviews/?ordering=-comments_count",
+    "/api/v1/titles/{title_id}/reviews/{review_id}/",
+    "/api/v1/titles/{title_id}/reviews/{review_id}/comments/",
+    "/api/v1/titles/{title_id}/reviews/{review_id}/comments/?cursor=",
+    "/api/v1/export/reviews/?title={title_id}",
+    "/api/v1/users/{username}/reviews/",
+    "/api/v1/moderation/reviews/?search={word}",
+)
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?\S+(?: AS \S+)?$")
+TEMP_SORT = "USE TEMP B-TREE"
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет EXPLAIN QUERY PLAN для SQL-запросов основных эндпоинтов "
+        "и завершается ошибкой при полном сканировании таблицы или "
+        "сортировке во временном B-дереве."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Печатать планы всех запросов, а не только проблемных.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Команда поддерживает только SQLite.")
+        client = APIClient()
+        client.force_authenticate(User(username="plan-checker",
+                                       role=User.ADMIN))
+        context = self.get_url_context()
+        problems = 0
+        for template in ENDPOINTS:
+            try:
+                url = template.format(**context)
+            except KeyError:
+                self.stdout.write(f"SKIP {template}: нет данных")
+                continue
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+            if response.status_code != 200:
+                raise CommandError(f"{url}: статус {response.status_code}")
+            for query in queries.captured_queries:
+                problems += self.check_query(
+                    url, query["sql"], options["verbose_plans"]
+                )
+        if problems:
+            raise CommandError(f"Проблемных планов: {problems}")
+        self.stdout.write(self.style.SUCCESS("Все планы используют индексы."))
+
+    def get_url_context(self):
+        context = {}
+        title = Title.objects.select_related("category").first()
+        if title is not None:
+            context["title_id"] = title.pk
+            context["year"] = title.year
+            if title.category is not None:
+                context["category"] = title.category.slug
+            genre = title.genre.first()
+            if genre is not None:
+                context["genre"] = genre.slug
+        review = Review.objects.filter(Comment__isnull=False).first()
+        review = review or Review.objects.first()
+        if review is not None:
+            context["title_id"] = review.title_id
+            context["review_id"] = review.pk
+            context["username"] = review.author.username
+            word = TOKEN.search(review.text)
+            if word is not None:
+                context["word"] = word.group()
+        return context
+
+    def check_query(self, url, sql, verbose):
+        if not sql.lstrip().upper().startswith("SELECT"):
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            plan = [row[-1] for row in cursor.fetchall()]
+        bad = [
+            step for step in plan
+            if FULL_SCAN.match(step) or step.startswith(TEMP_SORT)
+        ]
+        if bad or verbose:
+            style = self.style.ERROR if bad else self.style.SUCCESS
+            self.stdout.write(style(f"{'FAIL' if bad else 'OK'} {url}"))
+            self.stdout.write(f"  {sql}")
+            for step in plan:
+                self.stdout.write(f"    {step}")
+        return int(bool(bad))
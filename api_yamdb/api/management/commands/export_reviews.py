@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_FORMATS, NDJSON, iter_records, stream_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает отзывы и комментарии к ним в NDJSON или CSV "
+        "без загрузки всей выборки в память."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default=NDJSON,
+        )
+        parser.add_argument(
+            "--title",
+            type=int,
+            help="Выгрузить только отзывы на произведение с этим id.",
+        )
+        parser.add_argument(
+            "--category",
+            help="Выгрузить только отзывы на произведения категории.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для выгрузки; по умолчанию стандартный вывод.",
+        )
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        records = iter_records(
+            title_id=options["title"],
+            category=options["category"],
+            chunk_size=options["chunk_size"],
+        )
+        chunks = stream_export(
+            records, options["format"], options["chunk_size"]
+        )
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8",
+                  newline="") as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import get_response_stats, reset_response_stats
+
+
+class Command(BaseCommand):
+    help = "Показывает счётчики попаданий и промахов кэша ответов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Обнулить счётчики после вывода.",
+        )
+
+    def handle(self, *args, **options):
+        stats = get_response_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"hit_ratio={ratio:.2%}"
+        )
+        if options["reset"]:
+            reset_response_stats()
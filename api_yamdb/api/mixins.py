@@ -1,6 +1,257 @@
+import hashlib
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist
+from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from api.cache import cached_response, get_versions, normalize_query
 from reviews.validators import user_name, username_is_not_forbidden
 
 
 class UsernameMixin:
     def validate_username(self, username):
         return user_name(username_is_not_forbidden(username))
+
+
+class IncludeMixin:
+    """Разбирает ``?include=`` — дополнительные блоки ответа через запятую.
+
+    Допустимые значения перечисляются в ``include_options``, выбранные
+    передаются сериализатору в контексте под ключом ``include``.
+    """
+
+    include_query_param = "include"
+    include_options = ()
+
+    def get_includes(self):
+        if not hasattr(self, "_includes"):
+            value = self.request.query_params.get(self.include_query_param, "")
+            includes = {name for name in value.split(",") if name}
+            unknown = includes.difference(self.include_options)
+            if unknown:
+                raise ValidationError({
+                    self.include_query_param: (
+                        "Допустимые значения: "
+                        f"{', '.join(self.include_options)}."
+                    )
+                })
+            self._includes = includes
+        return self._includes
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include"] = self.get_includes()
+        return context
+
+
+def split_param(value):
+    return {name for name in (value or "").split(",") if name}
+
+
+class SparseFieldsMixin:
+    """``?fields=`` и ``?omit=`` для list/retrieve.
+
+    Ответ сокращается до перечисленных полей сериализатора (или до всех,
+    кроме перечисленных), а queryset читает только нужные столбцы.
+    ``sparse_field_columns`` сопоставляет полю ответа пути для ``only()``;
+    поле без записи читается из одноимённого столбца. Лишние
+    select_related и prefetch_related вьюсет убирает сам, проверяя
+    ``wants_field``.
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    sparse_actions = ("list", "retrieve")
+    sparse_field_columns = {}
+
+    def get_sparse_fields(self):
+        """Возвращает кортеж выбранных полей или None без параметров."""
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+        self._sparse_fields = None
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        requested = split_param(params.get(self.fields_query_param))
+        omitted = split_param(params.get(self.omit_query_param))
+        if not requested and not omitted:
+            return None
+        available = tuple(self.get_serializer_class()().fields)
+        for param, names in (
+            (self.fields_query_param, requested),
+            (self.omit_query_param, omitted),
+        ):
+            unknown = names.difference(available)
+            if unknown:
+                raise ValidationError({
+                    param: f"Неизвестные поля: {', '.join(sorted(unknown))}."
+                })
+        self._sparse_fields = tuple(
+            name for name in available
+            if (not requested or name in requested) and name not in omitted
+        )
+        return self._sparse_fields
+
+    def wants_field(self, name):
+        fields = self.get_sparse_fields()
+        return fields is None or name in fields
+
+    def get_sparse_columns(self, queryset):
+        """Столбцы для выбранных полей, первичного ключа и сортировки."""
+        opts = queryset.model._meta
+        columns = [opts.pk.name]
+        for name in queryset.query.order_by or opts.ordering:
+            if not isinstance(name, str):
+                continue
+            try:
+                columns.append(opts.get_field(name.lstrip("-")).name)
+            except FieldDoesNotExist:
+                continue
+        for name in self.get_sparse_fields():
+            columns.extend(self.sparse_field_columns.get(name, (name,)))
+        return tuple(dict.fromkeys(columns))
+
+    def only_sparse_columns(self, queryset):
+        if self.get_sparse_fields() is None:
+            return queryset
+        return queryset.only(*self.get_sparse_columns(queryset))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
+
+
+class NestedParentMixin:
+    """Родитель вложенного маршрута, загружаемый не больше раза за запрос.
+
+    ``get_parent_queryset`` описывает родителя одним запросом, который
+    заодно проверяет всю цепочку URL, например что отзыв относится
+    к произведению. Родитель нужен списку (404 для несуществующего) и
+    созданию, где он передаётся сериализатору в контексте под ключом
+    ``parent_context_name``. Детальные действия фильтруют объект по
+    цепочке в том же запросе и родителя не загружают.
+    """
+
+    parent_context_name = None
+
+    def get_parent_queryset(self):
+        raise NotImplementedError
+
+    def get_parent(self):
+        if not hasattr(self, "_parent"):
+            self._parent = get_object_or_404(self.get_parent_queryset())
+        return self._parent
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "create":
+            context[self.parent_context_name] = self.get_parent()
+        return context
+
+
+class SparseSerializerMixin:
+    """Убирает из сериализатора поля, не выбранные ``?fields=``/``?omit=``
+    (см. SparseFieldsMixin)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in set(self.fields).difference(fields):
+                self.fields.pop(name)
+
+
+class NotModified(Exception):
+    pass
+
+
+class ConditionalGetMixin:
+    """Строгие ETag для list/retrieve на основе версий данных.
+
+    Вьюсет описывает, от каких областей зависит ответ, в методе
+    ``get_version_scopes``. Совпавший ``If-None-Match`` проверяется сразу
+    после аутентификации и прав доступа и возвращает 304 до выполнения
+    основного запроса и сериализации. ``If-None-Match: *`` даёт 304 только
+    найденному ресурсу, поэтому проверяется по готовому ответу.
+    """
+
+    etag_actions = ("list", "retrieve")
+
+    def get_version_scopes(self):
+        raise NotImplementedError
+
+    def get_etag(self, request):
+        versions = ":".join(
+            str(version) for version in get_versions(
+                *self.get_version_scopes()
+            )
+        )
+        digest = hashlib.sha1(
+            f"{request.path}?{normalize_query(request)}|"
+            f"{request.accepted_renderer.format}|{versions}".encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method not in ("GET", "HEAD"):
+            return
+        if self.action not in self.etag_actions:
+            return
+        self.etag = self.get_etag(request)
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and self.etag in parse_etags(if_none_match):
+            raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": self.etag},
+            )
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            getattr(self, "etag", None)
+            and response.status_code == status.HTTP_200_OK
+            and request.META.get("HTTP_IF_NONE_MATCH", "").strip() == "*"
+        ):
+            # «*» совпадает только с существующим представлением, а о нём
+            # говорит лишь ответ 200: до запроса родитель или объект мог
+            # не найтись.
+            response = self.handle_exception(NotModified())
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            getattr(self, "etag", None)
+            and response.status_code == status.HTTP_200_OK
+        ):
+            response["ETag"] = self.etag
+        return response
+
+
+class CachedResponseMixin:
+    """Кэширует данные ответов list/retrieve по версиям из
+    ``get_version_scopes``."""
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request,
+            self.get_version_scopes(),
+            partial(super().list, request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request,
+            self.get_version_scopes(),
+            partial(super().retrieve, request, *args, **kwargs),
+        )
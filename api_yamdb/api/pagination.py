@@ -0,0 +1,303 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial, reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.cache import get_version, model_scope, normalize_query
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_NONE)
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """Paginator, берущий общее количество объектов из кэша."""
+
+    def __init__(self, *args, cache_key, timeout, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.cache_key, count, self.timeout)
+        return count
+
+
+class CountlessPage:
+    """Страница без общего количества: наличие следующей страницы
+    определяется по лишней строке выборки."""
+
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по сортировке queryset с добавлением id.
+
+    Позиция кодируется значениями всех полей сортировки последнего
+    (или первого) объекта страницы, поэтому выборка любой страницы
+    сводится к поиску по индексу без OFFSET и без COUNT(*).
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fields = self.get_ordering_fields(queryset)
+        position, self.reverse = self.decode_cursor(request)
+        ordering = [
+            ("-" if descending != self.reverse else "") + field.attname
+            for field, descending in self.fields
+        ]
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+        page = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if self.reverse:
+            page.reverse()
+        self.has_next = has_more if not self.reverse else True
+        self.has_previous = position is not None and (
+            has_more if self.reverse else True
+        )
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def unsupported_ordering(self, ordering):
+        # Запрос корректен, но курсор по вычисляемому значению (например,
+        # релевантности поиска) не строится: клиенту нужен ?page=.
+        return ValidationError({
+            self.cursor_query_param: (
+                f"Курсорная пагинация не поддерживает {ordering}; "
+                "используйте постраничную пагинацию (?page=)."
+            )
+        })
+
+    def get_ordering_fields(self, queryset):
+        opts = queryset.model._meta
+        fields = []
+        for name in queryset.query.order_by or opts.ordering:
+            if not isinstance(name, str):
+                raise self.unsupported_ordering("эту сортировку")
+            descending = name.startswith("-")
+            name = name.lstrip("-")
+            try:
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except FieldDoesNotExist:
+                raise self.unsupported_ordering(f"сортировку по {name}")
+            fields.append((field, descending))
+        if all(field != opts.pk for field, _ in fields):
+            fields.append((opts.pk, False))
+        return fields
+
+    def position_filter(self, position):
+        """Строит условие «строго после позиции» в текущем направлении."""
+        conditions = []
+        for index, (field, descending) in enumerate(self.fields):
+            lookup = "lt" if descending != self.reverse else "gt"
+            condition = {
+                previous.attname: value
+                for (previous, _), value in zip(
+                    self.fields[:index], position
+                )
+            }
+            condition[f"{field.attname}__{lookup}"] = position[index]
+            conditions.append(Q(**condition))
+        first_field, descending = self.fields[0]
+        lookup = "lte" if descending != self.reverse else "gte"
+        return Q(**{f"{first_field.attname}__{lookup}": position[0]}) & (
+            reduce(or_, conditions)
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+            )
+            values = payload["p"]
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                field.to_python(value)
+                for (field, _), value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError,
+                DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get("r"))
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for field, _ in self.fields:
+            if isinstance(instance, dict):
+                value = instance[field.attname]
+            else:
+                value = getattr(instance, field.attname)
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            values.append(value)
+        payload = {"p": values}
+        if reverse:
+            payload["r"] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, ensure_ascii=False).encode()
+        ).decode("ascii")
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class YamdbPagination(PageNumberPagination):
+    """Постраничная пагинация с переключением в курсорный режим.
+
+    По умолчанию работает как ``PageNumberPagination``; при наличии
+    параметра ``?cursor=`` (в том числе пустого) страницы выбираются
+    через ``KeysetPagination``.
+
+    Способ подсчёта ``count`` задаётся атрибутом вьюсета
+    ``pagination_count_mode`` или параметром ``?count=``:
+    ``exact`` — COUNT(*) на каждый запрос, ``cached`` — значение из кэша
+    с коротким временем жизни, ``none`` — без подсчёта, наличие
+    следующей страницы определяется по page_size + 1 строкам.
+    """
+
+    keyset_class = KeysetPagination
+    count_query_param = "count"
+    default_count_mode = COUNT_EXACT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.count_mode = self.get_count_mode(request, view)
+        if self.count_mode == COUNT_NONE:
+            return self.paginate_without_count(queryset, request)
+        if self.count_mode == COUNT_CACHED:
+            self.django_paginator_class = partial(
+                CachedCountPaginator,
+                cache_key=self.get_count_cache_key(queryset, request),
+                timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT,
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_mode(self, request, view):
+        mode = request.query_params.get(
+            self.count_query_param,
+            getattr(view, "pagination_count_mode", self.default_count_mode),
+        )
+        if mode not in COUNT_MODES:
+            raise ValidationError({
+                self.count_query_param: (
+                    f"Допустимые значения: {', '.join(COUNT_MODES)}."
+                )
+            })
+        return mode
+
+    def get_count_cache_key(self, queryset, request):
+        ignored = (
+            self.page_query_param,
+            self.count_query_param,
+            self.keyset_class.cursor_query_param,
+        )
+        # Путь и запрос хэшируются: ключ остаётся коротким и без пробелов
+        # при любой длине строки запроса.
+        location = hashlib.md5(
+            f"{request.path}?{normalize_query(request, ignored)}".encode()
+        ).hexdigest()
+        scope = model_scope(queryset.model)
+        return "yamdb:count:{}:{}:{}".format(
+            scope, get_version(scope), location
+        )
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+            if number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and number > 1:
+            raise NotFound(self.invalid_page_message)
+        self.page = CountlessPage(
+            rows[:page_size], number, len(rows) > page_size
+        )
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.count_mode == COUNT_NONE:
+            return Response(OrderedDict([
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]))
+        return super().get_paginated_response(data)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import JSONParser
+
+
+class RequestTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Тело запроса больше {limit} байт."
+    default_code = "request_too_large"
+
+    def __init__(self, limit):
+        super().__init__(self.default_detail.format(limit=limit))
+
+
+class LimitedJSONParser(JSONParser):
+    """JSONParser, который отклоняет тело больше max_size_setting байт.
+
+    Django сверяет размер с DATA_UPLOAD_MAX_MEMORY_SIZE только при чтении
+    request.body и форм, а DRF разбирает JSON прямо из потока запроса,
+    поэтому предел проверяется здесь по заголовку Content-Length.
+    """
+
+    max_size_setting = "DATA_UPLOAD_MAX_MEMORY_SIZE"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        limit = getattr(settings, self.max_size_setting)
+        meta = parser_context["request"].META
+        if limit is not None and int(meta.get("CONTENT_LENGTH") or 0) > limit:
+            raise RequestTooLarge(limit)
+        return super().parse(stream, media_type, parser_context)
+
+
+class BulkJSONParser(LimitedJSONParser):
+    """Парсер пакетной загрузки со своим, большим пределом размера."""
+
+    max_size_setting = "TITLE_BULK_MAX_BODY_SIZE"
@@ -9,6 +9,14 @@ class IsAdmin(permissions.IsAdminUser):
         )
 
 
+class IsAdminOrModerator(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (request.user.is_moderator or request.user.is_admin)
+        )
+
+
 class IsOwnerAdminModeratorOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
     def has_object_permission(self, request, view, obj):
         return (
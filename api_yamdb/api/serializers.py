@@ -1,13 +1,17 @@
 import re
+from operator import itemgetter
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import IntegrityError, connection, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import get_object_or_404
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 
-from .mixins import UsernameMixin
+from .mixins import SparseSerializerMixin, UsernameMixin
+from reviews.moderation import ACTIONS
+from reviews.search import highlight_snippet
 from reviews.validators import validate_confirmation_code
 from reviews.models import (
     Category,
@@ -20,7 +24,7 @@ from reviews.models import (
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -40,10 +44,6 @@ class GetTokenSerializer(serializers.Serializer, UsernameMixin):
     )
 
     def validate_confirmation_code(self, pin_code):
-        if pin_code == settings.DEFAULT_CONF_CODE:
-            raise ValidationError(
-                "Ошибка. Сначала получите код подтверждения."
-            )
         invalid_chars = re.findall(
             rf"'{re.escape(settings.PATTERN)}\s'",
             pin_code
@@ -71,7 +71,9 @@ class NotAdminSerializer(serializers.ModelSerializer, UsernameMixin):
         read_only_fields = ("role",)
 
 
-class ReviewSerializer(serializers.ModelSerializer, UsernameMixin):
+class ReviewSerializer(
+    SparseSerializerMixin, serializers.ModelSerializer, UsernameMixin
+):
     """Класс сериализатор для модели Review."""
 
     author = serializers.SlugRelatedField(
@@ -80,24 +82,47 @@ class ReviewSerializer(serializers.ModelSerializer, UsernameMixin):
         read_only=True
     )
 
-    def validate(self, data):
-        request = self.context["request"]
-        if request.method != "POST":
-            return data
-        if Review.objects.filter(
-            title=get_object_or_404(
-                Title, pk=self.context["view"].kwargs.get("title_id")
-            ),
-            author=request.user,
-        ).exists():
-            raise ValidationError(
-                "Вы не можете добавить более" "одного отзыва на произведение"
-            )
-        return data
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_author_title,
+        # а не отдельный запрос перед вставкой. После ошибки запрос в
+        # режиме autocommit проверяет, что нарушено именно это ограничение;
+        # остальные ошибки целостности не выдаются за повторный отзыв.
+        title = self.context["title"]
+        try:
+            return super().create({**validated_data, "title": title})
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=title, author=validated_data["author"]
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    "Вы не можете добавить более одного отзыва "
+                    "на произведение"
+                ]
+            })
 
     class Meta:
         model = Review
-        fields = ("id", "text", "author", "score", "pub_date")
+        fields = (
+            "id", "text", "author", "score", "pub_date", "comments_count"
+        )
+
+
+class ReviewTitleSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Title
+        fields = ("id", "name", "year")
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв в ленте пользователя вместе с произведением."""
+
+    title = ReviewTitleSerializer(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ("title",)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -118,17 +143,39 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = "slug"
 
 
-class TitleSerializer(serializers.ModelSerializer):
+def represent_histogram(histogram):
+    return {str(score): count for score, count in enumerate(histogram, 1)}
+
+
+class TitleSerializer(SparseSerializerMixin, serializers.ModelSerializer):
     """Класс сериализатор для модели Title."""
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
+    reviews_count = serializers.IntegerField(
+        source="rating_count", read_only=True
+    )
 
     class Meta:
         model = Title
         fields = ("id", "name", "year", "description",
-                  "genre", "category", "rating")
+                  "genre", "category", "rating", "reviews_count")
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Жанры предзагружаются без ORDER BY, чтобы не сортировать их
+        # во временном B-дереве; порядок по имени восстанавливается здесь.
+        if "genre" in data:
+            data["genre"] = sorted(data["genre"], key=itemgetter("name"))
+        include = self.context.get("include", ())
+        if "histogram" in include:
+            data["histogram"] = represent_histogram(instance.score_histogram)
+        if "reviews" in include:
+            data["reviews"] = self.context["embedded_reviews"].get(
+                instance.pk, []
+            )
+        return data
 
 
 class CreateTitleSerializer(serializers.ModelSerializer):
@@ -146,7 +193,128 @@ class CreateTitleSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "year", "description", "genre", "category")
 
 
-class CommentSerializer(serializers.ModelSerializer):
+def fill_bulk_created_ids(titles):
+    """Проставляет id произведениям после bulk_create на SQLite.
+
+    SQLite в Django 3.2 не возвращает id из пакетной вставки. Вставка
+    захватывает блокировку записи до конца транзакции, а AUTOINCREMENT
+    выдаёт id больше всех существующих, поэтому созданные строки — последние
+    по id. Они перечитываются и сверяются с произведениями по полям, так что
+    пропуски в id не важны; при расхождении транзакция откатывается.
+    """
+    fields = ("name", "year", "description", "category_id")
+    rows = Title.objects.order_by("-pk").values_list("pk", *fields)
+    rows = list(rows[:len(titles)])[::-1]
+    if len(rows) != len(titles):
+        raise IntegrityError("Не найдены созданные произведения.")
+    for title, (pk, *values) in zip(titles, rows):
+        if values != [getattr(title, field) for field in fields]:
+            raise IntegrityError(
+                "Созданные произведения не совпадают с прочитанными."
+            )
+        title.pk = pk
+
+
+class BulkTitleListSerializer(serializers.ListSerializer):
+    """Проверяет слаги всех произведений одним запросом на модель
+    и создаёт произведения и связи с жанрами пакетно."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        valid = [item for item in items if item is not None]
+        categories = Category.objects.in_bulk(
+            {item["category_slug"] for item in valid}, field_name="slug"
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for item in valid for slug in item["genre_slugs"]},
+            field_name="slug",
+        )
+        for item, item_errors in zip(items, errors):
+            if item is not None:
+                item_errors.update(
+                    self.check_slugs(item, categories, genres)
+                )
+        if any(errors):
+            raise ValidationError(errors)
+        for item in items:
+            item["category"] = categories[item["category_slug"]]
+            item["genres"] = [
+                genres[slug] for slug in dict.fromkeys(item["genre_slugs"])
+            ]
+        return items
+
+    def check_slugs(self, item, categories, genres):
+        does_not_exist = SlugRelatedField.default_error_messages[
+            "does_not_exist"
+        ]
+        errors = {}
+        if item["category_slug"] not in categories:
+            errors["category"] = [does_not_exist.format(
+                slug_name="slug", value=item["category_slug"]
+            )]
+        missing = [slug for slug in item["genre_slugs"] if slug not in genres]
+        if missing:
+            errors["genre"] = [
+                does_not_exist.format(slug_name="slug", value=slug)
+                for slug in missing
+            ]
+        return errors
+
+    @transaction.atomic
+    def create(self, validated_data):
+        titles = Title.objects.bulk_create(
+            Title(
+                name=item["name"],
+                year=item["year"],
+                description=item.get("description"),
+                category=item["category"],
+            )
+            for item in validated_data
+        )
+        if titles and titles[0].pk is None and connection.vendor == "sqlite":
+            fill_bulk_created_ids(titles)
+        through = Title.genre.through
+        through.objects.bulk_create(
+            through(title_id=title.pk, genre_id=genre.pk)
+            for title, item in zip(titles, validated_data)
+            for genre in item["genres"]
+        )
+        for title, item in zip(titles, validated_data):
+            title.category_slug = item["category"].slug
+            title.genre_slugs = [genre.slug for genre in item["genres"]]
+        return titles
+
+
+class BulkTitleSerializer(serializers.ModelSerializer):
+    """Элемент пакетного создания произведений.
+
+    Слаги жанров и категории проверяются в BulkTitleListSerializer сразу
+    для всего списка, а не запросом на каждое поле.
+    """
+
+    category = serializers.SlugField(source="category_slug")
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False,
+        source="genre_slugs",
+    )
+
+    class Meta:
+        model = Title
+        fields = ("id", "name", "year", "description", "genre", "category")
+        list_serializer_class = BulkTitleListSerializer
+
+
+class CommentSerializer(SparseSerializerMixin, serializers.ModelSerializer):
     """Класс сериализатор для создания объектов модели Comment."""
 
     author = SlugRelatedField(
@@ -155,7 +323,91 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only=True
     )
 
+    def create(self, validated_data):
+        return super().create(
+            {**validated_data, "review": self.context["review"]}
+        )
+
     class Meta:
         model = Comment
         fields = ("id", "text", "author", "pub_date")
         read_only_fields = ("id", "review")
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    title = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.SlugField(
+        required=False, max_length=settings.LENGTHSLUG
+    )
+
+
+class ModerationFilterSerializer(serializers.Serializer):
+    author = serializers.CharField(
+        required=False, max_length=settings.USER_MAX_LENGTH
+    )
+    title = serializers.IntegerField(required=False, min_value=1)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if data.get("since") and data.get("until") and (
+            data["since"] > data["until"]
+        ):
+            raise ValidationError(
+                {"until": ["Конец периода раньше его начала."]}
+            )
+        return data
+
+
+class ModerationSearchSerializer(ModerationFilterSerializer):
+    search = serializers.CharField(
+        required=False, max_length=settings.MAXLENGTH
+    )
+
+
+class ModerationSerializer(ModerationFilterSerializer):
+    action = serializers.ChoiceField(choices=ACTIONS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=settings.MODERATION_MAX_IDS,
+    )
+
+    def validate(self, data):
+        if data.keys() == {"action"}:
+            raise ValidationError(
+                "Укажите ids или хотя бы один фильтр: author, title, "
+                "since, until."
+            )
+        return super().validate(data)
+
+
+class SnippetField(serializers.CharField):
+
+    def to_representation(self, value):
+        return highlight_snippet(value)
+
+
+class ModeratedReviewSerializer(ReviewSerializer):
+    """Отзыв в выдаче модерации; snippet есть только при поиске."""
+
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
+    snippet = SnippetField(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + (
+            "title", "is_hidden", "snippet",
+        )
+
+
+class ModeratedCommentSerializer(CommentSerializer):
+    """Комментарий в выдаче модерации; snippet есть только при поиске."""
+
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+    snippet = SnippetField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + (
+            "review", "is_hidden", "snippet",
+        )
@@ -0,0 +1,151 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from api.authentication import AUTH_FIELDS, auth_scope
+from api.cache import (
+    USERNAME_SCOPE, bump_versions, model_scope, object_scope
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.stats import pending_stats
+
+User = get_user_model()
+
+TITLE_SCOPE = model_scope(Title)
+DEPENDENT_SCOPES = {
+    Category: (TITLE_SCOPE,),
+    Genre: (TITLE_SCOPE,),
+    Review: (TITLE_SCOPE,),
+}
+
+
+def bump_on_commit(*scopes):
+    """Версии сдвигаются после коммита, иначе параллельный запрос успеет
+    закэшировать старые данные под новой версией."""
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def comment_title_id(comment):
+    """id произведения комментария: из загруженного отзыва, иначе
+    отдельным запросом."""
+    if Comment.review.is_cached(comment):
+        review = comment.review
+        if "title_id" not in review.get_deferred_fields():
+            return review.title_id
+    return (
+        Review.objects.filter(pk=comment.review_id)
+        .values_list("title_id", flat=True)
+        .first()
+    )
+
+
+def comment_title_scopes(comment, deleted):
+    """Области произведения, в чьих ответах есть comments_count отзыва.
+
+    Текст комментария в них не входит, поэтому их сдвигают только
+    создание, удаление и скрытие. Каскадное удаление и массовая
+    модерация идут в блоке deferred_stats и сдвигают области
+    произведений сами, без запроса на каждый комментарий.
+    """
+    if pending_stats() is not None:
+        return ()
+    if not deleted and not getattr(comment, "_visibility_changed", True):
+        return ()
+    title_id = comment_title_id(comment)
+    if title_id is None:
+        return ()
+    return (TITLE_SCOPE, object_scope(Title, title_id))
+
+
+def affected_object_scopes(instance, deleted=False):
+    if isinstance(instance, Title):
+        return (object_scope(Title, instance.pk),)
+    if isinstance(instance, Review):
+        return (
+            object_scope(Review, instance.pk),
+            *((object_scope(Title, instance.title_id),)
+              if instance.title_id else ()),
+        )
+    if isinstance(instance, Comment):
+        return (
+            object_scope(Review, instance.review_id),
+            *comment_title_scopes(instance, deleted),
+        )
+    if isinstance(instance, User):
+        # Удаление проходит без pre_save и сбрасывает обе области.
+        return (
+            *((USERNAME_SCOPE,)
+              if getattr(instance, "_username_changed", True) else ()),
+            *((auth_scope(instance.pk),)
+              if getattr(instance, "_auth_changed", True) else ()),
+        )
+    return ()
+
+
+def invalidate(sender, instance, **kwargs):
+    bump_on_commit(
+        model_scope(sender),
+        *DEPENDENT_SCOPES.get(sender, ()),
+        *affected_object_scopes(
+            instance, deleted=kwargs["signal"] is post_delete
+        ),
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def detect_visibility_change(sender, instance, **kwargs):
+    """Отмечает новый комментарий и смену is_hidden: они меняют
+    comments_count отзыва."""
+    instance._visibility_changed = (
+        instance._state.adding
+        or getattr(instance, "_was_hidden", None) != instance.is_hidden
+    )
+
+
+@receiver(pre_save, sender=User)
+def detect_auth_change(sender, instance, update_fields, raw, **kwargs):
+    """Отмечает смену имени пользователя и полей, от которых зависят
+    его права (AUTH_FIELDS)."""
+    instance._username_changed = instance._auth_changed = False
+    if instance.pk is None or raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        AUTH_FIELDS
+    ):
+        return
+    saved = User.objects.filter(pk=instance.pk).values_list(
+        *AUTH_FIELDS
+    ).first()
+    if saved is None:
+        instance._username_changed = True
+        return
+    saved = dict(zip(AUTH_FIELDS, saved))
+    instance._username_changed = saved["username"] != instance.username
+    instance._auth_changed = any(
+        saved[field] != getattr(instance, field) for field in AUTH_FIELDS
+    )
+
+
+for model in (Category, Genre, Title, Review, Comment, User):
+    post_save.connect(invalidate, sender=model, weak=False)
+    post_delete.connect(invalidate, sender=model, weak=False)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith("post_"):
+        return
+    scopes = [TITLE_SCOPE]
+    if not reverse:
+        scopes.append(object_scope(Title, instance.pk))
+    elif pk_set:
+        scopes.extend(object_scope(Title, pk) for pk in pk_set)
+    else:
+        # genre.titles.clear() не сообщает затронутые произведения,
+        # поэтому сбрасываются все ответы, зависящие от жанров.
+        scopes.append(model_scope(Genre))
+    bump_on_commit(*scopes)
@@ -0,0 +1,191 @@
+import sqlite3
+import time
+from functools import lru_cache
+from threading import local
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+ANON = "anon"
+USER_READ = "user_read"
+USER_WRITE = "user_write"
+AUTH = "auth"
+
+DETAIL = "detail"
+LIST = "list"
+FILTERED = "filtered"
+# Параметры, которые не делают запрос списка дороже.
+PLAIN_LIST_PARAMS = frozenset(
+    ("page", "cursor", "count", "format", "fields")
+)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+KEY = "yamdb:throttle:{}:{}"
+
+
+def parse_rate(rate):
+    """'600/min' -> (600, 60): ёмкость корзины и период её наполнения в
+    секундах."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class CacheBucketStore:
+    """Корзины в кэше Django.
+
+    Чтение и запись корзины — две операции кэша, поэтому при
+    одновременных запросах с одним ключом часть списаний может
+    потеряться. Общим для процессов хранилище будет, только если общий
+    сам кэш (memcached, redis).
+    """
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    def take(self, key, cost, capacity, rate):
+        cache = caches[self.alias]
+        now = time.time()
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        if tokens < cost:
+            return (cost - tokens) / rate
+        cache.set(key, (tokens - cost, now), timeout=capacity / rate + 1)
+        return 0
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class SQLiteBucketStore:
+    """Корзины в отдельном файле SQLite, общем для процессов одного
+    хоста.
+
+    Пополнение и списание выполняются одним UPSERT, поэтому атомарны и
+    между процессами. Файл открывается в режиме WAL без синхронной
+    записи на диск: при сбое теряются только счётчики.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS bucket ("
+        "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL"
+        ") WITHOUT ROWID"
+    )
+    TAKE = (
+        "INSERT INTO bucket (key, tokens, updated) "
+        "VALUES (:key, :capacity - :cost, :now) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        "tokens = min(:capacity, tokens + (:now - updated) * :rate) - :cost, "
+        "updated = :now "
+        "WHERE min(:capacity, tokens + (:now - updated) * :rate) >= :cost "
+        "RETURNING tokens"
+    )
+    TOKENS = (
+        "SELECT min(:capacity, tokens + (:now - updated) * :rate) "
+        "FROM bucket WHERE key = :key"
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self.local = local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.execute(self.SCHEMA)
+            self.local.connection = connection
+        return connection
+
+    def take(self, key, cost, capacity, rate):
+        params = {
+            "key": key, "cost": cost, "capacity": capacity, "rate": rate,
+            "now": time.time(),
+        }
+        if self.connection.execute(self.TAKE, params).fetchone():
+            return 0
+        (tokens,) = self.connection.execute(self.TOKENS, params).fetchone()
+        return (cost - tokens) / rate
+
+    def clear(self):
+        self.connection.execute("DELETE FROM bucket")
+
+
+@lru_cache(maxsize=None)
+def load_store(backend, options):
+    return import_string(backend)(**dict(options))
+
+
+def get_store():
+    config = settings.THROTTLE_STORE
+    return load_store(
+        config["BACKEND"], tuple(sorted(config.get("OPTIONS", {}).items()))
+    )
+
+
+def request_cost(request, view):
+    """Стоимость запроса в токенах корзины.
+
+    Представление может задать её атрибутом throttle_cost; иначе список
+    дороже отдельного объекта, а список с фильтрами, поиском или
+    сортировкой — дороже простого списка (THROTTLE_COSTS).
+    """
+    cost = getattr(view, "throttle_cost", None)
+    if cost is not None:
+        return cost
+    costs = settings.THROTTLE_COSTS
+    if getattr(view, "action", None) != "list":
+        return costs[DETAIL]
+    if set(request.query_params) - PLAIN_LIST_PARAMS:
+        return costs[FILTERED]
+    return costs[LIST]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты запросов корзиной токенов.
+
+    Область берётся из атрибута throttle_scope представления, иначе
+    определяется запросом: anon для анонима, user_read и user_write для
+    чтения и изменения данных пользователем. Ёмкость корзины и скорость
+    её наполнения задаёт DEFAULT_THROTTLE_RATES области, например
+    '600/min'; каждый запрос списывает request_cost токенов.
+    """
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope is not None:
+            return scope
+        if not request.user.is_authenticated:
+            return ANON
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return USER_READ
+        return USER_WRITE
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        ident = (
+            request.user.pk if request.user.is_authenticated
+            else self.get_ident(request)
+        )
+        self.wait_seconds = get_store().take(
+            KEY.format(scope, ident),
+            request_cost(request, view),
+            capacity,
+            capacity / period,
+        )
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
@@ -10,6 +10,9 @@ from .views import (
     UserViewSet,
     APISignup,
     APIGetToken,
+    ExportReviewsView,
+    ReviewModerationView,
+    CommentModerationView,
 )
 
 router = routers.DefaultRouter()
@@ -50,4 +53,19 @@ auth = [
 urlpatterns = [
     path("v1/", include(router.urls)),
     path("v1/auth/", include(auth)),
+    path(
+        "v1/export/reviews/",
+        ExportReviewsView.as_view(),
+        name="export-reviews",
+    ),
+    path(
+        "v1/moderation/reviews/",
+        ReviewModerationView.as_view(),
+        name="moderation-reviews",
+    ),
+    path(
+        "v1/moderation/comments/",
+        CommentModerationView.as_view(),
+        name="moderation-comments",
+    ),
 ]
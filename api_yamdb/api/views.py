@@ -1,22 +1,23 @@
-import random
+import time
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
-from rest_framework import filters, mixins, status, viewsets
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, generics, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from .permissions import (
     IsAdmin,
+    IsAdminOrModerator,
     IsOwnerAdminModeratorOrReadOnly,
     IsAdminOrReadOnly
 )
@@ -30,16 +31,54 @@ from .serializers import (
     GenreSerializer,
     TitleSerializer,
     CreateTitleSerializer,
+    BulkTitleSerializer,
     CommentSerializer,
+    ExportParamsSerializer,
+    ModeratedCommentSerializer,
+    ModeratedReviewSerializer,
+    ModerationSearchSerializer,
+    ModerationSerializer,
+    UserReviewSerializer,
 )
-from api.filters import TitleFilter
+from api.authentication import current_user, issue_token
+from api.cache import USERNAME_SCOPE, model_scope, object_scope
+from api.export import (
+    CSVRenderer, NDJSONRenderer, iter_records, stream_export
+)
+from api.filters import AliasOrderingFilter, TitleFilter
+from api.lockout import (
+    attempt_keys, check_attempts, record_failure, reset_attempts
+)
+from api.mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    IncludeMixin,
+    NestedParentMixin,
+    SparseFieldsMixin,
+)
+from api.pagination import COUNT_NONE, KeysetPagination
+from api.parsers import BulkJSONParser
+from api.readers import (
+    TITLE_FIELD_COLUMNS, TitleFastReadMixin, read_latest_reviews
+)
+from api.signals import bump_on_commit
+from api.throttling import AUTH
 
-from reviews.models import Category, Genre, Title, Review
+from reviews.confirmation import issue_code, redeem_code
+from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.moderation import moderate, select_rows
+from reviews.outbox import enqueue_email
+from reviews.search import search_text
 
 User = get_user_model()
 
+TITLE_SCOPE = model_scope(Title)
+CATEGORY_SCOPE = model_scope(Category)
+GENRE_SCOPE = model_scope(Genre)
+
 
 class ListCreateDelViewSet(
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -51,7 +90,7 @@ class ListCreateDelViewSet(
     search_fields = ("name",)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """Класс вьюсет для модели User."""
 
     queryset = User.objects.all()
@@ -62,6 +101,9 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ("username",)
     http_method_names = ("get", "patch", "post", "delete")
 
+    def get_queryset(self):
+        return self.only_sparse_columns(super().get_queryset())
+
     @action(
         methods=["GET", "PATCH"],
         detail=False,
@@ -69,12 +111,13 @@ class UserViewSet(viewsets.ModelViewSet):
         url_path=settings.MY_PAGE,
     )
     def get_patch_current_user_info(self, request):
+        user = current_user(request)
         if request.method == "GET":
             return Response(
-                UserSerializer(request.user).data, status=status.HTTP_200_OK
+                UserSerializer(user).data, status=status.HTTP_200_OK
             )
         serializer = NotAdminSerializer(
-            request.user,
+            user,
             data=request.data,
             partial=True
         )
@@ -82,68 +125,254 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        methods=["GET"],
+        detail=True,
+        permission_classes=(AllowAny,),
+        url_path="reviews",
+    )
+    def reviews(self, request, username=None):
+        queryset = self.get_feed_queryset().filter(author__username=username)
+        return self.paginate_feed(
+            queryset,
+            not_found=lambda: get_object_or_404(
+                User.objects.only("pk"), username=username
+            ),
+        )
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=(IsAuthenticated,),
+        url_path=f"{settings.MY_PAGE}/reviews",
+    )
+    def my_reviews(self, request):
+        return self.paginate_feed(
+            self.get_feed_queryset().filter(author_id=request.user.pk)
+        )
+
+    def get_feed_queryset(self):
+        """Отзывы для ленты пользователя: порядок совпадает с индексом
+        review_author_pub_date_idx, произведение и автор читаются тем же
+        запросом."""
+        return (
+            Review.objects.filter(is_hidden=False)
+            .select_related("author", "title")
+            .only(
+                "text", "score", "pub_date", "comments_count",
+                "author__username", "title__name", "title__year",
+            )
+            .order_by("-pub_date")
+        )
+
+    def paginate_feed(self, queryset, not_found=None):
+        """Курсорная страница ленты без COUNT(*) и OFFSET.
+
+        Существование пользователя проверяется отдельным запросом только
+        для пустой первой страницы.
+        """
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, self.request, self)
+        if not page and not_found is not None and not (
+            self.request.query_params.get(paginator.cursor_query_param)
+        ):
+            not_found()
+        serializer = UserReviewSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
 
 class APIGetToken(APIView):
     permission_classes = (AllowAny,)
+    throttle_scope = AUTH
+
+    def check_throttles(self, request):
+        # Перебор кодов отсекается по счётчикам в кэше раньше корзин
+        # и базы (см. api.lockout).
+        self.attempt_keys = attempt_keys(request)
+        check_attempts(self.attempt_keys)
+        super().check_throttles(request)
 
     def post(self, request):
         serializer = GetTokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        user = get_object_or_404(User, username=data["username"])
-        if data.get("confirmation_code") == user.confirmation_code:
-            token = RefreshToken.for_user(user).access_token
-            return Response({"token": str(token)}, status=status.HTTP_200_OK)
-        user.confirmation_code = settings.DEFAULT_CONF_CODE
-        user.save()
-        raise ValidationError("Неверно! запросите новый код подтверждения")
+        user = redeem_code(data["username"], data["confirmation_code"])
+        if user is None:
+            record_failure(self.attempt_keys)
+            get_object_or_404(
+                User.objects.only("pk"), username=data["username"]
+            )
+            raise ValidationError("Неверно! запросите новый код подтверждения")
+        reset_attempts(self.attempt_keys)
+        token = issue_token(user)
+        return Response({"token": str(token)}, status=status.HTTP_200_OK)
+
+
+class ExportReviewsView(APIView):
+    """Потоковая выгрузка отзывов и комментариев в NDJSON или CSV.
+
+    Формат выбирается параметром ?format= или заголовком Accept,
+    область — параметрами ?title= и ?category=.
+    """
+
+    permission_classes = (IsAdmin,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+    throttle_cost = 20
+
+    def get(self, request):
+        params = ExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        records = iter_records(
+            title_id=params.validated_data.get("title"),
+            category=params.validated_data.get("category"),
+        )
+        export_format = request.accepted_renderer.format
+        response = StreamingHttpResponse(
+            stream_export(records, export_format),
+            content_type=request.accepted_renderer.media_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="reviews.{export_format}"'
+        )
+        return response
+
+
+class ModerationView(generics.GenericAPIView):
+    """Поиск и массовое удаление, скрытие и возврат отзывов или
+    комментариев.
+
+    GET ищет строки по тексту (?search=) и фильтрам author, title, since
+    и until, включая скрытые. POST применяет действие к строкам,
+    выбранным списком ids и теми же фильтрами; права проверяются один
+    раз на весь запрос.
+    """
+
+    permission_classes = (IsAdminOrModerator,)
+    pagination_count_mode = COUNT_NONE
+    model = None
+
+    def get_queryset(self):
+        params = ModerationSearchSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        text = filters.pop("search", None)
+        queryset = (
+            select_rows(self.model, **filters)
+            .select_related("author")
+            .order_by("-pub_date")
+        )
+        if text is None:
+            return queryset
+        return search_text(queryset, text)
+
+    def get(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        action = filters.pop("action")
+        started = time.perf_counter()
+        result = moderate(select_rows(self.model, **filters), action)
+        duration = time.perf_counter() - started
+        # Массовое UPDATE обходит сигналы, сбрасывающие кэш ответов.
+        bump_on_commit(
+            model_scope(self.model),
+            *((TITLE_SCOPE,) if result.title_ids else ()),
+            *(object_scope(Title, pk) for pk in result.title_ids),
+            *(object_scope(Review, pk) for pk in result.review_ids),
+        )
+        return Response(
+            {
+                "action": action,
+                "reviews": result.reviews,
+                "comments": result.comments,
+                "duration_ms": round(duration * 1000, 1),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReviewModerationView(ModerationView):
+    model = Review
+    serializer_class = ModeratedReviewSerializer
+
+
+class CommentModerationView(ModerationView):
+    model = Comment
+    serializer_class = ModeratedCommentSerializer
 
 
 class APISignup(APIView):
     permission_classes = (AllowAny,)
+    throttle_scope = AUTH
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = request.data.get("email")
+        # Код и письмо с ним сохраняются одной транзакцией; письмо
+        # отправляется вне запроса (см. reviews.outbox).
         try:
-            user, _ = User.objects.get_or_create(**serializer.validated_data)
-
+            with transaction.atomic():
+                user, created = User.objects.get_or_create(
+                    **serializer.validated_data
+                )
+                code = issue_code(user, created=created)
+                enqueue_email(
+                    subject="Код подтверждения YaMDb",
+                    body=f"Ваш код подтверждения: {code}",
+                    to=email,
+                )
         except IntegrityError:
             raise ValidationError(
                 serializer.data,
             )
 
-        user.confirmation_code = "".join(
-            random.sample(settings.PATTERN, settings.CODE_MAX_LEN)
-        )
-        user.save()
-
-        send_mail(
-            subject="Код подтверждения YaMDb",
-            message=f"Ваш код подтверждения: {user.confirmation_code}",
-            from_email=settings.DEFAULT_EMAIL,
-            recipient_list=[email],
-        )
-
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin,
+    NestedParentMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
     """Класс вьюсет для модели Review."""
 
     permission_classes = (IsOwnerAdminModeratorOrReadOnly,)
     http_method_names = ("get", "patch", "post", "delete")
     serializer_class = ReviewSerializer
+    filter_backends = (AliasOrderingFilter,)
+    ordering_fields = ("pub_date", "score", "comments_count")
+    sparse_field_columns = {"author": ("author", "author__username")}
+    parent_context_name = "title"
 
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get("title_id"))
+    def get_version_scopes(self):
+        if self.action == "retrieve":
+            return (object_scope(Review, self.kwargs["pk"]), USERNAME_SCOPE)
+        return (object_scope(Title, self.kwargs["title_id"]), USERNAME_SCOPE)
+
+    def get_parent_queryset(self):
+        return Title.objects.filter(pk=self.kwargs["title_id"]).only("pk")
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        if self.action == "list":
+            self.get_parent()
+        queryset = Review.objects.filter(
+            title_id=self.kwargs["title_id"], is_hidden=False
+        )
+        if self.wants_field("author"):
+            queryset = queryset.select_related("author")
+        return self.only_sparse_columns(queryset)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(author=self.request.user)
 
 
 class CategoryViewSet(ListCreateDelViewSet):
@@ -152,6 +381,9 @@ class CategoryViewSet(ListCreateDelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def get_version_scopes(self):
+        return (CATEGORY_SCOPE,)
+
 
 class GenreViewSet(ListCreateDelViewSet):
     """Класс вьюсет для модели Genre."""
@@ -159,38 +391,164 @@ class GenreViewSet(ListCreateDelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
+    def get_version_scopes(self):
+        return (GENRE_SCOPE,)
+
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    TitleFastReadMixin,
+    IncludeMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
     """Класс вьюсет для модели Title."""
 
     queryset = (
-        Title.objects.annotate(rating=Avg("reviews__score"))
-        .order_by(*Title._meta.ordering)
+        Title.objects.order_by(*Title._meta.ordering)
         .select_related("category")
-        .prefetch_related("genre")
+        .prefetch_related(
+            Prefetch("genre", queryset=Genre.objects.order_by())
+        )
     )
     permission_classes = (IsAdminOrReadOnly,)
+    filter_backends = (DjangoFilterBackend, AliasOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ("name", "year", "reviews_count")
+    ordering_aliases = {"reviews_count": "rating_count"}
     http_method_names = ("get", "patch", "post", "delete")
+    include_options = ("histogram", "reviews")
+    reviews_limit_query_param = "reviews_limit"
+    sparse_field_columns = TITLE_FIELD_COLUMNS
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.wants_field("category"):
+            queryset = queryset.select_related(None)
+        if not self.wants_field("genre"):
+            queryset = queryset.prefetch_related(None)
+        return self.only_sparse_columns(queryset)
+
+    def get_sparse_columns(self, queryset):
+        columns = super().get_sparse_columns(queryset)
+        if "histogram" in self.get_includes():
+            columns += ("score_histogram",)
+        return columns
+
+    def get_reviews_limit(self):
+        value = self.request.query_params.get(self.reviews_limit_query_param)
+        if value is None:
+            return settings.TITLE_EMBEDDED_REVIEWS
+        maximum = settings.TITLE_EMBEDDED_REVIEWS_MAX
+        try:
+            limit = int(value)
+            if not 1 <= limit <= maximum:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({
+                self.reviews_limit_query_param: (
+                    f"Ожидается целое число от 1 до {maximum}."
+                )
+            })
+        return limit
+
+    def read_embedded_reviews(self, title_ids):
+        return read_latest_reviews(
+            title_ids, self.get_reviews_limit(), {"request": self.request}
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if (
+            args
+            and self.action in ("list", "retrieve")
+            and "reviews" in self.get_includes()
+        ):
+            instances = args[0] if kwargs.get("many") else [args[0]]
+            kwargs["context"] = {
+                **self.get_serializer_context(),
+                "embedded_reviews": self.read_embedded_reviews(
+                    [title.pk for title in instances]
+                ),
+            }
+        return super().get_serializer(*args, **kwargs)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return TitleSerializer
+        if self.action == "bulk":
+            return BulkTitleSerializer
         return CreateTitleSerializer
 
-
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(
+        methods=["POST"], detail=False, parser_classes=(BulkJSONParser,)
+    )
+    def bulk(self, request):
+        """Создаёт список произведений в одной транзакции.
+
+        При ошибке в любом элементе ничего не создаётся, а ответ содержит
+        ошибки по каждому элементу в порядке запроса. Тело запроса может
+        быть больше общего предела, до TITLE_BULK_MAX_BODY_SIZE байт.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        # bulk_create не отправляет post_save и m2m_changed.
+        bump_on_commit(TITLE_SCOPE)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_version_scopes(self):
+        if self.action == "retrieve":
+            scopes = (
+                object_scope(Title, self.kwargs[self.lookup_field]),
+                CATEGORY_SCOPE,
+                GENRE_SCOPE,
+            )
+        else:
+            scopes = (TITLE_SCOPE, CATEGORY_SCOPE, GENRE_SCOPE)
+        if "reviews" in self.get_includes():
+            scopes += (USERNAME_SCOPE,)
+        return scopes
+
+
+class CommentViewSet(
+    ConditionalGetMixin,
+    NestedParentMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
     """Класс вьюсет для модели Comment."""
 
     permission_classes = (IsOwnerAdminModeratorOrReadOnly,)
     http_method_names = ("get", "patch", "post", "delete")
     serializer_class = CommentSerializer
+    sparse_field_columns = {"author": ("author", "author__username")}
+    parent_context_name = "review"
+
+    def get_version_scopes(self):
+        return (
+            object_scope(Review, self.kwargs["review_id"]), USERNAME_SCOPE
+        )
 
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get("review_id"))
+    def get_parent_queryset(self):
+        return Review.objects.filter(
+            pk=self.kwargs["review_id"],
+            title_id=self.kwargs["title_id"],
+            is_hidden=False,
+        ).only("pk", "title_id")
 
     def get_queryset(self):
-        return self.get_review().Comment.all()
+        if self.action == "list":
+            self.get_parent()
+        queryset = Comment.objects.filter(
+            review_id=self.kwargs["review_id"],
+            review__title_id=self.kwargs["title_id"],
+            review__is_hidden=False,
+            is_hidden=False,
+        )
+        if self.wants_field("author"):
+            queryset = queryset.select_related("author")
+        return self.only_sparse_columns(queryset)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=self.request.user)
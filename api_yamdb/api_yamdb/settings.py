@@ -75,6 +75,20 @@ DATABASES = {
 }
 
 
+# Cache
+# LocMemCache живёт внутри одного процесса. Чтобы кэш ответов и счётчики
+# версий были общими для нескольких процессов на одном хосте, замените
+# его на FileBasedCache с LOCATION = BASE_DIR / 'cache'.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -123,15 +137,81 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'api.authentication.ClaimsJWTAuthentication'
     ],
-    'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.LimitedJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.YamdbPagination',
     'PAGE_SIZE': 10,
+    # Число доверенных прокси перед приложением. При 0 адрес клиента для
+    # ограничения частоты и блокировки перебора берётся из REMOTE_ADDR, а
+    # присланный клиентом X-Forwarded-For не учитывается.
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+    # Ёмкость корзины токенов области; за период она наполняется заново.
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '600/min',
+        'user_read': '1200/min',
+        'user_write': '300/min',
+        'auth': '30/min',
+    },
+}
+
+# Сколько токенов корзины списывает запрос (см. api.throttling).
+THROTTLE_COSTS = {'detail': 1, 'list': 2, 'filtered': 4}
+
+# Хранилище корзин, общее для процессов хоста. Кэш Django подключается
+# как 'api.throttling.CacheBucketStore' с OPTIONS {'alias': ...}.
+THROTTLE_STORE = {
+    'BACKEND': 'api.throttling.SQLiteBucketStore',
+    'OPTIONS': {'path': str(BASE_DIR / 'throttle.sqlite3')},
 }
 
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# Список и карточка произведения собираются из values() без TitleSerializer.
+TITLE_FAST_READ = True
+
+# Число отзывов в ?include=reviews по умолчанию и наибольшее допустимое
+# значение ?reviews_limit=.
+TITLE_EMBEDDED_REVIEWS = 3
+TITLE_EMBEDDED_REVIEWS_MAX = 10
+
+# Предел тела POST /api/v1/titles/bulk/, который передаёт десятки тысяч
+# произведений в одном запросе. Остальные запросы ограничены
+# DATA_UPLOAD_MAX_MEMORY_SIZE (по умолчанию 2,5 МБ).
+TITLE_BULK_MAX_BODY_SIZE = 32 * 1024 * 1024
+
+# Выгрузка отзывов читает базу и отдаёт ответ блоками по столько строк.
+EXPORT_CHUNK_SIZE = 2000
+
+# Наибольшее число id в одном запросе массовой модерации.
+MODERATION_MAX_IDS = 10000
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Пользователи токенов без актуальных claims кэшируются в памяти процесса
+# (см. api.authentication.PrincipalCache): число записей и срок жизни
+# записи в секундах.
+AUTH_PRINCIPAL_CACHE_SIZE = 1024
+AUTH_PRINCIPAL_CACHE_TIMEOUT = 60
+
+# Неверные коды подтверждения считаются в кэше по имени пользователя и
+# по IP (см. api.lockout). С порога области запросы блокируются на
+# AUTH_LOCKOUT_BASE_DELAY секунд, и каждая следующая неверная попытка
+# удваивает блокировку до AUTH_LOCKOUT_MAX_DELAY. Счётчик забывается
+# через AUTH_LOCKOUT_WINDOW секунд без неверных попыток.
+AUTH_LOCKOUT_CACHE = 'default'
+AUTH_LOCKOUT_FAILURES = {'username': 5, 'ip': 20}
+AUTH_LOCKOUT_BASE_DELAY = 1
+AUTH_LOCKOUT_MAX_DELAY = 60 * 60
+AUTH_LOCKOUT_WINDOW = 15 * 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -150,6 +230,20 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 DEFAULT_EMAIL = 'info@yamdb.com'
 
+# Письма ставятся в очередь OutgoingEmail и отправляются командой
+# send_outbox. При True процесс отправляет письмо сам сразу после
+# фиксации транзакции, в которой оно поставлено.
+EMAIL_OUTBOX_SEND_ON_COMMIT = False
+
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+# Паузы перед повторными попытками отправки, в секундах; после
+# исчерпания списка письмо больше не отправляется.
+EMAIL_OUTBOX_RETRY_DELAYS = (60, 300, 1800, 7200)
+
+# На столько секунд обработчик забирает пачку писем.
+EMAIL_OUTBOX_LEASE = 300
+
 
 # CONSTANTS
 
@@ -157,7 +251,11 @@ CODE_MAX_LEN = 5
 
 PATTERN = '1234567890'
 
-DEFAULT_CONF_CODE = 'X' * CODE_MAX_LEN
+# Срок действия кода подтверждения в секундах и число неверных попыток,
+# после которых код нужно запросить заново.
+CONFIRMATION_CODE_TTL = 24 * 60 * 60
+
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
 
 USER_MAX_LENGTH = 150
 
@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (
+    Category, Comment, Genre, OutgoingEmail, Review, Title, User
+)
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -13,7 +15,7 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ["name", "year", "description", "category"]
+    list_display = ["name", "year", "description", "category", "rating"]
 
 
 class ReviewAdmin(admin.ModelAdmin):
@@ -23,16 +25,29 @@ class ReviewAdmin(admin.ModelAdmin):
         "pub_date",
         "score",
         "title",
+        "is_hidden",
     ]
 
 
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ["text", "author", "pub_date", "review"]
+    list_display = ["text", "author", "pub_date", "review", "is_hidden"]
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = [
+        "to",
+        "subject",
+        "created",
+        "sent_at",
+        "attempts",
+        "send_after",
+    ]
 
 
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Genre, GenreAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(User, UserAdmin)
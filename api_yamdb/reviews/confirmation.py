@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import (
+    constant_time_compare, get_random_string, salted_hmac
+)
+
+from reviews.models import ConfirmationCode
+
+HASH_SALT = "reviews.confirmation"
+PURGE_BATCH_SIZE = 1000
+
+
+def hash_code(user_id, code):
+    """HMAC кода на SECRET_KEY: пятизначный код из хэша без ключа
+    подбирается перебором."""
+    return salted_hmac(HASH_SALT, f"{user_id}:{code}").hexdigest()
+
+
+def store_code(user, code, created=False):
+    """Сохраняет код пользователя вместо выданного ранее.
+
+    Строка пользователя не меняется; для только что созданного
+    пользователя прежнего кода нет, и удаление пропускается.
+    """
+    if not created:
+        ConfirmationCode.objects.filter(user=user).delete()
+    ConfirmationCode.objects.create(
+        user=user,
+        code_hash=hash_code(user.pk, code),
+        expires_at=timezone.now() + timedelta(
+            seconds=settings.CONFIRMATION_CODE_TTL
+        ),
+    )
+
+
+def issue_code(user, created=False):
+    """Выдаёт пользователю новый код и возвращает его."""
+    code = get_random_string(settings.CODE_MAX_LEN, settings.PATTERN)
+    store_code(user, code, created=created)
+    return code
+
+
+def redeem_code(username, code):
+    """Погашает код и возвращает пользователя либо None, если кода нет,
+    он истёк или не совпал.
+
+    Неверный код расходует попытку; после CONFIRMATION_CODE_MAX_ATTEMPTS
+    неверных попыток код удаляется, и нужно запросить новый.
+    """
+    entry = (
+        ConfirmationCode.objects.select_related("user")
+        .filter(user__username=username, expires_at__gt=timezone.now())
+        .first()
+    )
+    if entry is None:
+        return None
+    codes = ConfirmationCode.objects.filter(pk=entry.pk)
+    if constant_time_compare(entry.code_hash, hash_code(entry.pk, code)):
+        # Код гасит тот запрос, который успел его удалить.
+        deleted, _ = codes.delete()
+        return entry.user if deleted else None
+    attempts_left = codes.filter(
+        attempts__lt=settings.CONFIRMATION_CODE_MAX_ATTEMPTS - 1
+    ).update(attempts=F("attempts") + 1)
+    if not attempts_left:
+        codes.delete()
+    return None
+
+
+def purge_expired(batch_size=PURGE_BATCH_SIZE):
+    """Удаляет истёкшие коды пачками, каждая — отдельной короткой
+    записью, и возвращает число удалённых."""
+    expired = ConfirmationCode.objects.filter(
+        expires_at__lte=timezone.now()
+    )
+    purged = 0
+    while True:
+        pks = list(expired.values_list("pk", flat=True)[:batch_size])
+        if pks:
+            ConfirmationCode.objects.filter(pk__in=pks).delete()
+            purged += len(pks)
+        if len(pks) < batch_size:
+            return purged
@@ -0,0 +1,52 @@
+from django.db import models
+
+SCORE_BUCKETS = 10
+HISTOGRAM_WIDTH = 8
+EMPTY_HISTOGRAM = (0,) * SCORE_BUCKETS
+
+
+def pack_histogram(counts):
+    return "".join(str(count).zfill(HISTOGRAM_WIDTH) for count in counts)
+
+
+def unpack_histogram(value):
+    return tuple(
+        int(value[start:start + HISTOGRAM_WIDTH])
+        for start in range(0, SCORE_BUCKETS * HISTOGRAM_WIDTH,
+                           HISTOGRAM_WIDTH)
+    )
+
+
+class ScoreHistogramField(models.CharField):
+    """Число оценок 1–10, упакованное в строку фиксированной ширины.
+
+    Каждой оценке отводится HISTOGRAM_WIDTH цифр, поэтому корзину можно
+    сдвинуть атомарным UPDATE через SUBSTR без чтения строки. В Python
+    значение представлено кортежем из SCORE_BUCKETS чисел.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs["max_length"] = SCORE_BUCKETS * HISTOGRAM_WIDTH
+        kwargs.setdefault("default", EMPTY_HISTOGRAM)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs["max_length"]
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else unpack_histogram(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, tuple):
+            return value
+        if isinstance(value, list):
+            return tuple(value)
+        return unpack_histogram(value)
+
+    def get_prep_value(self, value):
+        # CharField.get_prep_value вызывает to_python и вернул бы кортеж.
+        if isinstance(value, (tuple, list)):
+            return pack_histogram(value)
+        return value
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.stats import (
+    COUNTERS, RECOMPUTE_BATCH_SIZE, find_counter_drift, repair_counters
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет число отзывов произведений и число комментариев отзывов "
+        "с фактическим и при --fix исправляет расхождения."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Исправить найденные расхождения.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RECOMPUTE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for model in COUNTERS:
+            found = 0
+            for pks in find_counter_drift(model, options["batch_size"]):
+                found += len(pks)
+                if pks and options["fix"]:
+                    repair_counters(model, pks)
+            drifted += found
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: расхождений {found}"
+            )
+        if drifted and not options["fix"]:
+            raise CommandError(
+                f"Найдено расхождений счётчиков: {drifted}. "
+                "Запустите команду с --fix."
+            )
+        self.stdout.write(self.style.SUCCESS("Счётчики согласованы."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from reviews.confirmation import PURGE_BATCH_SIZE, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Удаляет истёкшие коды подтверждения пачками."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PURGE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_expired(options["batch_size"])
+        self.stdout.write(f"Удалено истёкших кодов: {purged}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from reviews.stats import RECOMPUTE_BATCH_SIZE, recompute_title_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сохранённые рейтинги и гистограммы оценок "
+        "произведений по отзывам."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "title_ids",
+            nargs="*",
+            type=int,
+            help="id произведений; по умолчанию пересчитываются все.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RECOMPUTE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        changed = recompute_title_ratings(
+            options["title_ids"] or None,
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Обновлено произведений: {changed}")
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Отправляет письма из очереди пачками через одно соединение с "
+        "почтовым сервером; при --loop работает, пока его не остановят."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Не завершаться, а ждать новых писем.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза между опросами пустой очереди, в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        sent = failed = 0
+        with get_connection() as connection:
+            while True:
+                delivery = send_batch(batch_size, connection=connection)
+                sent += delivery.sent
+                failed += delivery.failed
+                if sum(delivery) == batch_size:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(f"Отправлено: {sent}, ошибок: {failed}")
@@ -0,0 +1,71 @@
+# Generated by Django 3.2 on 2026-10-18 18:59
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    totals = (
+        Review.objects.order_by()
+        .values("title")
+        .annotate(score_sum=Sum("score"), score_count=Count("pk"))
+    )
+    titles = []
+    for row in totals:
+        if row["title"] is None:
+            continue
+        titles.append(
+            Title(
+                pk=row["title"],
+                rating_sum=row["score_sum"],
+                rating_count=row["score_count"],
+                rating=row["score_sum"] // row["score_count"],
+            )
+        )
+    Title.objects.bulk_update(
+        titles, ("rating_sum", "rating_count", "rating"), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0002_alter_title_category"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="category",
+            options={
+                "ordering": ("name",),
+                "verbose_name": "Категория",
+                "verbose_name_plural": "Категории",
+            },
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="rating",
+            field=models.PositiveSmallIntegerField(
+                editable=False, null=True, verbose_name="рейтинг"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="rating_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="количество оценок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="rating_sum",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="сумма оценок"
+            ),
+        ),
+        migrations.RunPython(
+            fill_rating_aggregates, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.2 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_title_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(fields=["name"], name="category_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["review", "-pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="genre",
+            index=models.Index(fields=["name"], name="genre_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["title", "-pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["-year", "name", "id"], name="title_year_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["category", "-year", "name", "id"],
+                name="title_category_year_name_idx",
+            ),
+        ),
+        # Автоматическая промежуточная таблица жанров не описывает индексы
+        # в Meta, поэтому обратный индекс для фильтра по жанру создаётся
+        # напрямую.
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX "title_genre_genre_title_idx" '
+                'ON "reviews_title_genre" ("genre_id", "title_id")'
+            ),
+            reverse_sql='DROP INDEX "title_genre_genre_title_idx"',
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+FORWARD_SQL = (
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+BACKWARD_SQL = (
+    "DROP TRIGGER IF EXISTS reviews_title_fts_update",
+    "DROP TRIGGER IF EXISTS reviews_title_fts_delete",
+    "DROP TRIGGER IF EXISTS reviews_title_fts_insert",
+    "DROP TABLE IF EXISTS reviews_title_fts",
+)
+
+
+def run_sqlite(statements):
+    """Полнотекстовый индекс FTS5 есть только в SQLite; на других СУБД
+    поиск работает через icontains (см. reviews.search)."""
+
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0004_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sqlite(FORWARD_SQL), run_sqlite(BACKWARD_SQL)
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.2 on 2026-10-18 19:46
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+import reviews.fields
+from reviews.search import create_title_fts_triggers
+
+
+def fill_score_histograms(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    histograms = defaultdict(lambda: list(reviews.fields.EMPTY_HISTOGRAM))
+    counts = (
+        Review.objects.order_by()
+        .filter(title__isnull=False)
+        .values("title", "score")
+        .annotate(score_count=Count("pk"))
+    )
+    for row in counts:
+        histograms[row["title"]][row["score"] - 1] = row["score_count"]
+    Title.objects.bulk_update(
+        [
+            Title(pk=pk, score_histogram=tuple(histogram))
+            for pk, histogram in histograms.items()
+        ],
+        ("score_histogram",),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0005_title_fts"),
+    ]
+
+    operations = [
+        # При откате RemoveField тоже пересоздаёт таблицу.
+        migrations.RunPython(
+            migrations.RunPython.noop, create_title_fts_triggers
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_histogram",
+            field=reviews.fields.ScoreHistogramField(
+                default=(0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+                editable=False,
+                verbose_name="распределение оценок",
+            ),
+        ),
+        migrations.RunPython(
+            fill_score_histograms, migrations.RunPython.noop
+        ),
+        migrations.RunPython(
+            create_title_fts_triggers, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0007_review_comments_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="is_hidden",
+            field=models.BooleanField(
+                default=False, verbose_name="скрыт модератором"
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="is_hidden",
+            field=models.BooleanField(
+                default=False, verbose_name="скрыт модератором"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-18 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0008_hidden_reviews_comments"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["author", "-pub_date", "id"],
+                name="review_author_pub_date_idx",
+            ),
+        ),
+    ]
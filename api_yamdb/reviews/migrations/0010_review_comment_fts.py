@@ -0,0 +1,47 @@
+from django.db import migrations
+
+from reviews.search import create_text_fts_triggers
+
+TABLES = ("reviews_review", "reviews_comment")
+
+
+def create_fts_tables(apps, schema_editor):
+    """Индексы FTS5 текста отзывов и комментариев; на других СУБД поиск
+    работает через icontains (см. reviews.search)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            f"""
+            CREATE VIRTUAL TABLE {table}_fts USING fts5(
+                text,
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in TABLES:
+        for event in ("update", "delete", "insert"):
+            schema_editor.execute(
+                f"DROP TRIGGER IF EXISTS {table}_fts_{event}"
+            )
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0009_review_author_pub_date_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+        migrations.RunPython(
+            create_text_fts_triggers, migrations.RunPython.noop
+        ),
+    ]
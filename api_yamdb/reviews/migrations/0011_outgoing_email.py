@@ -0,0 +1,89 @@
+# Generated by Django 3.2 on 2026-10-18 21:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0010_review_comment_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutgoingEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.CharField(max_length=256, verbose_name="тема"),
+                ),
+                ("body", models.TextField(verbose_name="текст")),
+                (
+                    "from_email",
+                    models.EmailField(
+                        max_length=254, verbose_name="отправитель"
+                    ),
+                ),
+                (
+                    "to",
+                    models.EmailField(
+                        max_length=254, verbose_name="получатель"
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        verbose_name="поставлено в очередь",
+                    ),
+                ),
+                (
+                    "send_after",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="следующая попытка",
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="отправлено"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="попыток"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, verbose_name="последняя ошибка"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "исходящее письмо",
+                "verbose_name_plural": "Исходящие письма",
+                "ordering": ("-created",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="outgoingemail",
+            index=models.Index(
+                fields=["send_after", "id"],
+                name="outgoing_email_send_after_idx",
+            ),
+        ),
+    ]
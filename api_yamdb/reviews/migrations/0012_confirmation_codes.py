@@ -0,0 +1,58 @@
+# Generated by Django 3.2 on 2026-10-18 22:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0011_outgoing_email"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConfirmationCode",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="confirmation",
+                        serialize=False,
+                        to="reviews.user",
+                        verbose_name="пользователь",
+                    ),
+                ),
+                (
+                    "code_hash",
+                    models.CharField(max_length=64, verbose_name="хэш кода"),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(verbose_name="действует до"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="неверных попыток"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "код подтверждения",
+                "verbose_name_plural": "Коды подтверждения",
+            },
+        ),
+        migrations.RemoveField(
+            model_name="user",
+            name="confirmation_code",
+        ),
+        migrations.AddIndex(
+            model_name="confirmationcode",
+            index=models.Index(
+                fields=["expires_at"], name="confirmation_expires_at_idx"
+            ),
+        ),
+    ]
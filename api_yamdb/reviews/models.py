@@ -1,9 +1,10 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models.constraints import UniqueConstraint
 
+from reviews.fields import ScoreHistogramField
 from reviews.validators import (
     real_age,
     validate_score,
@@ -12,7 +13,19 @@ from reviews.validators import (
 )
 
 
-class User(AbstractUser):
+class DeferredStatsDeleteMixin:
+    """Каскадное удаление обновляет рейтинги и счётчики один раз на
+    затронутый объект, а не на каждую удалённую строку."""
+
+    def delete(self, *args, **kwargs):
+        # reviews.stats импортирует модели, поэтому импорт отложен.
+        from reviews.stats import deferred_stats
+
+        with deferred_stats():
+            return super().delete(*args, **kwargs)
+
+
+class User(DeferredStatsDeleteMixin, AbstractUser):
     USER = "user"
     MODERATOR = "moderator"
     ADMIN = "admin"
@@ -46,11 +59,6 @@ class User(AbstractUser):
     last_name = models.CharField(
         max_length=settings.USER_MAX_LENGTH, blank=True, verbose_name="фамилия"
     )
-    confirmation_code = models.CharField(
-        max_length=settings.CODE_MAX_LEN,
-        default=settings.CODE_MAX_LEN,
-        verbose_name="код подтверждения",
-    )
 
     REQUIRED_FIELDS = ("email",)
 
@@ -77,6 +85,36 @@ class User(AbstractUser):
         return self.username[: settings.ADMIN_DISPLEY_PAGINATOR]
 
 
+class ConfirmationCode(models.Model):
+    """Действующий код подтверждения пользователя (см.
+    reviews.confirmation)."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="confirmation",
+        verbose_name="пользователь",
+    )
+    code_hash = models.CharField(max_length=64, verbose_name="хэш кода")
+    expires_at = models.DateTimeField(verbose_name="действует до")
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="неверных попыток"
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("expires_at",), name="confirmation_expires_at_idx"
+            ),
+        )
+        verbose_name = "код подтверждения"
+        verbose_name_plural = "Коды подтверждения"
+
+    def __str__(self):
+        return str(self.user)
+
+
 class Category(models.Model):
     """Модель Category."""
 
@@ -92,6 +130,7 @@ class Category(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = (models.Index(fields=("name",), name="category_name_idx"),)
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
 
@@ -118,6 +157,7 @@ class Genre(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = (models.Index(fields=("name",), name="genre_name_idx"),)
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
 
@@ -125,7 +165,7 @@ class Genre(models.Model):
         return self.slug
 
 
-class Title(models.Model):
+class Title(DeferredStatsDeleteMixin, models.Model):
     """Модель Title."""
 
     name = models.CharField(
@@ -152,9 +192,41 @@ class Title(models.Model):
         related_name="titles",
         verbose_name="жанр"
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="сумма оценок"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="количество оценок"
+    )
+    rating = models.PositiveSmallIntegerField(
+        null=True,
+        editable=False,
+        verbose_name="рейтинг"
+    )
+    score_histogram = ScoreHistogramField(
+        editable=False,
+        verbose_name="распределение оценок"
+    )
 
     class Meta:
         ordering = ("-year", "name")
+        indexes = (
+            models.Index(
+                fields=("-year", "name", "id"), name="title_year_name_idx"
+            ),
+            models.Index(
+                fields=("category", "-year", "name", "id"),
+                name="title_category_year_name_idx",
+            ),
+            models.Index(
+                fields=("-rating_count", "id"),
+                name="title_rating_count_idx",
+            ),
+        )
         verbose_name = "Произведение"
         verbose_name_plural = "Названия"
 
@@ -162,7 +234,7 @@ class Title(models.Model):
         return self.name[: settings.LENGTHTEXT]
 
 
-class Review(models.Model):
+class Review(DeferredStatsDeleteMixin, models.Model):
     """Модель Review."""
 
     title = models.ForeignKey(
@@ -187,6 +259,15 @@ class Review(models.Model):
         related_name="reviews",
         verbose_name="автор"
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="количество комментариев"
+    )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name="скрыт модератором",
+    )
 
     class Meta:
         constraints = [
@@ -194,12 +275,44 @@ class Review(models.Model):
                 fields=["title", "author"],
                 name="unique_author_title"),
         ]
+        indexes = (
+            models.Index(
+                fields=("title", "-pub_date", "id"),
+                name="review_title_pub_date_idx",
+            ),
+            models.Index(
+                fields=("title", "-comments_count", "id"),
+                name="review_title_comments_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "id"),
+                name="review_author_pub_date_idx",
+            ),
+        )
         ordering = ("-pub_date",)
         verbose_name = "отзыв"
         verbose_name_plural = "Отзывы"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """Запоминает вклад отзыва в рейтинг произведения."""
+        self._rating_state = (
+            self.__dict__.get("title_id"),
+            self.__dict__.get("score"),
+            self.__dict__.get("is_hidden"),
+        )
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
-        return self.title[: settings.LENGTHTEXT]
+        return self.text[: settings.LENGTHTEXT]
 
 
 class Comment(models.Model):
@@ -223,11 +336,77 @@ class Comment(models.Model):
         "Дата добавления",
         auto_now_add=True,
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name="скрыт модератором",
+    )
 
     class Meta:
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("review", "-pub_date", "id"),
+                name="comment_review_pub_date_idx",
+            ),
+        )
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._was_hidden = instance.__dict__.get("is_hidden")
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.text[: settings.LENGTHTEXT]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. reviews.outbox).
+
+    send_after — время следующей попытки; у отправленных писем и писем,
+    исчерпавших попытки, оно пустое.
+    """
+
+    subject = models.CharField(
+        max_length=settings.MAXLENGTH, verbose_name="тема"
+    )
+    body = models.TextField(verbose_name="текст")
+    from_email = models.EmailField(
+        max_length=settings.MAX_LENGTH_EMAIL, verbose_name="отправитель"
+    )
+    to = models.EmailField(
+        max_length=settings.MAX_LENGTH_EMAIL, verbose_name="получатель"
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name="поставлено в очередь"
+    )
+    send_after = models.DateTimeField(
+        null=True, blank=True, verbose_name="следующая попытка"
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="отправлено"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="попыток"
+    )
+    last_error = models.TextField(blank=True, verbose_name="последняя ошибка")
+
+    class Meta:
+        ordering = ("-created",)
+        indexes = (
+            models.Index(
+                fields=("send_after", "id"),
+                name="outgoing_email_send_after_idx",
+            ),
+        )
+        verbose_name = "исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+
+    def __str__(self):
+        return f"{self.to}: {self.subject}"
@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+from reviews.models import Comment, Review
+from reviews.stats import (
+    deferred_stats, recompute_title_ratings, recount_review_comments
+)
+
+DELETE = "delete"
+HIDE = "hide"
+UNHIDE = "unhide"
+ACTIONS = (DELETE, HIDE, UNHIDE)
+
+# Отзыв и произведение, чьи ответы зависят от строки модели.
+PARENT_FIELDS = {
+    Review: ("pk", "title_id"),
+    Comment: ("review_id", "review__title_id"),
+}
+TITLE_LOOKUPS = {Review: "title_id", Comment: "review__title_id"}
+
+Moderated = namedtuple(
+    "Moderated", ("reviews", "comments", "title_ids", "review_ids")
+)
+
+
+def select_rows(model, ids=None, author=None, title=None, since=None,
+                until=None):
+    """Отзывы или комментарии, подходящие под все заданные условия."""
+    lookups = {
+        "pk__in": ids,
+        "author__username": author,
+        TITLE_LOOKUPS[model]: title,
+        "pub_date__gte": since,
+        "pub_date__lte": until,
+    }
+    return model.objects.filter(**{
+        lookup: value for lookup, value in lookups.items()
+        if value is not None
+    })
+
+
+def moderate(queryset, action):
+    """Удаляет, скрывает или возвращает отзывы либо комментарии выборки
+    одной транзакцией.
+
+    Рейтинги и счётчики затронутых произведений и отзывов пересчитываются
+    один раз на объект в конце блока deferred_stats, а не на каждую
+    строку. Возвращает число затронутых отзывов и комментариев и id
+    произведений и отзывов, чьи ответы изменились.
+    """
+    model = queryset.model
+    with deferred_stats():
+        if action != DELETE:
+            queryset = queryset.exclude(is_hidden=(action == HIDE))
+        rows = list(
+            queryset.order_by().values_list(*PARENT_FIELDS[model])
+        )
+        review_ids = {review_id for review_id, _ in rows}
+        title_ids = {
+            title_id for _, title_id in rows if title_id is not None
+        }
+        if action == DELETE:
+            _, deleted = queryset.delete()
+            counts = (
+                deleted.get(Review._meta.label, 0),
+                deleted.get(Comment._meta.label, 0),
+            )
+            return Moderated(*counts, title_ids, review_ids)
+        changed = queryset.update(is_hidden=(action == HIDE))
+        # UPDATE обходит сигналы, поэтому затронутые значения
+        # пересчитываются явно.
+        if model is Review:
+            recompute_title_ratings(title_ids)
+            return Moderated(changed, 0, title_ids, review_ids)
+        recount_review_comments(review_ids)
+        return Moderated(0, changed, title_ids, review_ids)
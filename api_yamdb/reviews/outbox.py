@@ -0,0 +1,124 @@
+import smtplib
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+Delivery = namedtuple("Delivery", ("sent", "failed"))
+
+# Отказы сервера для отдельного письма: smtplib после них сбрасывает
+# сеанс командой RSET, и соединение годится для следующих писем.
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """Ставит письмо в очередь в текущей транзакции.
+
+    Письмо уходит, только если транзакция зафиксирована: отправляет его
+    команда send_outbox, а при EMAIL_OUTBOX_SEND_ON_COMMIT — сам процесс
+    сразу после фиксации.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_EMAIL,
+        to=to,
+        send_after=timezone.now(),
+    )
+    if settings.EMAIL_OUTBOX_SEND_ON_COMMIT:
+        transaction.on_commit(lambda: send_batch(ids=(email.pk,)))
+    return email
+
+
+def claim_batch(batch_size, ids=None):
+    """Выбирает письма, время попытки которых наступило, и откладывает их
+    на EMAIL_OUTBOX_LEASE секунд, чтобы другой обработчик их не взял.
+
+    Если обработчик упадёт, не дойдя до отметки об отправке, письма
+    вернутся в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    pending = OutgoingEmail.objects.filter(send_after__lte=now)
+    if ids is not None:
+        pending = pending.filter(pk__in=ids)
+    with transaction.atomic():
+        emails = list(
+            pending.select_for_update(skip_locked=True)
+            .order_by("send_after", "id")[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(
+            send_after=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        )
+    return emails
+
+
+def retry_at(attempts, now):
+    """Время следующей попытки после attempts неудачных или None, если
+    попытки исчерпаны."""
+    delays = settings.EMAIL_OUTBOX_RETRY_DELAYS
+    if attempts > len(delays):
+        return None
+    return now + timedelta(seconds=delays[attempts - 1])
+
+
+def send_batch(batch_size=None, connection=None, ids=None):
+    """Отправляет пачку писем из очереди через одно открытое соединение.
+
+    Соединение открывается один раз на пачку, а письма передаются ему по
+    одному: send_messages со списком останавливается на первой ошибке и
+    не сообщает, какие письма ушли. Отказ сервера для письма
+    (MESSAGE_ERRORS) оставляет соединение рабочим; после прочих ошибок
+    оно открывается заново для следующего письма. Неотправленное письмо
+    получает следующую попытку по EMAIL_OUTBOX_RETRY_DELAYS.
+    """
+    emails = claim_batch(
+        batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, ids=ids
+    )
+    if not emails:
+        return Delivery(0, 0)
+    close = connection is None
+    connection = connection or get_connection()
+    sent, failed = [], []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=(email.to,),
+                connection=connection,
+            )
+            try:
+                connection.open()
+                connection.send_messages((message,))
+            except Exception as error:
+                if not isinstance(error, MESSAGE_ERRORS):
+                    connection.close()
+                failed.append((email, error))
+            else:
+                sent.append(email.pk)
+    finally:
+        if close:
+            connection.close()
+    now = timezone.now()
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        sent_at=now, send_after=None, attempts=F("attempts") + 1
+    )
+    for email, error in failed:
+        email.attempts += 1
+        email.send_after = retry_at(email.attempts, now)
+        email.last_error = f"{type(error).__name__}: {error}"
+        email.save(update_fields=("attempts", "send_after", "last_error"))
+    return Delivery(len(sent), len(failed))
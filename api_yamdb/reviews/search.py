@@ -0,0 +1,189 @@
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+TITLE_FTS_TABLE = "reviews_title_fts"
+# Совпадение в названии весит больше, чем в описании.
+TITLE_FTS_WEIGHTS = (10.0, 1.0)
+
+TOKEN = re.compile(r"\w+")
+# Фраза в кавычках или слово, за которым может следовать *.
+TEXT_TERM = re.compile(r'"([^"]*)"|(\w+)(\*?)')
+
+# Поиск по тексту отзывов и комментариев для модераторов.
+TEXT_FTS_TABLES = {
+    "reviews_review": "reviews_review_fts",
+    "reviews_comment": "reviews_comment_fts",
+}
+# snippet() размечает совпадения управляющими символами, которых нет
+# в тексте; после экранирования HTML они заменяются тегами <mark>.
+SNIPPET_MARKERS = ("\x02", "\x03")
+SNIPPET_TAGS = ("<mark>", "</mark>")
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 12
+
+
+def fts_triggers(table, columns):
+    """Триггеры, поддерживающие индекс FTS5 ``{table}_fts`` с внешним
+    содержимым при вставке, удалении и изменении columns."""
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            {insert}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            {delete}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_update
+        AFTER UPDATE OF {names} ON {table}
+        BEGIN
+            {delete}
+            {insert}
+        END
+        """,
+    )
+
+
+# SQLite пересоздаёт таблицу при AddField/AlterField и теряет триггеры,
+# поэтому такие миграции reviews_title заканчиваются
+# RunPython(create_title_fts_triggers), а миграции reviews_review и
+# reviews_comment — RunPython(create_text_fts_triggers).
+TITLE_FTS_TRIGGERS = fts_triggers("reviews_title", ("name", "description"))
+TEXT_FTS_TRIGGERS = {
+    table: fts_triggers(table, ("text",)) for table in TEXT_FTS_TABLES
+}
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def create_title_fts_triggers(apps, schema_editor):
+    """Восстанавливает триггеры индекса после пересоздания reviews_title."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in TITLE_FTS_TRIGGERS:
+        schema_editor.execute(statement)
+    schema_editor.execute(
+        f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES ('rebuild')"
+    )
+
+
+def create_text_fts_triggers(apps, schema_editor):
+    """Восстанавливает триггеры индексов текста отзывов и комментариев
+    после пересоздания их таблиц."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, fts in TEXT_FTS_TABLES.items():
+        for statement in TEXT_FTS_TRIGGERS[table]:
+            schema_editor.execute(statement)
+        schema_editor.execute(
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+        )
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово экранируется кавычками и ищется по префиксу, слова
+    объединяются через AND.
+    """
+    return " ".join(f'"{token}"*' for token in TOKEN.findall(text))
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения полнотекстовым поиском с ранжированием."""
+    if not fts_available():
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    weights = ", ".join(str(weight) for weight in TITLE_FTS_WEIGHTS)
+    # Таблица FTS присоединяется к выборке, чтобы bm25() вычислялся один
+    # раз на найденную строку, а не коррелированным подзапросом.
+    return queryset.extra(
+        tables=(TITLE_FTS_TABLE,),
+        where=(
+            f'{TITLE_FTS_TABLE}.rowid = "{table}"."id"',
+            f"{TITLE_FTS_TABLE} MATCH %s",
+        ),
+        params=(match,),
+        select={"search_rank": f"bm25({TITLE_FTS_TABLE}, {weights})"},
+    ).order_by("search_rank", *queryset.query.order_by)
+
+
+def build_text_match_query(text):
+    """Запрос FTS5 для поиска модератора по тексту.
+
+    Слова ищутся целиком: префиксный запрос FTS5 собирает в памяти
+    списки всех подходящих слов и на миллионах строк становится в
+    десятки раз медленнее. Префикс включается явно звёздочкой
+    (``спам*``), текст в кавычках ищется как фраза.
+    """
+    terms = []
+    for phrase, word, star in TEXT_TERM.findall(text):
+        if word:
+            terms.append(f'"{word}"{star}')
+        elif TOKEN.search(phrase):
+            terms.append('"{}"'.format(" ".join(TOKEN.findall(phrase))))
+    return " ".join(terms)
+
+
+def search_text(queryset, text):
+    """Ищет отзывы или комментарии по тексту, новые первыми.
+
+    Порядок задаётся rowid таблицы FTS: FTS5 отдаёт совпадения уже
+    упорядоченными, поэтому страница читается без сортировки и без
+    ранжирования всех совпадений, а snippet() вычисляется только для
+    строк страницы. Каждая строка получает атрибут snippet — фрагмент
+    текста вокруг совпадений, размеченных SNIPPET_MARKERS (см.
+    highlight_snippet).
+    """
+    if not fts_available():
+        return queryset.filter(text__icontains=text).order_by("-pk")
+    match = build_text_match_query(text)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    fts = TEXT_FTS_TABLES[table]
+    return queryset.extra(
+        tables=(fts,),
+        where=(f'{fts}.rowid = "{table}"."id"', f"{fts} MATCH %s"),
+        params=(match,),
+        select={
+            "search_rowid": f"{fts}.rowid",
+            "snippet": f"snippet({fts}, 0, %s, %s, %s, %s)",
+        },
+        select_params=(
+            *SNIPPET_MARKERS, SNIPPET_ELLIPSIS, SNIPPET_TOKENS,
+        ),
+    ).order_by("-search_rowid")
+
+
+def highlight_snippet(snippet):
+    """Экранирует HTML во фрагменте и выделяет совпадения тегами
+    SNIPPET_TAGS."""
+    snippet = html.escape(snippet)
+    for marker, tag in zip(SNIPPET_MARKERS, SNIPPET_TAGS):
+        snippet = snippet.replace(marker, tag)
+    return snippet
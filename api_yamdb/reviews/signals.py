@@ -0,0 +1,70 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Comment, Review, Title
+from reviews.stats import (
+    change_comments_count,
+    change_title_scores,
+    forget_deleted_stats,
+    recompute_title_ratings,
+)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old_title_id, old_score, old_hidden = getattr(
+        instance, "_rating_state", (None, None, None)
+    )
+    if created:
+        if not instance.is_hidden:
+            change_title_scores(instance.title_id, added=[instance.score])
+    elif old_score is None or old_hidden is None:
+        recompute_title_ratings(
+            [pk for pk in (old_title_id, instance.title_id) if pk]
+        )
+    else:
+        # Скрытый отзыв не входит в рейтинг произведения.
+        removed = () if old_hidden else (old_score,)
+        added = () if instance.is_hidden else (instance.score,)
+        if old_title_id == instance.title_id:
+            change_title_scores(
+                instance.title_id, added=added, removed=removed
+            )
+        else:
+            change_title_scores(old_title_id, removed=removed)
+            change_title_scores(instance.title_id, added=added)
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    if not instance.is_hidden:
+        change_title_scores(instance.title_id, removed=[instance.score])
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    was_hidden = True if created else getattr(instance, "_was_hidden", None)
+    if was_hidden is not None and was_hidden != instance.is_hidden:
+        change_comments_count(
+            instance.review_id, -1 if instance.is_hidden else 1
+        )
+    instance._was_hidden = instance.is_hidden
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    if not instance.is_hidden:
+        change_comments_count(instance.review_id, -1)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def forget_stats_of_deleted(sender, instance, **kwargs):
+    # Порядок удаления моделей в каскаде не гарантирован, поэтому
+    # удалённые объекты запоминаются до конца блока deferred_stats.
+    forget_deleted_stats(sender, instance.pk)
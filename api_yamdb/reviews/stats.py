@@ -0,0 +1,267 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from threading import local
+
+from django.db import models, transaction
+from django.db.models import (
+    Case, Count, F, OuterRef, Subquery, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Concat, LPad, Substr
+
+from reviews.fields import EMPTY_HISTOGRAM, HISTOGRAM_WIDTH, SCORE_BUCKETS
+from reviews.models import Comment, Review, Title
+
+RECOMPUTE_BATCH_SIZE = 1000
+
+# Приращение гистограммы вкладывает выражение корзины в выражение
+# предыдущей, поэтому UPDATE с большим числом затронутых корзин
+# заменяется пересчётом по отзывам.
+INCREMENTAL_BUCKETS = 2
+
+_deferred = local()
+
+
+def nonzero(deltas):
+    # Унарный плюс Counter отбросил бы и отрицательные изменения.
+    return Counter({key: delta for key, delta in deltas.items() if delta})
+
+
+class PendingStats:
+    """Изменения, накопленные блоком deferred_stats."""
+
+    def __init__(self):
+        self.scores = defaultdict(Counter)
+        self.comments = Counter()
+        self.deleted = {Title: set(), Review: set()}
+
+    def titles(self):
+        titles = {
+            pk: nonzero(deltas) for pk, deltas in self.scores.items()
+            if pk not in self.deleted[Title]
+        }
+        return {pk: deltas for pk, deltas in titles.items() if deltas}
+
+    def reviews(self):
+        return {
+            pk: delta for pk, delta in self.comments.items()
+            if pk not in self.deleted[Review] and delta
+        }
+
+
+def pending_stats():
+    """Изменения открытого блока deferred_stats или None."""
+    return getattr(_deferred, "pending", None)
+
+
+@contextmanager
+def deferred_stats():
+    """Откладывает обновление рейтингов и счётчиков до конца блока.
+
+    Внутри блока изменения копятся по произведениям и отзывам и на выходе
+    применяются в той же транзакции: каскадное удаление обходится одним
+    пересчётом вместо UPDATE на каждую удалённую строку. Изменения
+    удалённых в блоке объектов отбрасываются. Вложенный блок
+    присоединяется к внешнему.
+    """
+    if pending_stats() is not None:
+        yield
+        return
+    _deferred.pending = PendingStats()
+    try:
+        with transaction.atomic():
+            yield
+            pending, _deferred.pending = _deferred.pending, None
+            apply_deferred_stats(pending)
+    finally:
+        _deferred.pending = None
+
+
+def forget_deleted_stats(model, pk):
+    pending = pending_stats()
+    if pending is not None:
+        pending.deleted[model].add(pk)
+
+
+def apply_deferred_stats(pending):
+    """Одно произведение или отзыв обновляется приращением, несколько —
+    общим пересчётом."""
+    titles = pending.titles()
+    if len(titles) == 1 and len(*titles.values()) <= INCREMENTAL_BUCKETS:
+        [(title_id, deltas)] = titles.items()
+        update_title_scores(title_id, deltas)
+    elif titles:
+        recompute_title_ratings(list(titles))
+    reviews = pending.reviews()
+    if len(reviews) == 1:
+        [(review_id, delta)] = reviews.items()
+        change_comments_count(review_id, delta)
+    elif reviews:
+        recount_review_comments(list(reviews))
+
+
+def shift_histogram(histogram, score, delta):
+    """Выражение, прибавляющее delta к корзине score упакованной
+    гистограммы."""
+    start = (score - 1) * HISTOGRAM_WIDTH
+    bucket = Cast(
+        Substr(histogram, start + 1, HISTOGRAM_WIDTH), models.IntegerField()
+    ) + delta
+    parts = [LPad(
+        Cast(bucket, models.CharField()), HISTOGRAM_WIDTH, Value("0")
+    )]
+    if start:
+        parts.insert(0, Substr(histogram, 1, start))
+    if score < SCORE_BUCKETS:
+        parts.append(Substr(histogram, start + HISTOGRAM_WIDTH + 1))
+    if len(parts) == 1:
+        return parts[0]
+    return Concat(*parts, output_field=models.CharField())
+
+
+def change_title_scores(title_id, added=(), removed=()):
+    """Учитывает добавленные и убранные оценки произведения: сумму, число
+    оценок, рейтинг и гистограмму."""
+    deltas = Counter(int(score) for score in added)
+    deltas.subtract(int(score) for score in removed)
+    deltas = nonzero(deltas)
+    if title_id is None or not deltas:
+        return
+    pending = pending_stats()
+    if pending is not None:
+        pending.scores[title_id].update(deltas)
+        return
+    update_title_scores(title_id, deltas)
+
+
+def update_title_scores(title_id, deltas):
+    """Одним UPDATE прибавляет к корзинам гистограммы deltas
+    {оценка: изменение} и обновляет сумму, число оценок и рейтинг."""
+    score_delta = sum(score * delta for score, delta in deltas.items())
+    count_delta = sum(deltas.values())
+    histogram = F("score_histogram")
+    for score, delta in sorted(deltas.items()):
+        histogram = shift_histogram(histogram, score, delta)
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F("rating_sum") + score_delta,
+        rating_count=F("rating_count") + count_delta,
+        rating=Case(
+            When(rating_count__lte=-count_delta, then=Value(None)),
+            default=(
+                (F("rating_sum") + score_delta)
+                / (F("rating_count") + count_delta)
+            ),
+            output_field=models.PositiveSmallIntegerField(),
+        ),
+        score_histogram=histogram,
+    )
+
+
+def recompute_title_ratings(title_ids=None, batch_size=RECOMPUTE_BATCH_SIZE):
+    """Пересчитывает рейтинги и гистограммы оценок одним сгруппированным
+    проходом по отзывам.
+
+    Возвращает количество произведений, у которых значения изменились.
+    """
+    reviews = Review.objects.filter(is_hidden=False).order_by().values(
+        "title", "score"
+    )
+    titles = Title.objects.order_by("pk").only(
+        "rating_sum", "rating_count", "rating", "score_histogram"
+    )
+    if title_ids is not None:
+        reviews = reviews.filter(title__in=title_ids)
+        titles = titles.filter(pk__in=title_ids)
+    histograms = defaultdict(lambda: list(EMPTY_HISTOGRAM))
+    for row in reviews.annotate(score_count=Count("pk")):
+        histograms[row["title"]][row["score"] - 1] = row["score_count"]
+    changed = []
+    for title in titles.iterator(chunk_size=batch_size):
+        histogram = tuple(histograms.get(title.pk, EMPTY_HISTOGRAM))
+        rating_count = sum(histogram)
+        rating_sum = sum(
+            score * count for score, count in enumerate(histogram, 1)
+        )
+        rating = rating_sum // rating_count if rating_count else None
+        if (
+            title.rating_sum, title.rating_count, title.rating,
+            title.score_histogram,
+        ) == (rating_sum, rating_count, rating, histogram):
+            continue
+        title.rating_sum = rating_sum
+        title.rating_count = rating_count
+        title.rating = rating
+        title.score_histogram = histogram
+        changed.append(title)
+    Title.objects.bulk_update(
+        changed,
+        ("rating_sum", "rating_count", "rating", "score_histogram"),
+        batch_size=batch_size,
+    )
+    return len(changed)
+
+
+def change_comments_count(review_id, delta):
+    if review_id is None or not delta:
+        return
+    pending = pending_stats()
+    if pending is not None:
+        pending.comments[review_id] += delta
+        return
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F("comments_count") + delta
+    )
+
+
+def count_rows(model, field):
+    """Подзапрос с числом нескрытых строк model, ссылающихся на внешнюю
+    строку через field."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")}, is_hidden=False)
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def recount_review_comments(review_ids):
+    """Пересчитывает comments_count перечисленных отзывов одним UPDATE."""
+    return Review.objects.filter(pk__in=review_ids).update(
+        comments_count=count_rows(Comment, "review")
+    )
+
+
+# Счётчик модели и подзапрос с его фактическим значением. Число отзывов
+# произведения хранится в rating_count: у каждого отзыва есть оценка.
+# Скрытые модератором отзывы и комментарии не учитываются.
+COUNTERS = {
+    Title: ("rating_count", lambda: count_rows(Review, "title")),
+    Review: ("comments_count", lambda: count_rows(Comment, "review")),
+}
+
+
+def find_counter_drift(model, batch_size=RECOMPUTE_BATCH_SIZE):
+    """Порциями по первичному ключу ищет объекты, чей счётчик расходится
+    с фактическим числом строк, и возвращает их id по порциям."""
+    field, actual = COUNTERS[model]
+    last_pk = 0
+    while True:
+        rows = list(
+            model.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .annotate(actual=actual())
+            .values_list("pk", field, "actual")[:batch_size]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield [pk for pk, stored, counted in rows if stored != counted]
+
+
+def repair_counters(model, pks):
+    if model is Title:
+        return recompute_title_ratings(pks)
+    return recount_review_comments(pks)
@@ -0,0 +1,71 @@
+"""Стоимость аутентификации запроса по JWT::
+
+    python -m benchmarks.bench_auth --repeat 2000
+
+Сравнивает чтение пользователя из базы (JWTAuthentication simplejwt),
+токен с claims и токен без claims с кэшем пользователей процесса на
+GET /api/v1/categories/.
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--db', default=':memory:')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from rest_framework.views import APIView
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import ClaimsJWTAuthentication, issue_token
+
+    user = get_user_model().objects.create_user(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    cases = (
+        ('simplejwt, пользователь из базы', JWTAuthentication,
+         AccessToken.for_user(user)),
+        ('claims токена', ClaimsJWTAuthentication, issue_token(user)),
+        ('без claims, кэш процесса', ClaimsJWTAuthentication,
+         AccessToken.for_user(user)),
+    )
+    APIView.throttle_classes = ()
+
+    def request(authentication, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        def get():
+            APIView.authentication_classes = (authentication,)
+            assert client.get('/api/v1/categories/').status_code == 200
+        return get
+
+    requests = [request(authentication, token) for _, authentication, token
+                in cases]
+    # Прогрев всех вариантов, чтобы первый не платил за холодный процесс.
+    for get in requests * (args.repeat // 10):
+        get()
+    rows = []
+    for (label, _, _), get in zip(cases, requests):
+        timings = measure(get, args.repeat)
+        with CaptureQueriesContext(connection) as queries:
+            get()
+        rows.append((
+            label, *(f'{value:.3f}' for value in timings),
+            len(queries.captured_queries),
+        ))
+    print(f'GET /api/v1/categories/, {args.repeat} запросов, мс')
+    print_table(('аутентификация', 'p50', 'p95', 'SQL'), rows)
+
+
+if __name__ == '__main__':
+    main()
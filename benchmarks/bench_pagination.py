@@ -0,0 +1,65 @@
+"""Первая и глубокая страница списка произведений: OFFSET против курсора::
+
+    python -m benchmarks.bench_pagination --titles 100000 --page 10000
+"""
+import argparse
+import base64
+import json
+
+from benchmarks.utils import create_catalog, measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--page', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIClient
+
+    from api.views import TitleViewSet
+
+    create_catalog(args.titles)
+    client = APIClient()
+    page_size = api_settings.PAGE_SIZE
+    deep_page = min(args.page, args.titles // page_size)
+
+    def cursor_for_page(page):
+        if page == 1:
+            return ''
+        last = TitleViewSet.queryset.order_by('-year', 'name', 'id')[
+            (page - 1) * page_size - 1
+        ]
+        payload = json.dumps({'p': [last.year, last.name, last.pk]})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def get(url):
+        def request():
+            cache.clear()
+            assert client.get(url).status_code == 200
+        return request
+
+    rows = []
+    for page in (1, deep_page):
+        offset = measure(get(f'/api/v1/titles/?page={page}'), args.repeat)
+        cursor = measure(
+            get(f'/api/v1/titles/?cursor={cursor_for_page(page)}'),
+            args.repeat,
+        )
+        rows.append((
+            page, *(f'{value:.2f}' for value in offset),
+            *(f'{value:.2f}' for value in cursor),
+        ))
+    print(f'Произведений: {args.titles}, GET /api/v1/titles/, мс')
+    print_table(
+        ('страница', 'page p50', 'page p95', 'cursor p50', 'cursor p95'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Задержка списка произведений в зависимости от числа отзывов.
+
+Сравнивает прежний запрос с ``annotate(rating=Avg("reviews__score"))`` и
+чтение сохранённого рейтинга::
+
+    python -m benchmarks.bench_rating --titles 500 --volumes 0 10 100 400
+"""
+import argparse
+
+from benchmarks.utils import (
+    create_catalog, create_reviews, create_users, measure, print_table,
+    setup_django
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=500)
+    parser.add_argument(
+        '--volumes', type=int, nargs='+', default=[0, 10, 100, 400],
+        help='число отзывов на одно произведение',
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.db.models import Avg
+    from rest_framework.test import APIClient
+
+    from api.views import TitleViewSet
+    from reviews.models import Review, Title
+    from reviews.stats import recompute_title_ratings
+
+    title_ids = create_catalog(args.titles)
+    user_ids = create_users(max(args.volumes))
+    stored_queryset = TitleViewSet.queryset
+    legacy_queryset = stored_queryset.annotate(
+        legacy_rating=Avg('reviews__score')
+    )
+    client = APIClient()
+
+    def list_titles():
+        cache.clear()
+        assert client.get('/api/v1/titles/').status_code == 200
+
+    rows = []
+    created = 0
+    for volume in sorted(args.volumes):
+        create_reviews(title_ids, user_ids[created:volume], volume - created)
+        created = volume
+        recompute_title_ratings()
+        TitleViewSet.queryset = legacy_queryset
+        legacy = measure(list_titles, args.repeat)
+        TitleViewSet.queryset = stored_queryset
+        stored = measure(list_titles, args.repeat)
+        rows.append((
+            Review.objects.count(), *(f'{value:.2f}' for value in legacy),
+            *(f'{value:.2f}' for value in stored),
+            f'{legacy[0] / stored[0]:.1f}x',
+        ))
+    print(f'Произведений: {Title.objects.count()}, GET /api/v1/titles/, мс')
+    print_table(
+        ('отзывов', 'Avg p50', 'Avg p95', 'stored p50', 'stored p95',
+         'ускорение'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Поиск модератора по тексту отзывов: LIKE против FTS5::
+
+    python -m benchmarks.bench_review_search --reviews 1000000
+"""
+import argparse
+
+from benchmarks.utils import (
+    create_catalog, create_reviews, create_users, measure, print_table,
+    setup_django
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--per-title', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    from reviews import search
+    from reviews.models import Review
+
+    title_ids = create_catalog(max(1, args.reviews // args.per_title))
+    user_ids = create_users(args.per_title)
+    create_reviews(title_ids, user_ids, args.per_title)
+    moderator = get_user_model().objects.get(pk=user_ids[0])
+    moderator.role = moderator.MODERATOR
+    moderator.save()
+    client = APIClient()
+    client.force_authenticate(moderator)
+    rare = f'Отзыв {args.per_title // 2} на произведение {title_ids[-1]}'
+    fts_available = search.fts_available
+
+    def get(query, fts):
+        def request():
+            search.fts_available = lambda: fts and fts_available()
+            response = client.get(
+                '/api/v1/moderation/reviews/', {'search': query}
+            )
+            assert response.status_code == 200
+        return request
+
+    rows = []
+    for label, query in (('редкая фраза', rare), ('частое слово', 'отзыв')):
+        for mode, fts in (('LIKE', False), ('FTS5', True)):
+            timings = measure(get(query, fts), args.repeat)
+            rows.append((label, mode, *(f'{v:.2f}' for v in timings)))
+    search.fts_available = fts_available
+    print(
+        f'Отзывов: {Review.objects.count()}, '
+        'GET /api/v1/moderation/reviews/?search=, мс'
+    )
+    print_table(('запрос', 'режим', 'p50', 'p95'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Поиск произведений: ``?name=`` (LIKE) против ``?search=`` (FTS5)::
+
+    python -m benchmarks.bench_search --titles 1000000
+"""
+import argparse
+
+from benchmarks.utils import create_catalog, measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+
+    create_catalog(args.titles)
+    client = APIClient()
+    rare = str(args.titles // 2 + 7)
+
+    def get(url):
+        def request():
+            cache.clear()
+            assert client.get(url).status_code == 200
+        return request
+
+    rows = []
+    for label, query in (('редкое слово', rare),
+                         ('частое слово', 'произведение')):
+        for mode in ('name', 'search'):
+            timings = measure(
+                get(f'/api/v1/titles/?{mode}={query}'), args.repeat
+            )
+            rows.append((label, mode, *(f'{v:.2f}' for v in timings)))
+    print(f'Произведений: {args.titles}, GET /api/v1/titles/, мс')
+    print_table(('запрос', 'режим', 'p50', 'p95'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Регистрация с медленным почтовым сервером: отправка письма в запросе
+против очереди писем::
+
+    python -m benchmarks.bench_signup --signups 200 --connect-ms 100
+
+Почтовый сервер имитирует SlowEmailBackend: открытие соединения стоит
+--connect-ms, каждое письмо — --send-ms.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from django.conf import settings
+from django.core.mail.backends import locmem
+
+from benchmarks.utils import print_table, setup_django
+
+
+class SlowEmailBackend(locmem.EmailBackend):
+    """Задержки в секундах берутся из settings.SLOW_EMAIL_DELAYS: под
+    ``python -m`` бэкенд импортируется вторым экземпляром модуля и не
+    видит глобальных переменных ``__main__``."""
+
+    def open(self):
+        if getattr(self, 'opened', False):
+            return False
+        time.sleep(settings.SLOW_EMAIL_DELAYS['connect'])
+        self.opened = True
+        return True
+
+    def close(self):
+        self.opened = False
+
+    def send_messages(self, messages):
+        created = self.open()
+        time.sleep(settings.SLOW_EMAIL_DELAYS['send'] * len(messages))
+        sent = super().send_messages(messages)
+        if created:
+            self.close()
+        return sent
+
+
+def percentile(timings, point):
+    return timings[min(len(timings) - 1, int(len(timings) * point))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--signups', type=int, default=200)
+    parser.add_argument('--connect-ms', type=float, default=100)
+    parser.add_argument('--send-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core import mail
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+
+    settings.EMAIL_BACKEND = 'benchmarks.bench_signup.SlowEmailBackend'
+    settings.SLOW_EMAIL_DELAYS = {
+        'connect': args.connect_ms / 1000, 'send': args.send_ms / 1000,
+    }
+    mail.outbox = []
+    client = APIClient()
+    rows = []
+    for mode, on_commit in (('в запросе', True), ('очередь', False)):
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = on_commit
+        timings = []
+        for index in range(args.signups):
+            username = f'{"inline" if on_commit else "queued"}{index}'
+            started = time.perf_counter()
+            response = client.post('/api/v1/auth/signup/', {
+                'username': username, 'email': f'{username}@yamdb.fake',
+            })
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200
+        timings.sort()
+        drain = '-'
+        if not on_commit:
+            started = time.perf_counter()
+            call_command('send_outbox', stdout=io.StringIO())
+            elapsed = (time.perf_counter() - started) * 1000
+            drain = f'{elapsed / args.signups:.2f}'
+        rows.append((
+            mode,
+            *(f'{value:.2f}' for value in (
+                statistics.median(timings),
+                percentile(timings, 0.95),
+                percentile(timings, 0.99),
+            )),
+            drain,
+        ))
+    assert len(mail.outbox) == 2 * args.signups
+    print(
+        f'Регистраций: {args.signups}, соединение {args.connect_ms} мс, '
+        f'письмо {args.send_ms} мс; POST /api/v1/auth/signup/, мс'
+    )
+    print_table(('письмо', 'p50', 'p95', 'p99', 'отправка/письмо'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Накладные расходы ограничения частоты запросов::
+
+    python -m benchmarks.bench_throttle --repeat 2000
+
+Сравнивает списание токенов хранилищами корзин и GET карточки
+произведения без ограничения и с ним.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import create_catalog, measure, print_table, setup_django
+
+
+def per_call(func, repeat):
+    """Среднее время одного вызова func в микросекундах."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from rest_framework.views import APIView
+
+    from api.throttling import TokenBucketThrottle, load_store
+
+    directory = tempfile.mkdtemp()
+    stores = (
+        ('кэш', 'api.throttling.CacheBucketStore', {}),
+        ('SQLite', 'api.throttling.SQLiteBucketStore',
+         {'path': str(Path(directory) / 'throttle.sqlite3')}),
+    )
+    rows = []
+    for label, backend, options in stores:
+        store = load_store(backend, tuple(options.items()))
+        elapsed = per_call(
+            lambda: store.take('key', 1, 10 ** 9, 1), args.repeat
+        )
+        rows.append((f'take(), {label}', 'мкс', f'{elapsed:.1f}'))
+
+    [title_id] = create_catalog(1)
+    client = APIClient()
+    url = f'/api/v1/titles/{title_id}/'
+    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['anon'] = '1000000/s'
+
+    def get():
+        assert client.get(url).status_code == 200
+
+    APIView.throttle_classes = ()
+    p50, _ = measure(get, args.repeat)
+    rows.append(('GET без ограничения', 'мс', f'{p50:.3f}'))
+    APIView.throttle_classes = (TokenBucketThrottle,)
+    for label, backend, options in stores:
+        settings.THROTTLE_STORE = {'BACKEND': backend, 'OPTIONS': options}
+        p50, _ = measure(get, args.repeat)
+        rows.append((f'GET, {label}', 'мс', f'{p50:.3f}'))
+    print(f'GET {url}, медиана из {args.repeat}')
+    print_table(('операция', 'ед.', 'время'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Скорость загрузки каталога: POST /titles/ по одному против
+POST /titles/bulk/::
+
+    python -m benchmarks.bench_title_bulk --single 500 --sizes 1000 10000 50000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.utils import create_catalog, print_table, setup_django
+
+
+def build_payload(count, offset):
+    return [
+        {
+            'name': f'Импорт {offset + i}',
+            'year': 1900 + i % 120,
+            'description': f'Описание импортированного произведения {i}',
+            'genre': [f'genre-{i % 5}', f'genre-{(i + 1) % 5}'],
+            'category': f'category-{i % 3}',
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--single', type=int, default=500,
+                        help='число произведений для поштучной загрузки')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    create_catalog(0)
+    User = get_user_model()
+    client = APIClient()
+    client.force_authenticate(User(username='bench-admin', role=User.ADMIN))
+    rows = []
+    offset = 0
+
+    start = time.perf_counter()
+    for item in build_payload(args.single, offset):
+        response = client.post('/api/v1/titles/', item, format='json')
+        assert response.status_code == 201, response.content
+    elapsed = time.perf_counter() - start
+    offset += args.single
+    rows.append(('по одному', args.single, f'{elapsed:.2f}',
+                 f'{args.single / elapsed:.0f}'))
+
+    for size in args.sizes:
+        body = json.dumps(build_payload(size, offset))
+        offset += size
+        start = time.perf_counter()
+        response = client.post(
+            '/api/v1/titles/bulk/', body, content_type='application/json'
+        )
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 201, response.content[:500]
+        rows.append(('bulk', size, f'{elapsed:.2f}', f'{size / elapsed:.0f}'))
+    print_table(('режим', 'произведений', 'с', 'произведений/с'), rows)
+
+
+if __name__ == '__main__':
+    main()
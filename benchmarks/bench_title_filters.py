@@ -0,0 +1,74 @@
+"""Комбинированные фильтры списка произведений на большом каталоге::
+
+    python -m benchmarks.bench_title_filters --titles 200000
+"""
+import argparse
+
+from benchmarks.utils import create_catalog, measure, print_table, setup_django
+
+FILTERS = (
+    'genre=genre-0,genre-1',
+    'genre=genre-0,genre-1&genre_match=all',
+    'category=category-0,category-1',
+    'year_min=1990&year_max=2000',
+    'rating_min=9',
+    'genre=genre-0,genre-1&year_min=1990&year_max=2000',
+    'genre=genre-0,genre-1&category=category-0&rating_min=8',
+    'genre=genre-0,genre-2&genre_match=all&year_min=1990&rating_min=5',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.db.models import F
+    from django.db.models.functions import Mod
+    from rest_framework.test import APIClient
+
+    from reviews.models import Title
+
+    title_ids = create_catalog(args.titles)
+    Title.objects.update(rating=Mod(F('id'), 10) + 1)
+    # Каждое третье произведение получает второй жанр, чтобы условие
+    # «все жанры» находило совпадения.
+    through = Title.genre.through
+    genre_ids = dict(
+        Title.genre.field.related_model.objects.values_list('slug', 'pk')
+    )
+    through.objects.bulk_create(
+        (
+            through(title_id=pk, genre_id=genre_ids['genre-2'])
+            for pk in title_ids[::3] if pk % len(genre_ids) != 2
+        ),
+        batch_size=5000,
+    )
+    client = APIClient()
+
+    def get(url):
+        def request():
+            cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200
+            return response
+        return request
+
+    rows = []
+    for query in FILTERS:
+        for mode in ('', '&count=none'):
+            url = f'/api/v1/titles/?{query}{mode}'
+            count = get(url)().json().get('count', '-')
+            rows.append((
+                query + mode, count,
+                *(f'{value:.2f}' for value in measure(get(url), args.repeat)),
+            ))
+    print(f'Произведений: {args.titles}, GET /api/v1/titles/, мс')
+    print_table(('фильтр', 'count', 'p50', 'p95'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Скорость сборки ответа со списком произведений.
+
+Сравнивает TitleSerializer на экземплярах моделей и быстрое чтение через
+values() (настройка ``TITLE_FAST_READ``)::
+
+    python -m benchmarks.bench_title_read --titles 2000 --page-sizes 10 1000
+"""
+import argparse
+
+from benchmarks.utils import create_catalog, measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument(
+        '--page-sizes', type=int, nargs='+', default=[10, 100, 1000],
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+
+    from api.pagination import YamdbPagination
+
+    create_catalog(args.titles)
+    client = APIClient()
+
+    def list_titles():
+        cache.clear()
+        assert client.get('/api/v1/titles/').status_code == 200
+
+    rows = []
+    for page_size in args.page_sizes:
+        YamdbPagination.page_size = page_size
+        timings = []
+        for fast_read in (False, True):
+            settings.TITLE_FAST_READ = fast_read
+            timings.append(measure(list_titles, args.repeat))
+        (serializer, _), (fast, _) = timings
+        rows.append((
+            page_size,
+            f'{serializer:.2f}', f'{page_size / serializer * 1000:.0f}',
+            f'{fast:.2f}', f'{page_size / fast * 1000:.0f}',
+            f'{serializer / fast:.1f}x',
+        ))
+    print(f'Произведений: {args.titles}, GET /api/v1/titles/, p50')
+    print_table(
+        ('page_size', 'serializer мс', 'строк/с', 'values() мс', 'строк/с',
+         'ускорение'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
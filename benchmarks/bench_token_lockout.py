@@ -0,0 +1,81 @@
+"""Стоимость отклонения перебора кодов подтверждения::
+
+    python -m benchmarks.bench_token_lockout --repeat 2000
+
+Сравнивает POST /api/v1/auth/token/ с неверным кодом, который доходит до
+базы, и тот же запрос после блокировки по счётчикам в кэше.
+"""
+import argparse
+from types import SimpleNamespace
+
+from benchmarks.bench_throttle import per_call
+from benchmarks.utils import create_users, measure, print_table, setup_django
+
+URL = '/api/v1/auth/token/'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.exceptions import Throttled
+    from rest_framework.test import APIClient
+    from rest_framework.views import APIView
+
+    from api.lockout import attempt_keys, check_attempts
+    from reviews.confirmation import store_code
+
+    APIView.throttle_classes = ()
+    [user_id] = create_users(1)
+    user = get_user_model().objects.get(pk=user_id)
+    store_code(user, '13579')
+    client = APIClient()
+    data = {'username': user.username, 'confirmation_code': '00000'}
+
+    def post(expected):
+        def run():
+            assert client.post(URL, data).status_code == expected
+        return run
+
+    rows = []
+    settings.AUTH_LOCKOUT_FAILURES = {'username': 10 ** 9, 'ip': 10 ** 9}
+    with CaptureQueriesContext(connection) as queries:
+        p50, _ = measure(post(400), args.repeat)
+    rows.append((
+        'неверный код', f'{p50:.3f}',
+        len(queries.captured_queries) // (args.repeat + 2),
+    ))
+
+    settings.AUTH_LOCKOUT_FAILURES = {'username': 0, 'ip': 0}
+    settings.AUTH_LOCKOUT_BASE_DELAY = 10 ** 6
+    client.post(URL, data)
+    with CaptureQueriesContext(connection) as queries:
+        p50, _ = measure(post(429), args.repeat)
+    rows.append((
+        'заблокирован', f'{p50:.3f}',
+        len(queries.captured_queries) // (args.repeat + 2),
+    ))
+
+    keys = attempt_keys(
+        SimpleNamespace(data=data, META={'REMOTE_ADDR': '127.0.0.1'})
+    )
+
+    def check():
+        try:
+            check_attempts(keys)
+        except Throttled:
+            pass
+
+    print(f'POST {URL}, медиана из {args.repeat}')
+    print_table(('запрос', 'мс', 'SQL на запрос'), rows)
+    print(f'check_attempts(): {per_call(check, args.repeat):.1f} мкс')
+
+
+if __name__ == '__main__':
+    main()
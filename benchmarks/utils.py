@@ -0,0 +1,125 @@
+"""Общие помощники для бенчмарков.
+
+Бенчмарки запускаются из корня репозитория, например
+``python -m benchmarks.bench_rating``. По умолчанию используется временная
+база SQLite в памяти, поэтому рабочая база не затрагивается.
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+
+
+def setup_django(db_name=':memory:'):
+    """Настраивает Django на отдельную базу и применяет миграции."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_name
+    settings.DEBUG = False
+    # Бенчмарки повторяют запросы тысячи раз: корзины ограничения частоты
+    # держатся в кэше процесса и не исчерпываются.
+    settings.THROTTLE_STORE = {'BACKEND': 'api.throttling.CacheBucketStore'}
+    rates = settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {
+        scope: '1000000000/s' for scope in rates
+    }
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def measure(func, repeat=20, warmup=2):
+    """Возвращает медиану и p95 времени выполнения func в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return (
+        statistics.median(timings),
+        timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    )
+
+
+def print_table(header, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(header, *rows)
+    ]
+    for row in (header, *rows):
+        print('  '.join(str(v).rjust(w) for v, w in zip(row, widths)))
+
+
+def create_users(count, prefix='bench'):
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@yamdb.fake')
+        for i in range(count)
+    )
+    return list(
+        User.objects.filter(username__startswith=prefix)
+        .values_list('pk', flat=True)
+    )
+
+
+def create_catalog(titles, genres=5, categories=3, batch_size=5000):
+    """Создаёт справочники и произведения, возвращает id произведений."""
+    from reviews.models import Category, Genre, Title
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(categories)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(genres)
+    )
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    genre_ids = list(Genre.objects.values_list('pk', flat=True))
+    Title.objects.bulk_create(
+        (
+            Title(
+                name=f'Произведение {i}',
+                year=1900 + i % 120,
+                description=f'Описание произведения номер {i}',
+                category_id=category_ids[i % len(category_ids)],
+            )
+            for i in range(titles)
+        ),
+        batch_size=batch_size,
+    )
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    through = Title.genre.through
+    through.objects.bulk_create(
+        (
+            through(title_id=pk, genre_id=genre_ids[pk % len(genre_ids)])
+            for pk in title_ids
+        ),
+        batch_size=batch_size,
+    )
+    return title_ids
+
+
+def create_reviews(title_ids, user_ids, per_title, batch_size=5000):
+    """Создаёт отзывы через bulk_create, минуя сигналы модели Review."""
+    from reviews.models import Review
+    Review.objects.bulk_create(
+        (
+            Review(
+                title_id=title_id,
+                author_id=user_ids[i],
+                text=f'Отзыв {i} на произведение {title_id}',
+                score=(title_id + i) % 10 + 1,
+            )
+            for title_id in title_ids
+            for i in range(per_title)
+        ),
+        batch_size=batch_size,
+    )
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,25 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш переживает очистку базы между тестами, поэтому сбрасывается."""
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def send_outbox_on_commit(settings):
+    """Письма из очереди уходят сразу после фиксации транзакции запроса,
+    поэтому тесты проверяют mail.outbox без обработчика очереди."""
+    settings.EMAIL_OUTBOX_SEND_ON_COMMIT = True
+
+
+@pytest.fixture(autouse=True)
+def throttle_in_cache(settings):
+    """Корзины ограничения частоты хранятся в кэше, который очищается
+    перед каждым тестом."""
+    settings.THROTTLE_STORE = {'BACKEND': 'api.throttling.CacheBucketStore'}
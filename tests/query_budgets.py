@@ -0,0 +1,342 @@
+"""Бюджеты SQL-запросов для всех маршрутов API.
+
+Таблица ``BUDGETS`` — единственное место, где задаются ожидаемый статус
+и максимальное число запросов для каждого маршрута, метода и роли.
+Любое изменение бюджета видно в ревью как правка этой таблицы, а тест
+``test_21_query_budgets`` проверяет, что в таблице описан каждый
+маршрут из ``api/urls.py``.
+
+Число запросов включает загрузку пользователя при аутентификации по
+токену, поэтому у анонима бюджет обычно на единицу меньше.
+"""
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.urls import URLPattern, URLResolver, reverse
+
+from reviews.confirmation import store_code
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.stats import recompute_title_ratings
+
+User = get_user_model()
+
+ANON = 'anon'
+USER = 'user'
+MODERATOR = 'moderator'
+ADMIN = 'admin'
+ROLES = (ANON, USER, MODERATOR, ADMIN)
+ROLE_CLIENTS = {
+    ANON: 'client',
+    USER: 'user_client',
+    MODERATOR: 'moderator_client',
+    ADMIN: 'admin_client',
+}
+
+# Размер набора данных: каждый список должен содержать больше строк,
+# чем самая крупная проверяемая страница.
+SEED_SIZE = 25
+PAGE_SIZES = (2, 20)
+CONFIRMATION_CODE = '24680'
+
+Budget = namedtuple(
+    'Budget', ('route', 'method', 'roles', 'params', 'data'),
+    defaults=({}, None),
+)
+
+
+def statuses(anon=None, user=None, moderator=None, admin=None, **shared):
+    """Собирает {роль: (статус, запросы)}; ``shared`` задаёт общее
+    значение для ролей, не указанных явно."""
+    given = {ANON: anon, USER: user, MODERATOR: moderator, ADMIN: admin}
+    default = shared.get('rest')
+    return {
+        role: value if value is not None else default
+        for role, value in given.items()
+    }
+
+
+DENIED_ANON = (401, 0)
+FORBIDDEN = (403, 1)
+
+BUDGETS = (
+    Budget('api-root', 'get', statuses(anon=(200, 0), rest=(200, 1))),
+
+    Budget('register', 'post', statuses(
+        anon=(200, 7), rest=(200, 8),
+    ), data={'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}),
+    Budget('token', 'post', statuses(
+        anon=(200, 3), rest=(200, 4),
+    ), data=lambda seed: {
+        'username': seed['author'], 'confirmation_code': CONFIRMATION_CODE,
+    }),
+
+    Budget('categories-list', 'get', statuses(
+        anon=(200, 2), rest=(200, 3),
+    )),
+    Budget('categories-list', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(201, 3),
+    ), data={'name': 'Новая категория', 'slug': 'new-category'}),
+    Budget('categories-detail', 'delete', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(204, 6),
+    )),
+
+    Budget('genres-list', 'get', statuses(anon=(200, 2), rest=(200, 3))),
+    Budget('genres-list', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(201, 3),
+    ), data={'name': 'Новый жанр', 'slug': 'new-genre'}),
+    Budget('genres-detail', 'delete', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(204, 5),
+    )),
+
+    Budget('titles-list', 'get', statuses(anon=(200, 3), rest=(200, 4))),
+    Budget('titles-list', 'get', statuses(anon=(200, 5), rest=(200, 6)),
+           params={'include': 'histogram,reviews'}),
+    Budget('titles-list', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(201, 9),
+    ), data=lambda seed: {
+        'name': 'Новое произведение', 'year': 2000,
+        'category': seed['slug'], 'genre': [seed['genre']],
+    }),
+    Budget('titles-detail', 'get', statuses(anon=(200, 2), rest=(200, 3))),
+    Budget('titles-detail', 'patch', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(200, 5),
+    ), data={'name': 'Переименованное произведение'}),
+    # Каскадное удаление пересчитывает рейтинги и счётчики один раз,
+    # а не на каждый удалённый отзыв или комментарий.
+    Budget('titles-detail', 'delete', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(204, 10),
+    )),
+    Budget('titles-bulk', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(201, 8),
+    ), data=lambda seed: [
+        {'name': f'Пакет {index}', 'year': 2000,
+         'category': seed['slug'], 'genre': [seed['genre']]}
+        for index in range(2)
+    ]),
+
+    Budget('reviews-list', 'get', statuses(anon=(200, 3), rest=(200, 4))),
+    Budget('reviews-list', 'post', statuses(
+        anon=DENIED_ANON, user=(400, 5), rest=(201, 5),
+    ), data={'text': 'Новый отзыв', 'score': 7}),
+    Budget('reviews-detail', 'get', statuses(anon=(200, 1), rest=(200, 2))),
+    Budget('reviews-detail', 'patch', statuses(
+        anon=DENIED_ANON, rest=(200, 4),
+    ), data={'text': 'Исправленный отзыв'}),
+    Budget('reviews-detail', 'delete', statuses(
+        anon=DENIED_ANON, rest=(204, 7),
+    )),
+
+    Budget('comments-list', 'get', statuses(anon=(200, 3), rest=(200, 4))),
+    Budget('comments-list', 'post', statuses(
+        anon=DENIED_ANON, rest=(201, 5),
+    ), data={'text': 'Новый комментарий'}),
+    Budget('comments-detail', 'get', statuses(
+        anon=(200, 1), rest=(200, 2),
+    )),
+    Budget('comments-detail', 'patch', statuses(
+        anon=DENIED_ANON, rest=(200, 4),
+    ), data={'text': 'Исправленный комментарий'}),
+    # Удаление комментария читает произведение его отзыва, чтобы сбросить
+    # ответы произведения с comments_count.
+    Budget('comments-detail', 'delete', statuses(
+        anon=DENIED_ANON, rest=(204, 6),
+    )),
+
+    Budget('user-list', 'get', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(200, 3),
+    )),
+    Budget('user-list', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(201, 4),
+    ), data={'username': 'created', 'email': 'created@yamdb.fake'}),
+    Budget('user-detail', 'get', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(200, 2),
+    )),
+    Budget('user-detail', 'patch', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(200, 4),
+    ), data={'bio': 'Новая биография'}),
+    Budget('user-detail', 'delete', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(204, 17),
+    )),
+    # Лента отзывов пользователя читается одним запросом вместе с
+    # произведениями.
+    Budget('user-reviews', 'get', statuses(anon=(200, 1), rest=(200, 2))),
+    Budget('user-my-reviews', 'get', statuses(
+        anon=DENIED_ANON, rest=(200, 2),
+    )),
+    Budget('user-get-patch-current-user-info', 'get', statuses(
+        anon=DENIED_ANON, rest=(200, 1),
+    )),
+    Budget('user-get-patch-current-user-info', 'patch', statuses(
+        anon=DENIED_ANON, rest=(200, 3),
+    ), data={'bio': 'Своя биография'}),
+
+    Budget('moderation-reviews', 'get', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, rest=(200, 2),
+    ), params={'search': 'отзыв'}),
+    Budget('moderation-comments', 'get', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, rest=(200, 2),
+    ), params={
+        'search': 'комментарий', 'since': '2000-01-01T00:00:00Z',
+    }),
+    # Выборка обрабатывается целиком: число запросов не зависит от числа
+    # затронутых отзывов, комментариев и произведений.
+    Budget('moderation-reviews', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, rest=(200, 9),
+    ), data=lambda seed: {'action': 'delete', 'author': seed['username']}),
+    Budget('moderation-reviews', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, rest=(200, 7),
+    ), data=lambda seed: {'action': 'hide', 'author': seed['username']}),
+    Budget('moderation-comments', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, rest=(200, 5),
+    ), data=lambda seed: {'action': 'hide', 'title': seed['title_id']}),
+    Budget('moderation-comments', 'post', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, rest=(200, 6),
+    ), data=lambda seed: {
+        'action': 'delete', 'ids': [seed['comment_id']],
+    }),
+
+    # Ответ потоковый: запросы выполняются при чтении тела ответа.
+    Budget('export-reviews', 'get', statuses(
+        anon=DENIED_ANON, user=FORBIDDEN, moderator=FORBIDDEN,
+        admin=(200, 3),
+    ), params={'format': 'csv'}),
+)
+
+# Параметры URL детальных маршрутов берутся из засеянных объектов.
+URL_KWARGS = {
+    'categories-detail': lambda seed: {'slug': seed['slug']},
+    'genres-detail': lambda seed: {'slug': seed['genre']},
+    'titles-detail': lambda seed: {'pk': seed['title_id']},
+    'reviews-list': lambda seed: {'title_id': seed['title_id']},
+    'reviews-detail': lambda seed: {
+        'title_id': seed['title_id'], 'pk': seed['review_id'],
+    },
+    'comments-list': lambda seed: {
+        'title_id': seed['title_id'], 'review_id': seed['review_id'],
+    },
+    'comments-detail': lambda seed: {
+        'title_id': seed['title_id'], 'review_id': seed['review_id'],
+        'pk': seed['comment_id'],
+    },
+    'user-detail': lambda seed: {'username': seed['username']},
+    'user-reviews': lambda seed: {'username': seed['username']},
+}
+
+
+def seed_dataset(author, size=SEED_SIZE):
+    """Заполняет базу так, чтобы каждый список был длиннее страницы.
+
+    Отзыв и комментарий, на которые ссылаются детальные маршруты,
+    принадлежат ``author``: так изменение и удаление проходят проверку
+    прав для любой авторизованной роли.
+    """
+    store_code(author, CONFIRMATION_CODE)
+    User.objects.bulk_create(
+        User(username=f'reader{index}', email=f'reader{index}@yamdb.fake')
+        for index in range(size)
+    )
+    Category.objects.bulk_create(
+        Category(name=f'Категория {index}', slug=f'category-{index}')
+        for index in range(size)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(size)
+    )
+    # SQLite не возвращает первичные ключи из bulk_create, поэтому
+    # созданные объекты перечитываются.
+    readers = list(User.objects.filter(username__startswith='reader'))
+    categories = list(Category.objects.order_by('pk'))
+    genres = list(Genre.objects.order_by('pk'))
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {index}', year=1900 + index,
+              category=categories[index])
+        for index in range(size)
+    )
+    titles = list(Title.objects.order_by('pk'))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title=title, genre=genre)
+        for index, title in enumerate(titles)
+        for genre in {genres[0], genres[index]}
+    )
+    target = titles[0]
+    Review.objects.bulk_create(
+        Review(title=title, author=reader, text='Отзыв', score=5)
+        for title in titles
+        for reader in readers
+        if title == target or reader == readers[0]
+    )
+    # bulk_create обходит сигналы, поэтому рейтинги пересчитываются явно.
+    recompute_title_ratings()
+    review = Review.objects.create(
+        title=target, author=author, text='Отзыв автора', score=8
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=reader, text='Комментарий')
+        for reader in readers
+    )
+    comment = Comment.objects.create(
+        review=review, author=author, text='Комментарий автора'
+    )
+    return {
+        'slug': categories[0].slug,
+        'genre': genres[0].slug,
+        'title_id': target.pk,
+        'review_id': review.pk,
+        'comment_id': comment.pk,
+        'username': readers[0].username,
+        'author': author.username,
+    }
+
+
+def budget_url(budget, seed):
+    kwargs = URL_KWARGS.get(budget.route)
+    return reverse(budget.route, kwargs=kwargs(seed) if kwargs else None)
+
+
+def budget_data(budget, seed):
+    return budget.data(seed) if callable(budget.data) else budget.data
+
+
+def budget_id(budget):
+    params = '&'.join(f'{key}={value}' for key, value in budget.params.items())
+    return f'{budget.method}-{budget.route}' + (f'?{params}' if params else '')
+
+
+def iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def registered_routes(patterns):
+    """Возвращает множество (имя маршрута, метод) из URL-конфигурации."""
+    routes = set()
+    for pattern in iter_patterns(patterns):
+        callback = pattern.callback
+        view_class = getattr(callback, 'cls', None) or callback.view_class
+        allowed = set(view_class.http_method_names) - {'head', 'options'}
+        actions = getattr(callback, 'actions', None)
+        if actions is not None:
+            methods = set(actions) & allowed
+        else:
+            methods = {
+                method for method in allowed if hasattr(view_class, method)
+            }
+        routes.update((pattern.name, method) for method in methods)
+    return routes
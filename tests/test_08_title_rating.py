@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Рейтинг произведения без отзывов должен быть равен `None`.'
+        )
+
+        review = create_single_review(user_client, title_id, 'Хорошо', 8)
+        create_single_review(moderator_client, title_id, 'Так себе', 3)
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг обновляется при создании отзыва.'
+        )
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review.json()['id']
+        )
+        response = user_client.patch(url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг обновляется при изменении оценки.'
+        )
+
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 3, (
+            'Проверьте, что рейтинг обновляется при удалении отзыва.'
+        )
+
+    def test_02_rating_follows_cascades(self, admin_client, user_client,
+                                        user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Хорошо', 8)
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что рейтинг обновляется при каскадном удалении '
+            'отзывов вместе с автором.'
+        )
+
+    def test_03_recompute_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Хорошо', 7)
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=0, rating_count=0, rating=None
+        )
+
+        call_command('recompute_title_stats')
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            7, 1, 7
+        ), (
+            'Проверьте, что команда `recompute_title_stats` восстанавливает '
+            'сохранённый рейтинг произведения.'
+        )
@@ -0,0 +1,152 @@
+import warnings
+from http import HTTPStatus
+
+import pytest
+from django.core.cache.backends.base import CacheKeyWarning
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def collect(self, client, url):
+        items, pages = [], []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            pages.append(data)
+            items.extend(data['results'])
+            url = data['next']
+        return items, pages
+
+    def create_many_titles(self, count):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i % 7}', year=2000 + i % 3)
+            for i in range(count)
+        )
+
+    def test_01_cursor_matches_page_numbers(self, client):
+        self.create_many_titles(35)
+        by_page, _ = self.collect(client, self.TITLES_URL)
+        by_cursor, pages = self.collect(client, self.TITLES_URL + '?cursor=')
+
+        assert [(t['year'], t['name']) for t in by_cursor] == [
+            (t['year'], t['name']) for t in by_page
+        ], (
+            f'Проверьте, что курсорный режим `{self.TITLES_URL}` отдаёт '
+            'произведения в том же порядке, что и постраничный.'
+        )
+        assert len({t['id'] for t in by_cursor}) == len(by_page), (
+            'Проверьте, что курсорный режим не пропускает и не повторяет '
+            'произведения с одинаковыми годом и названием.'
+        )
+        assert 'count' not in pages[0], (
+            'В курсорном режиме ответ не должен содержать `count`.'
+        )
+        assert pages[0]['previous'] is None
+        assert len(pages) == 4
+
+    def test_02_cursor_previous_link(self, client):
+        self.create_many_titles(25)
+        first = client.get(self.TITLES_URL + '?cursor=').json()
+        second = client.get(first['next']).json()
+        back = client.get(second['previous']).json()
+
+        assert back['results'] == first['results'], (
+            'Проверьте, что ссылка `previous` в курсорном режиме '
+            'возвращает предыдущую страницу.'
+        )
+        assert back['previous'] is None
+
+    def test_03_cursor_for_reviews(self, admin_client, user_client,
+                                   moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        for client, score in ((admin_client, 3), (user_client, 5),
+                              (moderator_client, 7)):
+            create_single_review(client, titles[0]['id'], 'Текст', score)
+
+        by_page, _ = self.collect(admin_client, url)
+        by_cursor, _ = self.collect(admin_client, url + '?cursor=')
+        assert by_cursor == by_page
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get(self.TITLES_URL + '?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
+
+    def test_05_cursor_with_search_ranking(self, admin_client):
+        create_titles(admin_client)
+        for url in (self.TITLES_URL, '/api/v1/moderation/reviews/'):
+            response = admin_client.get(url, {'search': 'x', 'cursor': ''})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что курсор вместе с сортировкой по релевантности '
+                'поиска возвращает ответ со статусом 400, а не 404.'
+            )
+            assert 'cursor' in response.json()
+            response = admin_client.get(url, {'search': 'x', 'page': 1})
+            assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CountModes:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_count_none(self, admin_client):
+        create_titles(admin_client)
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000) for i in range(9)
+        )
+        first = admin_client.get(self.TITLES_URL + '?count=none').json()
+        assert 'count' not in first, (
+            'Проверьте, что при `?count=none` ответ не содержит `count`.'
+        )
+        assert len(first['results']) == 10 and first['previous'] is None
+        second = admin_client.get(first['next']).json()
+        assert len(second['results']) == 1 and second['next'] is None
+        assert second['previous'] is not None
+
+        response = admin_client.get(self.TITLES_URL + '?count=none&page=3')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_count_cached_invalidated_on_write(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_URL + '?count=cached'
+        assert admin_client.get(url).json()['count'] == 2
+
+        response = admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).json()['count'] == 1, (
+            'Проверьте, что закэшированное количество сбрасывается при '
+            'изменении произведений.'
+        )
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', CacheKeyWarning)
+            response = admin_client.get(self.TITLES_URL, {
+                'count': 'cached', 'name': 'два слова' * 50,
+            })
+        assert response.status_code == HTTPStatus.OK
+        assert not [
+            warning for warning in caught
+            if issubclass(warning.category, CacheKeyWarning)
+        ], (
+            'Проверьте, что ключ кэша количества не зависит от длины '
+            'строки запроса и не содержит пробелов.'
+        )
+
+    def test_03_invalid_count_mode(self, client):
+        response = client.get(self.TITLES_URL + '?count=maybe')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
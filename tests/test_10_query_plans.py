@@ -0,0 +1,15 @@
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+def test_query_plans_use_indexes(admin_client, admin, user_client, user,
+                                 moderator_client, moderator):
+    create_comments(admin_client, {
+        admin: admin_client,
+        user: user_client,
+        moderator: moderator_client,
+    })
+    call_command('check_query_plans')
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_folds_cyrillic_case(self, admin_client):
+        create_titles(admin_client)
+        assert self.search(admin_client, 'терминатор') == ['Терминатор'], (
+            'Проверьте, что `?search=` находит произведение без учёта '
+            'регистра кириллицы.'
+        )
+        assert self.search(admin_client, 'креп') == ['Крепкий орешек'], (
+            'Проверьте, что `?search=` ищет слова по префиксу.'
+        )
+        assert self.search(admin_client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что `?search=` ищет и по описанию произведения.'
+        )
+
+    def test_02_search_ranks_and_composes(self, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Фильм о фильме',
+            'year': 2001,
+            'genre': titles[0]['genre'],
+            'category': categories[1]['slug'],
+            'description': 'Терминатор',
+        })
+        assert self.search(admin_client, 'Терминатор') == [
+            'Терминатор', 'Фильм о фильме'
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании.'
+        )
+        response = admin_client.get(self.TITLES_URL, {
+            'search': 'терминатор', 'category': categories[1]['slug']
+        })
+        assert [t['name'] for t in response.json()['results']] == [
+            'Фильм о фильме'
+        ], 'Проверьте, что `?search=` сочетается с другими фильтрами.'
+
+    def test_03_index_follows_updates(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Хищник'})
+        assert self.search(admin_client, 'терминатор') == []
+        assert self.search(admin_client, 'хищник') == ['Хищник']
+        admin_client.delete(url)
+        assert self.search(admin_client, 'хищник') == []
+
+    def test_04_search_pages(self, admin_client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Сага, часть {index}', year=2000)
+            for index in range(12)
+        )
+        first = admin_client.get(self.TITLES_URL, {'search': 'сага'}).json()
+        second = admin_client.get(first['next']).json()
+        names = [
+            title['name'] for page in (first, second)
+            for title in page['results']
+        ]
+        assert (first['count'], len(set(names))) == (12, 12), (
+            'Проверьте, что результаты `?search=` разбиваются на страницы '
+            'без повторов.'
+        )
+        response = admin_client.get(
+            self.TITLES_URL, {'search': 'сага', 'cursor': ''}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что `?search=` с курсором отклоняется со статусом '
+            '400: сортировку по релевантности курсор не поддерживает.'
+        )
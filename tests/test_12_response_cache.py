@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_repeated_get_is_served_from_cache(
+            self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        for cached_url in (self.TITLES_URL, url):
+            first = client.get(cached_url)
+            assert first['X-Cache'] == 'MISS'
+            with django_assert_num_queries(0):
+                second = client.get(cached_url)
+            assert second['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный GET-запрос к `{cached_url}` '
+                'отдаётся из кэша.'
+            )
+            assert second.json() == first.json()
+
+        response = client.get(self.TITLES_URL, {'year': 1984, 'name': 'Т'})
+        assert response['X-Cache'] == 'MISS'
+        response = client.get(self.TITLES_URL, {'name': 'Т', 'year': 1984})
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров запроса не влияет на ключ '
+            'кэша.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, genres = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        other_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        client.get(self.TITLES_URL)
+        client.get(url)
+        client.get(other_url)
+
+        create_single_review(user_client, titles[0]['id'], 'Текст', 9)
+        response = client.get(url)
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+        assert client.get(other_url)['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв не сбрасывает кэш других произведений.'
+        )
+        ratings = {
+            title['id']: title['rating']
+            for title in client.get(self.TITLES_URL).json()['results']
+        }
+        assert ratings[titles[0]['id']] == 9
+
+        admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        response = client.get(url)
+        assert [g['slug'] for g in response.json()['genre']] == [
+            genres[2]['slug']
+        ], 'Проверьте, что смена жанров сбрасывает кэш произведения.'
+
+        admin_client.delete(f'/api/v1/genres/{genres[2]["slug"]}/')
+        assert client.get(url).json()['genre'] == [], (
+            'Проверьте, что удаление жанра сбрасывает кэш произведений.'
+        )
+
+    def test_03_stats_command(self, client, admin_client):
+        from django.core.management import call_command
+
+        create_titles(admin_client)
+        call_command('response_cache_stats', '--reset')
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+
+        from api.cache import get_response_stats
+        assert get_response_stats() == {'hits': 1, 'misses': 1}
+        response = client.get(self.TITLES_URL + 'abc/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def urls(self, admin_client, author_map):
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        return {
+            'categories': '/api/v1/categories/',
+            'genres': '/api/v1/genres/',
+            'titles': '/api/v1/titles/',
+            'title': f'/api/v1/titles/{title_id}/',
+            'reviews': reviews_url,
+            'review': f'{reviews_url}{review_id}/',
+            'comments': comments_url,
+            'comment': f'{comments_url}{comments[0]["id"]}/',
+        }
+
+    def test_01_not_modified_without_main_query(
+            self, admin_client, admin, user_client, user, moderator_client,
+            moderator, django_assert_max_num_queries):
+        urls = self.urls(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client,
+        })
+        for name, url in urls.items():
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etag = response.get('ETag')
+            assert etag, f'Проверьте, что ответ `{url}` содержит ETag.'
+            with django_assert_max_num_queries(1):
+                response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает 304.'
+            )
+            assert response['ETag'] == etag
+
+    def test_02_writes_change_etag(self, admin_client, admin, user_client,
+                                   user):
+        urls = self.urls(admin_client, {admin: admin_client,
+                                        user: user_client})
+        etags = {
+            name: admin_client.get(url)['ETag'] for name, url in urls.items()
+        }
+        response = user_client.post(urls['comments'], data={'text': 'Ещё'})
+        assert response.status_code == HTTPStatus.CREATED
+
+        for name in ('comments', 'comment', 'reviews'):
+            response = admin_client.get(
+                urls[name], HTTP_IF_NONE_MATCH=etags[name]
+            )
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что новый комментарий меняет ETag `{name}`.'
+            )
+        etags['reviews'] = response['ETag']
+
+        response = admin_client.patch(
+            '/api/v1/users/me/', data={'username': 'RenamedAdmin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.get(
+            urls['reviews'], HTTP_IF_NONE_MATCH=etags['reviews']
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени автора меняет ETag списка отзывов.'
+        )
+
+    def test_03_wildcard_matches_existing_only(self, admin_client, admin,
+                                               user_client, user):
+        urls = self.urls(admin_client, {admin: admin_client,
+                                        user: user_client})
+        for name in ('reviews', 'review', 'title'):
+            response = user_client.get(urls[name], HTTP_IF_NONE_MATCH='*')
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что `If-None-Match: *` для `{name}` '
+                'возвращает 304.'
+            )
+        for url in ('/api/v1/titles/999999/reviews/',
+                    '/api/v1/titles/999999/'):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH='*')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что `If-None-Match: *` не возвращает 304 для '
+                'несуществующего ресурса.'
+            )
@@ -0,0 +1,60 @@
+import pytest
+from django.core.cache import cache
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleFastRead:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def get_both(self, client, settings, url, params=None):
+        responses = []
+        for fast_read in (False, True):
+            settings.TITLE_FAST_READ = fast_read
+            cache.clear()
+            response = client.get(url, params)
+            responses.append((response.status_code, response.json()))
+        return responses
+
+    def test_01_fast_read_matches_serializer(self, client, admin_client,
+                                             user_client, settings):
+        titles, categories, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 7)
+        admin_client.delete(f'/api/v1/categories/{categories[1]["slug"]}/')
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Без жанров', 'year': 2000,
+            'category': categories[0]['slug'],
+        })
+        requests = [
+            (self.TITLES_URL, None),
+            (self.TITLES_URL, {'cursor': ''}),
+            (self.TITLES_URL, {'count': 'none'}),
+            (self.TITLES_URL, {'genre': titles[0]['genre'][0]}),
+            (self.TITLES_URL, {'search': 'орешек'}),
+            *(
+                (self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=pk), None)
+                for pk in (*(title['id'] for title in titles), 0)
+            ),
+        ]
+        for url, params in requests:
+            serialized, fast = self.get_both(client, settings, url, params)
+            assert fast == serialized, (
+                f'Проверьте, что быстрое чтение `{url}` с параметрами '
+                f'{params} возвращает тот же ответ, что и TitleSerializer.'
+            )
+
+    def test_02_fast_read_query_count(self, client, admin_client, settings,
+                                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        settings.TITLE_FAST_READ = True
+        cache.clear()
+        # COUNT(*), строки страницы и жанры одним запросом.
+        with django_assert_num_queries(3):
+            client.get(self.TITLES_URL)
+        with django_assert_num_queries(2):
+            client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            )
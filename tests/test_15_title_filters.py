@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': ['horror', 'drama'],
+            'category': 'books',
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        titles.append(response.json())
+        create_single_review(user_client, titles[0]['id'], 'Текст', 9)
+        create_single_review(user_client, titles[2]['id'], 'Текст', 4)
+        return {title['name']: title['id'] for title in titles}
+
+    def get_names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        names = [title['name'] for title in data['results']]
+        assert data['count'] == len(names) == len(set(names)), (
+            'Проверьте, что фильтры не дублируют произведения.'
+        )
+        return set(names)
+
+    def test_01_multi_value_genre(self, client, titles):
+        assert self.get_names(client, genre='comedy,drama') == {
+            'Терминатор', 'Крепкий орешек', 'Чужой'
+        }, (
+            'Проверьте, что `?genre=` со списком через запятую возвращает '
+            'произведения с любым из жанров.'
+        )
+        assert self.get_names(client, genre='horror,drama') == {
+            'Терминатор', 'Крепкий орешек', 'Чужой'
+        }
+        assert self.get_names(
+            client, genre='horror,drama', genre_match='all'
+        ) == {'Чужой'}, (
+            'Проверьте, что `?genre_match=all` возвращает только '
+            'произведения со всеми перечисленными жанрами.'
+        )
+        assert self.get_names(client, genre='horror') == {
+            'Терминатор', 'Чужой'
+        }
+
+    def test_02_multi_value_category(self, client, titles):
+        assert self.get_names(client, category='books') == {
+            'Крепкий орешек', 'Чужой'
+        }
+        assert self.get_names(client, category='books,films') == {
+            'Терминатор', 'Крепкий орешек', 'Чужой'
+        }, (
+            'Проверьте, что `?category=` принимает список через запятую.'
+        )
+
+    def test_03_year_and_rating_ranges(self, client, titles):
+        assert self.get_names(client, year_min=1980, year_max=1985) == {
+            'Терминатор'
+        }, (
+            'Проверьте, что `?year_min=` и `?year_max=` ограничивают год '
+            'включительно.'
+        )
+        assert self.get_names(client, year_max=1984) == {
+            'Терминатор', 'Чужой'
+        }
+        assert self.get_names(client, rating_min=4) == {
+            'Терминатор', 'Чужой'
+        }, (
+            'Проверьте, что `?rating_min=` отбирает произведения с '
+            'рейтингом не ниже заданного и пропускает произведения без '
+            'оценок.'
+        )
+        assert self.get_names(
+            client, genre='horror,drama', year_min=1980, rating_min=5
+        ) == {'Терминатор'}
+
+    def test_04_invalid_genre_match(self, client, titles):
+        response = client.get(
+            self.TITLES_URL, {'genre': 'horror', 'genre_match': 'some'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что недопустимое значение `?genre_match=` '
+            'возвращает ответ со статусом 400.'
+        )
@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_bulk_create(self, admin_client, client,
+                            django_assert_max_num_queries):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        client.get(self.TITLES_URL)
+        payload = [
+            {
+                'name': f'Произведение {i}',
+                'year': 1990 + i,
+                'genre': ['horror', 'drama'] if i % 2 else ['comedy'],
+                'category': 'books',
+                'description': f'Описание {i}',
+            }
+            for i in range(30)
+        ]
+        with django_assert_max_num_queries(10):
+            response = admin_client.post(
+                self.BULK_URL, data=payload, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос администратора к `/api/v1/titles/'
+            'bulk/` с корректными данными возвращает ответ со статусом 201.'
+        )
+        data = response.json()
+        assert [item['name'] for item in data] == [
+            item['name'] for item in payload
+        ]
+        for item in data:
+            title = Title.objects.get(pk=item['id'])
+            assert title.name == item['name']
+            assert sorted(
+                title.genre.values_list('slug', flat=True)
+            ) == sorted(item['genre']), (
+                'Проверьте, что id в ответе соответствуют созданным '
+                'произведениям и их жанрам.'
+            )
+        listed = client.get(self.TITLES_URL).json()
+        assert listed['count'] == 30, (
+            'Проверьте, что пакетное создание сбрасывает кэш списка '
+            'произведений.'
+        )
+        found = client.get(self.TITLES_URL, {'search': 'Произведение'})
+        assert found.json()['count'] == 30
+
+    def test_02_bulk_create_errors(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        payload = [
+            {'name': 'Верно', 'year': 2000, 'genre': ['drama'],
+             'category': 'books'},
+            {'name': 'Нет категории', 'year': 2000, 'genre': ['drama'],
+             'category': 'unknown'},
+            {'name': 'Нет жанров', 'year': 2000, 'genre': [],
+             'category': 'books'},
+            {'name': 'Лишний жанр', 'year': 2000,
+             'genre': ['drama', 'missing'], 'category': 'films'},
+        ]
+        response = admin_client.post(
+            self.BULK_URL, data=payload, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == len(payload), (
+            'Проверьте, что ответ с ошибками содержит элемент для каждого '
+            'произведения из запроса.'
+        )
+        assert errors[0] == {}
+        assert list(errors[1]) == ['category']
+        assert 'genre' in errors[2]
+        assert list(errors[3]) == ['genre'] and len(errors[3]['genre']) == 1
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в любом элементе ни одно '
+            'произведение не создаётся.'
+        )
+
+        errors_payload = payload[:1] + payload[3:]
+        response = admin_client.post(
+            self.BULK_URL, data=errors_payload, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()[0] == {}
+        response = admin_client.post(
+            self.BULK_URL, data=payload[0], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_bulk_create_permissions(self, client, user_client,
+                                        moderator_client):
+        for request_client in (client, user_client, moderator_client):
+            response = request_client.post(
+                self.BULK_URL, data='[]', content_type='application/json'
+            )
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                'Проверьте, что пакетное создание произведений доступно '
+                'только администратору.'
+            )
+
+    def test_04_body_size_limits(self, admin_client, settings):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 2000
+        settings.TITLE_BULK_MAX_BODY_SIZE = 20000
+        response = admin_client.post('/api/v1/genres/', data={
+            'name': 'Длинный' * 200, 'slug': 'long',
+        }, format='json')
+        assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE, (
+            'Проверьте, что JSON-тело больше `DATA_UPLOAD_MAX_MEMORY_SIZE` '
+            'отклоняется со статусом 413.'
+        )
+
+        payload = [
+            {'name': f'Произведение {i}', 'year': 2000,
+             'genre': ['drama'], 'category': 'books'}
+            for i in range(100)
+        ]
+        response = admin_client.post(
+            self.BULK_URL, data=payload, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что пакетная загрузка ограничена '
+            '`TITLE_BULK_MAX_BODY_SIZE`, а не общим пределом.'
+        )
+        response = admin_client.post(
+            self.BULK_URL, data=payload * 5, format='json'
+        )
+        assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        assert Title.objects.count() == 100
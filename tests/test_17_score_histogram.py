@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from reviews.fields import EMPTY_HISTOGRAM
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ScoreHistogram:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_histogram(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            {'include': 'histogram'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        histogram = response.json()['histogram']
+        return [histogram[str(score)] for score in range(1, 11)]
+
+    def test_01_histogram_follows_reviews(self, admin_client, user_client,
+                                          moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        assert 'histogram' not in admin_client.get(url).json(), (
+            'Проверьте, что гистограмма оценок выводится только с '
+            '`?include=histogram`.'
+        )
+        assert self.get_histogram(admin_client, title_id) == [0] * 10
+
+        review = create_single_review(user_client, title_id, 'Плохо', 1)
+        create_single_review(moderator_client, title_id, 'Отлично', 10)
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        assert self.get_histogram(admin_client, title_id) == [
+            1, 0, 0, 0, 0, 0, 0, 0, 0, 2
+        ], 'Проверьте, что гистограмма обновляется при создании отзыва.'
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review.json()['id']
+        )
+        user_client.patch(review_url, data={'score': 5})
+        assert self.get_histogram(admin_client, title_id) == [
+            0, 0, 0, 0, 1, 0, 0, 0, 0, 2
+        ], 'Проверьте, что гистограмма обновляется при изменении оценки.'
+
+        user_client.delete(review_url)
+        assert self.get_histogram(admin_client, title_id) == [
+            0, 0, 0, 0, 0, 0, 0, 0, 0, 2
+        ], 'Проверьте, что гистограмма обновляется при удалении отзыва.'
+        title = Title.objects.get(pk=title_id)
+        assert sum(title.score_histogram) == title.rating_count == 2
+
+    def test_02_histogram_in_both_read_paths(self, admin_client, user_client,
+                                             settings):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 7)
+        responses = []
+        for fast_read in (False, True):
+            settings.TITLE_FAST_READ = fast_read
+            cache.clear()
+            responses.append(admin_client.get(
+                '/api/v1/titles/', {'include': 'histogram'}
+            ).json())
+        assert responses[0] == responses[1], (
+            'Проверьте, что гистограмма одинакова в быстром чтении и в '
+            'TitleSerializer.'
+        )
+        response = admin_client.get('/api/v1/titles/', {'include': 'nope'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное значение `?include=` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_03_recompute_rebuilds_histograms(self, admin_client,
+                                              user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 3)
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 3)
+        create_single_review(user_client, titles[1]['id'], 'Текст', 8)
+        Title.objects.update(score_histogram=EMPTY_HISTOGRAM)
+
+        call_command('recompute_title_stats')
+        histograms = dict(Title.objects.values_list('pk', 'score_histogram'))
+        assert histograms[titles[0]['id']] == (0, 0, 2, 0, 0, 0, 0, 0, 0, 0)
+        assert histograms[titles[1]['id']] == (0, 0, 0, 0, 0, 0, 0, 1, 0, 0), (
+            'Проверьте, что команда `recompute_title_stats` восстанавливает '
+            'гистограммы оценок.'
+        )
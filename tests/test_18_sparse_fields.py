@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    USERS_URL = '/api/v1/users/'
+
+    def get_results(self, client, url, params, queries,
+                    django_assert_num_queries):
+        cache.clear()
+        with django_assert_num_queries(queries) as captured:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, response.json()
+        sql = ' '.join(query['sql'] for query in captured.captured_queries)
+        return response.json()['results'], sql
+
+    @pytest.mark.parametrize('fast_read', (False, True))
+    @pytest.mark.parametrize('params, keys, queries, absent_sql', (
+        ({}, ['id', 'name', 'year', 'description', 'genre', 'category',
+              'rating', 'reviews_count'], 3, ()),
+        ({'fields': 'id,name,year'}, ['id', 'name', 'year'], 2,
+         ('"description"', 'reviews_category', 'reviews_genre')),
+        ({'fields': 'name,genre'}, ['name', 'genre'], 3,
+         ('"description"', 'reviews_category')),
+        ({'fields': 'id,category'}, ['id', 'category'], 2,
+         ('"description"', 'reviews_genre')),
+        ({'omit': 'description,genre'},
+         ['id', 'name', 'year', 'category', 'rating', 'reviews_count'], 2,
+         ('"description"', 'reviews_genre')),
+        ({'fields': 'id', 'include': 'histogram'}, ['id', 'histogram'], 2,
+         ('"description"', 'reviews_category', 'reviews_genre')),
+    ))
+    def test_01_titles(self, client, admin_client, settings,
+                       django_assert_num_queries, fast_read, params, keys,
+                       queries, absent_sql):
+        create_titles(admin_client)
+        settings.TITLE_FAST_READ = fast_read
+        results, sql = self.get_results(
+            client, self.TITLES_URL, params, queries,
+            django_assert_num_queries,
+        )
+        assert all(list(title) == keys for title in results), (
+            'Проверьте, что `?fields=` и `?omit=` оставляют в ответе только '
+            'выбранные поля.'
+        )
+        for fragment in absent_sql:
+            assert fragment not in sql, (
+                f'Проверьте, что при параметрах {params} запросы не '
+                f'обращаются к {fragment}.'
+            )
+
+    @pytest.mark.parametrize(
+        'review_params, review_keys, comment_params, comment_keys', (
+            ({}, ['id', 'text', 'author', 'score', 'pub_date',
+                  'comments_count'],
+             {}, ['id', 'text', 'author', 'pub_date']),
+            ({'fields': 'id,score'}, ['id', 'score'],
+             {'fields': 'id,text'}, ['id', 'text']),
+            ({'omit': 'text'},
+             ['id', 'author', 'score', 'pub_date', 'comments_count'],
+             {'omit': 'text'}, ['id', 'author', 'pub_date']),
+        )
+    )
+    def test_02_reviews_and_comments(self, client, admin_client, admin,
+                                     user, user_client, moderator,
+                                     moderator_client,
+                                     django_assert_num_queries,
+                                     review_params, review_keys,
+                                     comment_params, comment_keys):
+        _, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        # Родительский объект, COUNT(*) и страница: автор читается тем же
+        # запросом, что и отзывы.
+        results, sql = self.get_results(
+            client,
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            review_params, 3, django_assert_num_queries,
+        )
+        assert len(results) == 3
+        assert all(list(review) == review_keys for review in results)
+        if 'text' not in review_keys:
+            assert '"reviews_review"."text"' not in sql
+
+        results, sql = self.get_results(
+            client,
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+            comment_params, 3, django_assert_num_queries,
+        )
+        assert len(results) == 3
+        assert all(list(comment) == comment_keys for comment in results)
+        if 'author' not in comment_keys:
+            assert 'reviews_user' not in sql
+
+    def test_03_users(self, admin_client, django_assert_num_queries):
+        results, sql = self.get_results(
+            admin_client, self.USERS_URL, {'fields': 'username,role'}, 3,
+            django_assert_num_queries,
+        )
+        assert all(list(user) == ['username', 'role'] for user in results)
+        assert '"bio"' not in sql.split('FROM "reviews_user"', 2)[-1]
+
+    def test_04_unknown_field(self, client, admin_client):
+        create_titles(admin_client)
+        for params in ({'fields': 'id,secret'}, {'omit': 'password'}):
+            response = client.get(self.TITLES_URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что неизвестное поле в `?fields=` или `?omit=` '
+                'возвращает ответ со статусом 400.'
+            )
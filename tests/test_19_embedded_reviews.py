@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19EmbeddedReviews:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture
+    def titles(self, admin_client, user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            for author_client, score in (
+                (user_client, 4), (moderator_client, 6), (admin_client, 9)
+            ):
+                create_single_review(
+                    author_client, title['id'], f'Отзыв {score}', score
+                )
+        return titles
+
+    def test_01_newest_reviews_embedded(self, client, titles):
+        title_id = titles[0]['id']
+        newest = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        ).json()['results']
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            {'include': 'reviews', 'reviews_limit': 2},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['reviews'] == newest[:2], (
+            'Проверьте, что `?include=reviews` добавляет к произведению '
+            'новейшие отзывы в формате эндпоинта отзывов.'
+        )
+        listed = client.get(self.TITLES_URL, {'include': 'reviews'}).json()
+        assert all(len(title['reviews']) == 3 for title in listed['results'])
+
+    def test_02_both_read_paths_match(self, client, titles, settings):
+        responses = []
+        for fast_read in (False, True):
+            settings.TITLE_FAST_READ = fast_read
+            cache.clear()
+            responses.append(client.get(
+                self.TITLES_URL,
+                {'include': 'reviews,histogram', 'reviews_limit': 2},
+            ).json())
+        assert responses[0] == responses[1], (
+            'Проверьте, что встроенные отзывы одинаковы в быстром чтении и '
+            'в TitleSerializer.'
+        )
+
+    @pytest.mark.parametrize('fast_read', (False, True))
+    def test_03_fixed_query_count(self, client, admin_client, titles,
+                                  settings, django_assert_num_queries,
+                                  fast_read):
+        settings.TITLE_FAST_READ = fast_read
+        # COUNT(*), страница, жанры, id новейших отзывов и сами отзывы.
+        with django_assert_num_queries(5):
+            client.get(self.TITLES_URL, {'include': 'reviews'})
+        admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': f'Ещё {i}', 'year': 2000, 'genre': ['drama'],
+             'category': 'books'}
+            for i in range(8)
+        ], format='json')
+        cache.clear()
+        with django_assert_num_queries(5):
+            response = client.get(self.TITLES_URL, {'include': 'reviews'})
+        assert len(response.json()['results']) == 10, (
+            'Проверьте, что число запросов не зависит от размера страницы.'
+        )
+
+    def test_04_invalid_limit(self, client, titles):
+        for limit in ('0', '11', 'x'):
+            response = client.get(
+                self.TITLES_URL, {'include': 'reviews', 'reviews_limit': limit}
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что недопустимый `?reviews_limit=` возвращает '
+                'ответ со статусом 400.'
+            )
+
+    def test_05_author_rename_invalidates(self, client, admin_client, user,
+                                          titles):
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        params = {'include': 'reviews'}
+        client.get(url, params)
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        authors = {
+            review['author']
+            for review in client.get(url, params).json()['reviews']
+        }
+        assert 'renamed' in authors, (
+            'Проверьте, что смена имени автора сбрасывает кэш карточки со '
+            'встроенными отзывами.'
+        )
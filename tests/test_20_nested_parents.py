@@ -0,0 +1,150 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import IntegrityError
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20NestedParents:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def nested(self, admin, moderator, admin_client, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        return {
+            'reviews': reviews_url,
+            'review': f'{reviews_url}{reviews[1]["id"]}/',
+            'comments': comments_url,
+            'comment': f'{comments_url}{comments[0]["id"]}/',
+            'foreign_comments': self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[1]['id'], review_id=reviews[0]['id']
+            ),
+            'foreign_review': self.REVIEWS_URL_TEMPLATE.format(
+                title_id=titles[1]['id']
+            ) + f'{reviews[0]["id"]}/',
+        }
+
+    # Число запросов включает чтение пользователя при аутентификации.
+    @pytest.mark.parametrize(
+        'client_name, method, route, data, status, queries', (
+            ('client', 'get', 'reviews', None, HTTPStatus.OK, 3),
+            ('client', 'get', 'review', None, HTTPStatus.OK, 1),
+            ('user_client', 'post', 'reviews', {'text': 'Новый', 'score': 7},
+             HTTPStatus.CREATED, 5),
+            ('moderator_client', 'patch', 'review', {'text': 'Правка'},
+             HTTPStatus.OK, 4),
+            ('moderator_client', 'delete', 'review', None,
+             HTTPStatus.NO_CONTENT, 6),
+            ('client', 'get', 'comments', None, HTTPStatus.OK, 3),
+            ('client', 'get', 'comment', None, HTTPStatus.OK, 1),
+            ('user_client', 'post', 'comments', {'text': 'Новый'},
+             HTTPStatus.CREATED, 5),
+            ('admin_client', 'patch', 'comment', {'text': 'Правка'},
+             HTTPStatus.OK, 4),
+            ('admin_client', 'delete', 'comment', None,
+             HTTPStatus.NO_CONTENT, 6),
+        ),
+    )
+    def test_01_queries_per_action(self, request, nested,
+                                   django_assert_num_queries, client_name,
+                                   method, route, data, status, queries):
+        api_client = request.getfixturevalue(client_name)
+        cache.clear()
+        with django_assert_num_queries(queries):
+            response = getattr(api_client, method)(
+                nested[route], data=data, format='json'
+            ) if data is not None else getattr(api_client, method)(
+                nested[route]
+            )
+        assert response.status_code == status, (
+            f'Проверьте, что {method.upper()} {nested[route]} возвращает '
+            f'статус {status}.'
+        )
+
+    def test_02_parent_loaded_once(self, nested, user_client,
+                                   django_assert_num_queries):
+        cache.clear()
+        with django_assert_num_queries(5) as captured:
+            response = user_client.post(
+                nested['comments'], data={'text': 'Новый'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        parent_lookups = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('SELECT "reviews_review"')
+        ]
+        assert len(parent_lookups) == 1, (
+            'Проверьте, что отзыв загружается не больше одного раза за '
+            'запрос.'
+        )
+        assert '"reviews_review"."title_id" =' in parent_lookups[0], (
+            'Проверьте, что принадлежность отзыва произведению проверяется '
+            'в том же запросе, что и загрузка отзыва.'
+        )
+
+    def test_03_wrong_title_not_found(self, nested, client, user_client):
+        for url in (nested['foreign_comments'], nested['foreign_review']):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET {url} с чужим произведением в пути '
+                'возвращает статус 404.'
+            )
+        response = user_client.post(
+            nested['foreign_comments'], data={'text': 'Новый'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий нельзя добавить к отзыву через '
+            'чужое произведение.'
+        )
+
+    def test_04_duplicate_review_by_constraint(self, nested, admin_client,
+                                               django_assert_num_queries):
+        cache.clear()
+        with django_assert_num_queries(5) as captured:
+            response = admin_client.post(
+                nested['reviews'], data={'text': 'Ещё один', 'score': 1}
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв автора на произведение '
+            'возвращает статус 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        sql = [query['sql'] for query in captured.captured_queries]
+        insert = next(
+            index for index, query in enumerate(sql)
+            if query.startswith('INSERT INTO "reviews_review"')
+        )
+        assert not any(
+            'EXISTS' in query or 'LIMIT 1' in query for query in sql[:insert]
+        ), (
+            'Проверьте, что уникальность отзыва проверяет ограничение базы, '
+            'а не отдельный запрос перед вставкой.'
+        )
+
+    def test_05_other_integrity_errors(self, nested, user_client,
+                                       monkeypatch):
+        from reviews.models import Review
+
+        def save(*args, **kwargs):
+            raise IntegrityError('CHECK constraint failed')
+
+        monkeypatch.setattr(Review, 'save', save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                nested['reviews'], data={'text': 'Отзыв', 'score': 1}
+            )
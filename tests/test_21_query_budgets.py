@@ -0,0 +1,102 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api import urls
+from api.pagination import KeysetPagination, YamdbPagination
+from tests.query_budgets import (
+    ADMIN, ANON, BUDGETS, PAGE_SIZES, ROLE_CLIENTS, ROLES, budget_data,
+    budget_id, budget_url, registered_routes, seed_dataset,
+)
+
+CASES = [
+    pytest.param(budget, role, id=f'{budget_id(budget)}-{role}')
+    for budget in BUDGETS
+    for role in ROLES
+]
+PAGINATED = [
+    pytest.param(budget, id=budget_id(budget))
+    for budget in BUDGETS
+    if budget.method == 'get' and budget.route.endswith('-list')
+]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21QueryBudgets:
+
+    @pytest.fixture(autouse=True)
+    def queue_emails(self, settings):
+        # Бюджет считает запросы самого запроса; письма отправляет
+        # обработчик очереди.
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+
+    @pytest.fixture
+    def seed(self, user, moderator, admin):
+        return seed_dataset(user)
+
+    def get_client(self, request, role):
+        if role == ANON:
+            return APIClient()
+        return request.getfixturevalue(ROLE_CLIENTS[role])
+
+    def call(self, client, budget, seed):
+        data = budget_data(budget, seed)
+        url = budget_url(budget, seed)
+        cache.clear()
+        if data is None:
+            response = getattr(client, budget.method)(url, budget.params)
+        else:
+            response = getattr(client, budget.method)(
+                url, data, format='json'
+            )
+        if response.streaming:
+            # Тело потокового ответа читается здесь, чтобы его запросы
+            # попали в бюджет.
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def test_00_every_route_has_budget(self):
+        declared = {(budget.route, budget.method) for budget in BUDGETS}
+        missing = registered_routes(urls.urlpatterns) - declared
+        assert not missing, (
+            'Добавьте в tests/query_budgets.py бюджеты запросов для '
+            f'маршрутов: {sorted(missing)}.'
+        )
+
+    @pytest.mark.parametrize('budget, role', CASES)
+    def test_01_query_budget(self, request, seed, budget, role,
+                             django_assert_max_num_queries):
+        client = self.get_client(request, role)
+        status, queries = budget.roles[role]
+        with django_assert_max_num_queries(queries):
+            response = self.call(client, budget, seed)
+        assert response.status_code == status, (
+            f'Проверьте, что {budget.method.upper()} {budget.route} для '
+            f'роли {role} возвращает статус {status}, а не '
+            f'{response.status_code}.'
+        )
+
+    @pytest.mark.parametrize('budget', PAGINATED)
+    def test_02_queries_do_not_grow_with_page_size(
+        self, request, seed, monkeypatch, django_assert_num_queries, budget
+    ):
+        role = ANON if budget.roles[ANON][0] == 200 else ADMIN
+        client = self.get_client(request, role)
+        counts = []
+        for page_size in PAGE_SIZES:
+            monkeypatch.setattr(YamdbPagination, 'page_size', page_size)
+            monkeypatch.setattr(KeysetPagination, 'page_size', page_size)
+            with django_assert_num_queries(
+                budget.roles[role][1], exact=False
+            ) as captured:
+                response = self.call(client, budget, seed)
+            assert len(response.json()['results']) == page_size, (
+                f'Проверьте, что набор данных заполняет страницу '
+                f'{budget.route} размером {page_size}.'
+            )
+            counts.append(len(captured.captured_queries))
+        assert len(set(counts)) == 1, (
+            f'Проверьте, что число запросов к {budget.route} не растёт с '
+            f'размером страницы: {dict(zip(PAGE_SIZES, counts))}.'
+        )
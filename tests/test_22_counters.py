@@ -0,0 +1,230 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import (
+    create_comments, create_single_comment, create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Counters:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def get_reviews(self, client, title_id, params=None):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id), params
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['results']
+
+    def get_reviews_count(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['reviews_count']
+
+    @pytest.mark.parametrize('fast_read', (False, True))
+    def test_01_counters_follow_writes(self, client, admin_client, admin,
+                                       moderator_client, moderator,
+                                       settings, fast_read):
+        settings.TITLE_FAST_READ = fast_read
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        title_id = titles[0]['id']
+        assert self.get_reviews_count(client, title_id) == 2, (
+            'Проверьте, что `reviews_count` произведения равен числу его '
+            'отзывов.'
+        )
+        counts = {
+            review['id']: review['comments_count']
+            for review in self.get_reviews(client, title_id)
+        }
+        assert counts == {reviews[0]['id']: 2, reviews[1]['id']: 0}, (
+            'Проверьте, что `comments_count` отзыва равен числу его '
+            'комментариев.'
+        )
+
+        response = admin_client.delete(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id'],
+                comment_id=comments[0]['id'],
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        counts = {
+            review['id']: review['comments_count']
+            for review in self.get_reviews(client, title_id)
+        }
+        assert counts[reviews[0]['id']] == 1, (
+            'Проверьте, что `comments_count` уменьшается при удалении '
+            'комментария.'
+        )
+
+    def test_02_counters_follow_cascades(self, client, admin_client,
+                                         user_client, user,
+                                         moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = (title['id'] for title in titles)
+        for title_id, score in ((first, 3), (second, 9)):
+            create_single_review(user_client, title_id, 'Отзыв', score)
+        review_id = create_single_review(
+            moderator_client, first, 'Отзыв модератора', 6
+        ).json()['id']
+        for _ in range(3):
+            create_single_comment(user_client, first, review_id, 'Ответ')
+        create_single_comment(moderator_client, first, review_id, 'Ответ')
+
+        user.delete()
+        assert self.get_reviews_count(client, first) == 1
+        assert self.get_reviews_count(client, second) == 0, (
+            'Проверьте, что `reviews_count` уменьшается при каскадном '
+            'удалении отзывов вместе с автором.'
+        )
+        [review] = self.get_reviews(client, first)
+        assert review['comments_count'] == 1, (
+            'Проверьте, что `comments_count` уменьшается при каскадном '
+            'удалении комментариев вместе с автором.'
+        )
+
+    def test_03_cascade_updates_stats_once(self, admin_client, user_client,
+                                           moderator_client,
+                                           django_assert_max_num_queries):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            for client, score in ((user_client, 2), (moderator_client, 7)):
+                create_single_review(client, title['id'], 'Отзыв', score)
+        title = Title.objects.get(pk=titles[0]['id'])
+        with django_assert_max_num_queries(12) as captured:
+            title.delete()
+        updates = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert not updates, (
+            'Проверьте, что удаление произведения не обновляет рейтинг '
+            'удаляемого произведения для каждого отзыва.'
+        )
+
+    @pytest.mark.parametrize('fast_read', (False, True))
+    @pytest.mark.parametrize('cursor', (False, True))
+    def test_04_ordering(self, client, admin_client, user_client,
+                         moderator_client, settings, fast_read, cursor):
+        settings.TITLE_FAST_READ = fast_read
+        titles, _, _ = create_titles(admin_client)
+        for review_client in (user_client, moderator_client):
+            create_single_review(review_client, titles[1]['id'], 'Да', 5)
+        params = {'ordering': '-reviews_count'}
+        if cursor:
+            params['cursor'] = ''
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [title['reviews_count'] for title in results] == [2, 0], (
+            'Проверьте, что произведения сортируются по `reviews_count`.'
+        )
+
+        review_id = create_single_review(
+            admin_client, titles[1]['id'], 'Нет', 1
+        ).json()['id']
+        create_single_comment(user_client, titles[1]['id'], review_id, 'A')
+        params = {'ordering': '-comments_count', 'fields': 'id'}
+        if cursor:
+            params['cursor'] = ''
+        ordered = self.get_reviews(client, titles[1]['id'], params)
+        assert ordered[0] == {'id': review_id}, (
+            'Проверьте, что отзывы сортируются по `comments_count`.'
+        )
+
+    def test_05_check_counters_command(self, admin_client, admin,
+                                       moderator_client, moderator):
+        from reviews.models import Review, Title
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        Title.objects.filter(pk=titles[0]['id']).update(rating_count=7)
+        Review.objects.update(comments_count=5)
+
+        with pytest.raises(CommandError):
+            call_command('check_counters', batch_size=1)
+        call_command('check_counters', fix=True, batch_size=1)
+        call_command('check_counters')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.rating_count == 2, (
+            'Проверьте, что `check_counters --fix` восстанавливает число '
+            'отзывов произведения.'
+        )
+        assert dict(
+            Review.objects.values_list('pk', 'comments_count')
+        ) == {reviews[0]['id']: 2, reviews[1]['id']: 0}, (
+            'Проверьте, что `check_counters --fix` восстанавливает число '
+            'комментариев отзывов.'
+        )
+
+    def test_06_cached_responses_follow_comments(self, client, admin_client,
+                                                 moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            admin_client, title_id, 'Отзыв', 5
+        ).json()
+        urls = (
+            (self.TITLES_URL, lambda data: next(
+                title for title in data['results'] if title['id'] == title_id
+            )),
+            (self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+             lambda data: data),
+        )
+
+        def embedded_counts():
+            return [
+                title(client.get(url, {'include': 'reviews'}).json())[
+                    'reviews'
+                ][0]['comments_count']
+                for url, title in urls
+            ]
+
+        assert embedded_counts() == [0, 0]
+        etag = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )['ETag']
+        comment = create_single_comment(
+            admin_client, title_id, review['id'], 'Комментарий'
+        ).json()
+        assert embedded_counts() == [1, 1], (
+            'Проверьте, что новый комментарий сбрасывает кэш ответов '
+            'произведения со встроенными отзывами.'
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов.'
+        )
+
+        response = moderator_client.post(
+            '/api/v1/moderation/comments/',
+            {'action': 'hide', 'ids': [comment['id']]},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert embedded_counts() == [0, 0], (
+            'Проверьте, что скрытие комментария сбрасывает кэш ответов '
+            'произведения.'
+        )
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+import resource
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from tests.utils import create_comments, create_single_review, create_titles
+
+EXPORT_ROWS = 1_000_000
+EXPORT_AUTHORS = 1000
+# Выгрузка миллиона строк целиком в памяти заняла бы сотни мегабайт.
+EXPORT_MEMORY_CEILING = 64 * 1024 * 1024
+
+
+def current_rss():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Export:
+
+    EXPORT_URL = '/api/v1/export/reviews/'
+
+    def export(self, client, params=None):
+        response = client.get(self.EXPORT_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{self.EXPORT_URL}` '
+            'возвращает статус 200.'
+        )
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        response = client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что выгрузка недоступна анониму.'
+        )
+        for role_client in (user_client, moderator_client):
+            response = role_client.get(self.EXPORT_URL)
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что выгрузка доступна только администратору.'
+            )
+
+    def test_02_ndjson(self, admin_client, admin, moderator_client,
+                       moderator):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        create_single_review(admin_client, titles[1]['id'], 'Другой', 4)
+
+        records = [
+            json.loads(line)
+            for line in self.export(
+                admin_client, {'title': titles[0]['id']}
+            ).splitlines()
+        ]
+        assert [(record['type'], record['id']) for record in records] == [
+            ('review', reviews[0]['id']),
+            ('comment', comments[0]['id']),
+            ('comment', comments[1]['id']),
+            ('review', reviews[1]['id']),
+        ], (
+            'Проверьте, что выгрузка содержит отзывы произведения, и за '
+            'каждым отзывом следуют его комментарии.'
+        )
+        review = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        ).json()
+        assert records[0] == {
+            'type': 'review', 'id': review['id'], 'title': titles[0]['id'],
+            'author': review['author'], 'score': review['score'],
+            'text': review['text'], 'pub_date': review['pub_date'],
+        }, (
+            'Проверьте, что поля отзыва в выгрузке совпадают с API.'
+        )
+        assert records[1]['review'] == reviews[0]['id']
+        assert records[1]['text'] == comments[0]['text']
+
+        everything = self.export(admin_client).splitlines()
+        assert len(everything) == len(records) + 1, (
+            'Проверьте, что без параметров выгружаются все отзывы.'
+        )
+
+    def test_03_csv_by_category(self, admin_client, user_client):
+        titles, categories, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(user_client, title['id'], 'Отзыв', 6)
+
+        response = admin_client.get(
+            self.EXPORT_URL,
+            {'format': 'csv', 'category': categories[0]['slug']},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        in_category = [
+            title['id'] for title in titles
+            if title['category'] == categories[0]['slug']
+        ]
+        assert [int(row['title']) for row in rows] == in_category, (
+            'Проверьте, что параметр `category` ограничивает выгрузку '
+            'произведениями категории.'
+        )
+        assert rows[0]['type'] == 'review'
+        assert rows[0]['score'] == '6'
+
+    def test_04_invalid_params(self, admin_client):
+        response = admin_client.get(self.EXPORT_URL, {'title': 'abc'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный `title` возвращает статус 400.'
+        )
+
+    def test_05_command(self, admin_client, admin, moderator_client,
+                        moderator, tmp_path):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        output = tmp_path / 'reviews.csv'
+        call_command(
+            'export_reviews', format='csv', title=titles[0]['id'],
+            output=str(output), chunk_size=1,
+        )
+        with open(output, encoding='utf-8', newline='') as exported:
+            rows = list(csv.DictReader(exported))
+        assert [row['id'] for row in rows] == [
+            str(reviews[0]['id']), str(comments[0]['id']),
+            str(comments[1]['id']), str(reviews[1]['id']),
+        ], (
+            'Проверьте, что команда `export_reviews` выгружает отзывы и '
+            'комментарии в файл.'
+        )
+
+    def test_06_memory_is_flat(self, admin_client, admin):
+        from reviews.models import Review, Title, User
+
+        title = Title.objects.create(name='Популярное', year=2000)
+        User.objects.bulk_create(
+            User(username=f'author{index}', email=f'a{index}@yamdb.fake')
+            for index in range(EXPORT_AUTHORS)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=5)
+            for author in User.objects.filter(username__startswith='author')
+        )
+        first, last = (
+            Review.objects.order_by(order).values_list('pk', flat=True)[0]
+            for order in ('pk', '-pk')
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'WITH RECURSIVE seq(n) AS ('
+                ' SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s'
+                ') INSERT INTO reviews_comment'
+                ' (text, pub_date, author_id, review_id, is_hidden)'
+                ' SELECT %s, CURRENT_TIMESTAMP, %s, %s + n %% %s, FALSE'
+                ' FROM seq',
+                [EXPORT_ROWS - EXPORT_AUTHORS, 'Комментарий', admin.pk,
+                 first, last - first + 1],
+            )
+
+        response = admin_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        # Пик RSS процесса не убывает, поэтому выгрузка уложилась в
+        # потолок, если пик не превысил прежний пик или текущий RSS
+        # с запасом на потолок.
+        limit = max(peak_rss(), current_rss() + EXPORT_MEMORY_CEILING)
+        lines = sum(
+            chunk.count(b'\n') for chunk in response.streaming_content
+        )
+        assert lines == EXPORT_ROWS, (
+            'Проверьте, что выгрузка содержит все отзывы и комментарии.'
+        )
+        assert peak_rss() <= limit, (
+            f'Выгрузка {EXPORT_ROWS} строк превысила потолок памяти '
+            f'{EXPORT_MEMORY_CEILING} байт: проверьте, что выборка '
+            'читается порциями через iterator().'
+        )
@@ -0,0 +1,217 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (
+    create_comments, create_single_comment, create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Moderation:
+
+    REVIEWS_MODERATION_URL = '/api/v1/moderation/reviews/'
+    COMMENTS_MODERATION_URL = '/api/v1/moderation/comments/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def moderate(self, client, url, data):
+        response = client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос модератора к `{url}` с '
+            'корректными данными возвращает статус 200.'
+        )
+        return response.json()
+
+    def get_title(self, client, title_id):
+        return client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        ).json()
+
+    def get_review_ids(self, client, title_id):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return [review['id'] for review in response.json()['results']]
+
+    def test_01_permissions(self, client, user_client, moderator_client,
+                            admin_client):
+        data = {'action': 'hide', 'author': 'nobody'}
+        for url in (self.REVIEWS_MODERATION_URL,
+                    self.COMMENTS_MODERATION_URL):
+            response = client.post(url, data=data, format='json')
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что `{url}` недоступен анониму.'
+            )
+            response = user_client.post(url, data=data, format='json')
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{url}` недоступен пользователю с ролью '
+                '`user`.'
+            )
+            for staff_client in (moderator_client, admin_client):
+                assert self.moderate(staff_client, url, data) == {
+                    'action': 'hide', 'reviews': 0, 'comments': 0,
+                    'duration_ms': pytest.approx(0, abs=1000),
+                }
+
+    @pytest.mark.parametrize('data', (
+        {'action': 'delete'},
+        {'action': 'purge', 'author': 'spammer'},
+        {'action': 'delete', 'ids': []},
+        {'action': 'hide', 'since': '2024-02-01T00:00:00Z',
+         'until': '2024-01-01T00:00:00Z'},
+    ))
+    def test_02_invalid_data(self, moderator_client, data):
+        response = moderator_client.post(
+            self.REVIEWS_MODERATION_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запрос без выборки или с некорректным действием '
+            'либо периодом возвращает статус 400.'
+        )
+
+    def test_03_delete_by_author(self, client, admin_client, user_client,
+                                 user, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(user_client, title['id'], 'Спам', 1)
+            create_single_review(moderator_client, title['id'], 'Да', 9)
+        spam_review = self.get_review_ids(client, titles[0]['id'])[-1]
+        for _ in range(3):
+            create_single_comment(
+                moderator_client, titles[0]['id'], spam_review, 'Ответ'
+            )
+
+        result = self.moderate(
+            moderator_client, self.REVIEWS_MODERATION_URL,
+            {'action': 'delete', 'author': user.username},
+        )
+        assert (result['reviews'], result['comments']) == (2, 3), (
+            'Проверьте, что ответ содержит число удалённых отзывов и '
+            'комментариев, включая каскадно удалённые.'
+        )
+        assert isinstance(result['duration_ms'], float), (
+            'Проверьте, что ответ содержит время выполнения `duration_ms`.'
+        )
+        for title in titles:
+            data = self.get_title(client, title['id'])
+            assert (data['rating'], data['reviews_count']) == (9, 1), (
+                'Проверьте, что рейтинг произведений пересчитывается после '
+                'массового удаления отзывов.'
+            )
+
+    def test_04_hide_and_unhide_reviews(self, client, admin_client,
+                                        user_client, user,
+                                        moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        spam = create_single_review(user_client, title_id, 'Спам', 1).json()
+        kept = create_single_review(
+            moderator_client, title_id, 'Отзыв', 7
+        ).json()
+        create_single_comment(user_client, title_id, spam['id'], 'Ответ')
+        # Ответы попадают в кэш до модерации.
+        assert self.get_review_ids(client, title_id) == [
+            kept['id'], spam['id'],
+        ]
+        assert self.get_title(client, title_id)['rating'] == 4
+
+        result = self.moderate(
+            moderator_client, self.REVIEWS_MODERATION_URL,
+            {'action': 'hide', 'ids': [spam['id'], kept['id']],
+             'author': user.username},
+        )
+        assert result['reviews'] == 1, (
+            'Проверьте, что условия выборки объединяются через И.'
+        )
+        assert self.get_review_ids(client, title_id) == [kept['id']], (
+            'Проверьте, что скрытый отзыв исключается из списка отзывов.'
+        )
+        detail_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(f'{detail_url}{spam["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=spam['id']
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии скрытого отзыва недоступны.'
+        )
+        title = self.get_title(client, title_id)
+        assert (title['rating'], title['reviews_count']) == (7, 1), (
+            'Проверьте, что скрытый отзыв не учитывается в рейтинге.'
+        )
+        embedded = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            {'include': 'reviews'},
+        ).json()['reviews']
+        assert [review['id'] for review in embedded] == [kept['id']]
+        call_command('check_counters')
+
+        result = self.moderate(
+            admin_client, self.REVIEWS_MODERATION_URL,
+            {'action': 'unhide', 'title': title_id},
+        )
+        assert result['reviews'] == 1, (
+            'Проверьте, что `unhide` затрагивает только скрытые отзывы.'
+        )
+        assert self.get_title(client, title_id)['rating'] == 4
+
+    def test_05_hide_comments_by_period(self, client, admin_client, admin,
+                                        moderator_client, moderator):
+        from reviews.models import Comment
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        first, second = (
+            Comment.objects.get(pk=comment['id']).pub_date
+            for comment in comments
+        )
+        result = self.moderate(
+            moderator_client, self.COMMENTS_MODERATION_URL,
+            {'action': 'hide', 'since': second.isoformat(),
+             'until': second.isoformat()},
+        )
+        assert result == {
+            'action': 'hide', 'reviews': 0, 'comments': 1,
+            'duration_ms': result['duration_ms'],
+        }
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        ))
+        assert [
+            comment['id'] for comment in response.json()['results']
+        ] == [comments[0]['id']], (
+            'Проверьте, что скрытый комментарий исключается из списка.'
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'ordering': 'pub_date'},
+        )
+        assert response.json()['results'][0]['comments_count'] == 1, (
+            'Проверьте, что скрытые комментарии не учитываются в '
+            '`comments_count`.'
+        )
+        call_command('check_counters')
+
+    def test_06_hidden_rows_are_not_exported(self, admin_client, admin,
+                                             moderator_client, moderator):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        self.moderate(
+            moderator_client, self.REVIEWS_MODERATION_URL,
+            {'action': 'hide', 'ids': [reviews[0]['id']]},
+        )
+        response = admin_client.get('/api/v1/export/reviews/')
+        exported = b''.join(response.streaming_content).decode()
+        assert exported.count('\n') == 1, (
+            'Проверьте, что скрытые отзывы и их комментарии не попадают '
+            'в выгрузку.'
+        )
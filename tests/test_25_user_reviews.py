@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25UserReviews:
+
+    USER_REVIEWS_URL_TEMPLATE = '/api/v1/users/{username}/reviews/'
+    MY_REVIEWS_URL = '/api/v1/users/me/reviews/'
+
+    def create_reviews(self, admin_client, review_client):
+        titles, _, _ = create_titles(admin_client)
+        return [
+            create_single_review(
+                review_client, title['id'], f'Отзыв {index}', index + 5
+            ).json()
+            for index, title in enumerate(titles)
+        ], titles
+
+    def test_01_user_feed(self, client, admin_client, user_client, user,
+                          moderator_client):
+        reviews, titles = self.create_reviews(admin_client, user_client)
+        create_single_review(moderator_client, titles[0]['id'], 'Чужой', 3)
+        url = self.USER_REVIEWS_URL_TEMPLATE.format(username=user.username)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{url}` доступен без токена.'
+        )
+        data = response.json()
+        assert set(data) == {'next', 'previous', 'results'}, (
+            f'Проверьте, что `{url}` использует курсорную пагинацию.'
+        )
+        assert [review['id'] for review in data['results']] == [
+            reviews[1]['id'], reviews[0]['id'],
+        ], (
+            'Проверьте, что лента содержит только отзывы пользователя, '
+            'новые первыми.'
+        )
+        assert data['results'][0]['title'] == {
+            'id': titles[1]['id'], 'name': titles[1]['name'],
+            'year': titles[1]['year'],
+        }, (
+            'Проверьте, что отзыв в ленте содержит произведение.'
+        )
+        assert data['results'][0]['author'] == user.username
+
+    def test_02_my_feed(self, client, admin_client, user_client,
+                        moderator_client):
+        reviews, titles = self.create_reviews(admin_client, user_client)
+        create_single_review(moderator_client, titles[0]['id'], 'Чужой', 3)
+        response = client.get(self.MY_REVIEWS_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.get(self.MY_REVIEWS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            review['id'] for review in response.json()['results']
+        ] == [reviews[1]['id'], reviews[0]['id']], (
+            f'Проверьте, что `{self.MY_REVIEWS_URL}` возвращает отзывы '
+            'текущего пользователя.'
+        )
+
+    def test_03_unknown_user(self, client, user):
+        response = client.get(
+            self.USER_REVIEWS_URL_TEMPLATE.format(username='ghost')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что лента несуществующего пользователя возвращает '
+            'статус 404.'
+        )
+        response = client.get(
+            self.USER_REVIEWS_URL_TEMPLATE.format(username=user.username)
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+
+    def test_04_cursor_pages(self, client, user, monkeypatch,
+                             django_assert_num_queries):
+        from api.pagination import KeysetPagination
+        from reviews.models import Review, Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index}', year=2000)
+            for index in range(5)
+        )
+        for title in Title.objects.all():
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=5
+            )
+        monkeypatch.setattr(KeysetPagination, 'page_size', 2)
+        url = self.USER_REVIEWS_URL_TEMPLATE.format(username=user.username)
+        seen = []
+        while url:
+            with django_assert_num_queries(1):
+                data = client.get(url).json()
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        assert seen == list(
+            Review.objects.order_by('-pub_date', 'id').values_list(
+                'pk', flat=True
+            )
+        ), (
+            'Проверьте, что курсорные страницы ленты проходят все отзывы '
+            'пользователя без пропусков и повторов.'
+        )
@@ -0,0 +1,162 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    create_comments, create_single_comment, create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TextSearch:
+
+    REVIEWS_SEARCH_URL = '/api/v1/moderation/reviews/'
+    COMMENTS_SEARCH_URL = '/api/v1/moderation/comments/'
+    REVIEW_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{pk}/'
+
+    def search(self, client, url, params):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос модератора к `{url}` возвращает '
+            'статус 200.'
+        )
+        return response.json()['results']
+
+    def test_01_permissions(self, client, user_client):
+        for url in (self.REVIEWS_SEARCH_URL, self.COMMENTS_SEARCH_URL):
+            response = client.get(url, {'search': 'спам'})
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+            response = user_client.get(url, {'search': 'спам'})
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что поиск `{url}` доступен только модераторам '
+                'и администраторам.'
+            )
+
+    def test_02_search_reviews_with_snippet(self, admin_client, user_client,
+                                            moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        spam = create_single_review(
+            user_client, titles[0]['id'],
+            'Покупайте <b>дешёвые</b> Билеты на сайте', 1,
+        ).json()
+        create_single_review(
+            moderator_client, titles[0]['id'], 'Отличный фильм', 9
+        )
+        results = self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL, {'search': 'билет*'}
+        )
+        assert [review['id'] for review in results] == [spam['id']], (
+            'Проверьте, что поиск по отзывам находит слово по префиксу со '
+            'звёздочкой без учёта регистра.'
+        )
+        assert results[0]['snippet'] == (
+            'Покупайте &lt;b&gt;дешёвые&lt;/b&gt; <mark>Билеты</mark> на '
+            'сайте'
+        ), (
+            'Проверьте, что `snippet` выделяет совпадения тегом <mark> и '
+            'экранирует HTML текста.'
+        )
+        assert results[0]['title'] == titles[0]['id']
+        assert self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL,
+            {'search': 'дешёвые билеты'},
+        )[0]['id'] == spam['id']
+        assert self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL, {'search': 'билет'},
+        ) == [], (
+            'Проверьте, что слово без звёздочки ищется целиком.'
+        )
+        assert self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL,
+            {'search': '"билеты дешёвые"'},
+        ) == [], (
+            'Проверьте, что текст в кавычках ищется как фраза.'
+        )
+        assert self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL,
+            {'search': 'дешёвые фильм'},
+        ) == [], (
+            'Проверьте, что все слова запроса должны встретиться в тексте.'
+        )
+
+    def test_03_filters(self, admin_client, admin, moderator_client,
+                        moderator):
+        from reviews.models import Comment
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        params = {'search': 'comment'}
+        found = self.search(
+            moderator_client, self.COMMENTS_SEARCH_URL, params
+        )
+        assert [comment['id'] for comment in found] == [
+            comments[1]['id'], comments[0]['id'],
+        ]
+        found = self.search(
+            moderator_client, self.COMMENTS_SEARCH_URL,
+            {**params, 'author': admin.username},
+        )
+        assert [comment['id'] for comment in found] == [comments[0]['id']], (
+            'Проверьте, что поиск фильтруется по автору.'
+        )
+        found = self.search(
+            moderator_client, self.COMMENTS_SEARCH_URL,
+            {**params, 'title': titles[1]['id']},
+        )
+        assert found == [], 'Проверьте, что поиск фильтруется по произведению.'
+        second = Comment.objects.get(pk=comments[1]['id']).pub_date
+        found = self.search(
+            moderator_client, self.COMMENTS_SEARCH_URL,
+            {**params, 'since': second.isoformat()},
+        )
+        assert [comment['id'] for comment in found] == [comments[1]['id']], (
+            'Проверьте, что поиск фильтруется по дате.'
+        )
+
+    def test_04_index_follows_writes(self, admin_client, user_client,
+                                     moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Первая версия', 5
+        ).json()
+        create_single_comment(
+            moderator_client, titles[0]['id'], review['id'], 'Ответ'
+        )
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], pk=review['id']
+        )
+        user_client.patch(url, data={'text': 'Вторая версия'})
+        assert self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL, {'search': 'первая'}
+        ) == [], (
+            'Проверьте, что индекс обновляется при изменении текста отзыва.'
+        )
+        assert len(self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL, {'search': 'вторая'}
+        )) == 1
+
+        moderator_client.post(
+            self.REVIEWS_SEARCH_URL,
+            data={'action': 'hide', 'ids': [review['id']]}, format='json',
+        )
+        [hidden] = self.search(
+            moderator_client, self.REVIEWS_SEARCH_URL, {'search': 'вторая'}
+        )
+        assert hidden['is_hidden'] is True, (
+            'Проверьте, что поиск модератора находит и скрытые отзывы.'
+        )
+
+        moderator_client.post(
+            self.REVIEWS_SEARCH_URL,
+            data={'action': 'delete', 'ids': [review['id']]}, format='json',
+        )
+        for search_url, query in ((self.REVIEWS_SEARCH_URL, 'вторая'),
+                                  (self.COMMENTS_SEARCH_URL, 'ответ')):
+            assert self.search(
+                moderator_client, search_url, {'search': query}
+            ) == [], (
+                'Проверьте, что удалённые отзывы и комментарии исчезают из '
+                'индекса.'
+            )
@@ -0,0 +1,198 @@
+import socketserver
+import threading
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма, отклоняет получателей
+    из server.rejected и разрывает соединение на получателях из
+    server.dropped."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            if command == 'EHLO':
+                self.reply('250 localhost')
+            elif command == 'RCPT':
+                address = line.split(':', 1)[1].strip(' <>')
+                if address in self.server.dropped:
+                    return
+                if address in self.server.rejected:
+                    self.reply('550 No such user')
+                    continue
+                recipients.append(address)
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.delivered.extend(recipients)
+                recipients = []
+                self.reply('250 OK')
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.delivered = []
+    server.rejected = set()
+    server.dropped = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, username):
+        data = {'username': username, 'email': f'{username}@yamdb.fake'}
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        return data
+
+    def test_01_signup_only_enqueues(self, client, settings,
+                                     django_user_model):
+        from reviews.confirmation import hash_code
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+        data = self.signup(client, 'queued')
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо во время '
+            'запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        user = django_user_model.objects.get(username=data['username'])
+        assert (email.to, email.sent_at) == (data['email'], None)
+        code = email.body.rsplit(' ', 1)[-1]
+        assert user.confirmation.code_hash == hash_code(user.pk, code), (
+            'Проверьте, что письмо в очереди содержит код подтверждения.'
+        )
+
+        call_command('send_outbox')
+        assert [message.to for message in mail.outbox] == [[data['email']]]
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.send_after is None
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_rejected_signup_enqueues_nothing(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+        data = self.signup(client, 'taken')
+        response = client.post(self.URL_SIGNUP, data={
+            'username': data['username'], 'email': 'other@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert OutgoingEmail.objects.count() == 1
+
+    def test_03_smtp_batch_and_retries(self, client, settings, smtp_server):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+        for username in ('first', 'bounce', 'second'):
+            self.signup(client, username)
+        smtp_server.rejected.add('bounce@yamdb.fake')
+
+        call_command('send_outbox', batch_size=2)
+        assert smtp_server.delivered == [
+            'first@yamdb.fake', 'second@yamdb.fake',
+        ], (
+            'Проверьте, что отказ для одного получателя не мешает отправке '
+            'остальных писем.'
+        )
+        assert smtp_server.connections == 1, (
+            'Проверьте, что пачка писем уходит через одно соединение, '
+            'которое не закрывается после отказа для одного получателя.'
+        )
+        failed = OutgoingEmail.objects.get(to='bounce@yamdb.fake')
+        assert failed.attempts == 1 and '550' in failed.last_error
+        delay = failed.send_after - timezone.now()
+        assert timedelta(seconds=55) < delay <= timedelta(seconds=60), (
+            'Проверьте, что повторная попытка откладывается по '
+            '`EMAIL_OUTBOX_RETRY_DELAYS`.'
+        )
+
+        settings.EMAIL_OUTBOX_RETRY_DELAYS = (60,)
+        OutgoingEmail.objects.filter(pk=failed.pk).update(
+            send_after=timezone.now()
+        )
+        call_command('send_outbox')
+        failed.refresh_from_db()
+        assert (failed.attempts, failed.send_after) == (2, None), (
+            'Проверьте, что письмо без оставшихся попыток покидает очередь.'
+        )
+
+        smtp_server.rejected.clear()
+        OutgoingEmail.objects.filter(pk=failed.pk).update(
+            send_after=timezone.now()
+        )
+        call_command('send_outbox')
+        assert smtp_server.delivered[-1] == 'bounce@yamdb.fake'
+        assert not OutgoingEmail.objects.filter(sent_at=None).exists()
+
+    def test_04_claimed_emails_are_skipped(self, client, settings):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import claim_batch
+
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+        self.signup(client, 'claimed')
+        assert len(claim_batch(10)) == 1
+        call_command('send_outbox')
+        assert mail.outbox == [], (
+            'Проверьте, что письмо, взятое другим обработчиком, не '
+            'отправляется до истечения `EMAIL_OUTBOX_LEASE`.'
+        )
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
+
+    def test_05_reconnect_after_dropped_connection(self, client, settings,
+                                                   smtp_server):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+        for username in ('first', 'dropped', 'second'):
+            self.signup(client, username)
+        smtp_server.dropped.add('dropped@yamdb.fake')
+
+        call_command('send_outbox')
+        assert smtp_server.delivered == [
+            'first@yamdb.fake', 'second@yamdb.fake',
+        ]
+        assert smtp_server.connections == 2, (
+            'Проверьте, что после разрыва соединения следующее письмо '
+            'отправляется через новое соединение.'
+        )
+        failed = OutgoingEmail.objects.get(to='dropped@yamdb.fake')
+        assert failed.attempts == 1 and failed.sent_at is None
@@ -0,0 +1,141 @@
+import multiprocessing
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+def take_tokens(path, count, allowed):
+    from api.throttling import SQLiteBucketStore
+
+    store = SQLiteBucketStore(path)
+    taken = sum(
+        not store.take('shared', 1, 100, 0.001) for _ in range(count)
+    )
+    with allowed.get_lock():
+        allowed.value += taken
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Throttling:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    ME_URL = '/api/v1/users/me/'
+
+    @pytest.fixture
+    def rates(self, settings):
+        def set_rates(**rates):
+            settings.REST_FRAMEWORK = {
+                **settings.REST_FRAMEWORK,
+                'DEFAULT_THROTTLE_RATES': rates,
+            }
+        return set_rates
+
+    def statuses(self, client, url, count, params=None):
+        return [client.get(url, params).status_code for _ in range(count)]
+
+    def test_01_anonymous_reads(self, client, admin_client, rates):
+        titles, _, _ = create_titles(admin_client)
+        rates(anon='3/min')
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert self.statuses(client, url, 4) == [HTTPStatus.OK] * 3 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], (
+            'Проверьте, что анонимные запросы сверх лимита области `anon` '
+            'получают статус 429.'
+        )
+        response = client.get(url)
+        assert 1 <= int(response['Retry-After']) <= 20, (
+            'Проверьте, что ответ 429 сообщает в `Retry-After`, когда '
+            'корзина наполнится для следующего запроса.'
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит анонимов не распространяется на '
+            'пользователей.'
+        )
+
+    def test_02_list_costs_more(self, client, admin_client, rates):
+        create_titles(admin_client)
+        rates(anon='8/min')
+        assert self.statuses(client, self.TITLES_URL, 5) == [
+            HTTPStatus.OK
+        ] * 4 + [HTTPStatus.TOO_MANY_REQUESTS], (
+            'Проверьте, что список списывает больше токенов, чем объект.'
+        )
+        rates(anon='8/min', user_read='8/min')
+        assert self.statuses(
+            admin_client, self.TITLES_URL, 3, {'year': 1}
+        ) == [HTTPStatus.OK] * 2 + [HTTPStatus.TOO_MANY_REQUESTS], (
+            'Проверьте, что список с фильтрами дороже простого списка.'
+        )
+
+    def test_03_scopes_and_users_are_separate(self, user_client,
+                                              moderator_client, rates):
+        rates(user_read='2/min', user_write='1/min')
+        data = {'bio': 'Новое описание'}
+        assert user_client.patch(self.ME_URL, data).status_code == (
+            HTTPStatus.OK
+        )
+        assert user_client.patch(self.ME_URL, data).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        assert self.statuses(user_client, self.ME_URL, 2) == [
+            HTTPStatus.OK
+        ] * 2, (
+            'Проверьте, что запросы на изменение и чтение расходуют '
+            'разные корзины.'
+        )
+        assert moderator_client.patch(self.ME_URL, data).status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что у каждого пользователя своя корзина.'
+
+    def test_04_auth_endpoints(self, client, rates):
+        rates(anon='100/min', auth='2/min')
+        response = client.post(self.URL_SIGNUP, {
+            'username': 'first', 'email': 'first@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.OK
+        response = client.post(self.URL_TOKEN, {
+            'username': 'first', 'confirmation_code': '00000',
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_SIGNUP, {
+            'username': 'second', 'email': 'second@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация и получение токена расходуют общую '
+            'корзину области `auth`.'
+        )
+
+    def test_05_sqlite_store_is_shared(self, tmp_path):
+        from api.throttling import SQLiteBucketStore
+
+        path = str(tmp_path / 'throttle.sqlite3')
+        first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+        assert first.take('key', 2, 3, 1) == 0
+        assert second.take('key', 2, 3, 1) == pytest.approx(1, abs=0.01), (
+            'Проверьте, что хранилище возвращает время до накопления '
+            'недостающих токенов.'
+        )
+        second.clear()
+        assert first.take('key', 3, 3, 1) == 0
+
+        allowed = multiprocessing.Value('i', 0)
+        workers = [
+            multiprocessing.Process(
+                target=take_tokens, args=(path, 60, allowed)
+            )
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert allowed.value == 100, (
+            'Проверьте, что списание токенов атомарно для нескольких '
+            'процессов.'
+        )
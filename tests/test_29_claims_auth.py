@@ -0,0 +1,150 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ClaimsAuth:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def claims_client(self, user):
+        from reviews.confirmation import store_code
+
+        store_code(user, '13579')
+        response = APIClient().post(self.URL_TOKEN, {
+            'username': user.username, 'confirmation_code': '13579',
+        })
+        assert response.status_code == HTTPStatus.OK
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        return client
+
+    def user_queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        return response, [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "reviews_user"' in query['sql']
+        ]
+
+    def test_01_claims_skip_user_lookup(self, admin, admin_client):
+        client = self.claims_client(admin)
+        response, user_queries = self.user_queries(
+            client, self.CATEGORIES_URL
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_queries == [], (
+            'Проверьте, что токен с claims аутентифицирует запрос без '
+            'чтения пользователя из базы.'
+        )
+        titles, _, _ = create_titles(client)
+        review = create_single_review(
+            client, titles[0]['id'], 'Отзыв', 7
+        ).json()
+        assert review['author'] == admin.username
+
+        response = client.get(self.ME_URL)
+        assert response.json()['bio'] == admin.bio, (
+            'Проверьте, что `/users/me/` возвращает все поля пользователя.'
+        )
+        client.patch(self.ME_URL, {'first_name': 'Админ'})
+        admin.refresh_from_db()
+        assert (admin.first_name, admin.email, admin.role) == (
+            'Админ', 'testadmin@yamdb.fake', 'admin'
+        ), (
+            'Проверьте, что изменение `/users/me/` не затирает поля, '
+            'которых нет в токене.'
+        )
+
+    def test_02_role_downgrade_revokes_claims(self, admin_client,
+                                              django_user_model):
+        demoted = django_user_model.objects.create_user(
+            username='demoted', email='demoted@yamdb.fake', role='admin'
+        )
+        client = self.claims_client(demoted)
+        assert client.get(self.USERS_URL).status_code == HTTPStatus.OK
+        response = admin_client.patch(
+            f'{self.USERS_URL}{demoted.username}/', {'role': 'user'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что после понижения роли выданный ранее токен '
+            'больше не даёт прав администратора.'
+        )
+        assert client.get(self.ME_URL).json()['role'] == 'user'
+
+        admin_client.delete(f'{self.USERS_URL}{demoted.username}/')
+        assert client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен удалённого пользователя отклоняется.'
+
+    def test_03_bio_change_keeps_claims(self, user, admin_client):
+        client = self.claims_client(user)
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', {'bio': 'Новая биография'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        _, user_queries = self.user_queries(client, self.CATEGORIES_URL)
+        assert user_queries == [], (
+            'Проверьте, что изменение полей, не влияющих на права, не '
+            'отзывает claims токена.'
+        )
+        assert client.get(self.ME_URL).json()['bio'] == 'Новая биография'
+
+    def test_04_principal_cache(self, user_client, user, admin_client):
+        _, first = self.user_queries(user_client, self.CATEGORIES_URL)
+        _, second = self.user_queries(user_client, self.CATEGORIES_URL)
+        assert (len(first), second) == (1, []), (
+            'Проверьте, что пользователь токена без claims читается из '
+            'базы один раз и дальше берётся из кэша процесса.'
+        )
+        user_client.patch(self.ME_URL, {'bio': 'Обновлено'})
+        assert user_client.get(self.ME_URL).json()['bio'] == 'Обновлено', (
+            'Проверьте, что `/users/me/` не отдаёт поля из кэша.'
+        )
+        admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', {'role': 'moderator'}
+        )
+        _, after = self.user_queries(user_client, self.CATEGORIES_URL)
+        assert len(after) == 1, (
+            'Проверьте, что смена роли вытесняет пользователя из кэша.'
+        )
+
+    def test_05_stale_claims_expire_without_shared_cache(
+        self, settings, monkeypatch, django_user_model
+    ):
+        from api import authentication
+
+        admin = django_user_model.objects.create_user(
+            username='elsewhere', email='elsewhere@yamdb.fake', role='admin'
+        )
+        client = self.claims_client(admin)
+        assert client.get(self.USERS_URL).status_code == HTTPStatus.OK
+        # UPDATE без сигналов: так роль меняет другой процесс, чей
+        # LocMemCache не разделяет версии прав с этим.
+        django_user_model.objects.filter(pk=admin.pk).update(role='user')
+        issued = time.time()
+        monkeypatch.setattr(authentication.time, 'time', lambda: (
+            issued + settings.AUTH_PRINCIPAL_CACHE_TIMEOUT + 1
+        ))
+        assert client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что без общего кэша claims токена старше '
+            '`AUTH_PRINCIPAL_CACHE_TIMEOUT` не принимаются без чтения '
+            'пользователя из базы.'
+        )
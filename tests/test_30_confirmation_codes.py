@@ -0,0 +1,110 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def signup(self, client, username):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(self.URL_SIGNUP, data={
+                'username': username, 'email': f'{username}@yamdb.fake',
+            })
+        assert response.status_code == HTTPStatus.OK
+        return mail.outbox[-1].body.rsplit(' ', 1)[-1], queries
+
+    def get_token(self, client, username, code):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(self.URL_TOKEN, data={
+                'username': username, 'confirmation_code': code,
+            })
+        return response.status_code, queries
+
+    def user_writes(self, queries):
+        return [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('UPDATE "reviews_user"',
+                                        'INSERT INTO "reviews_user"'))
+        ]
+
+    def test_01_codes_are_hashed_and_single_use(self, client,
+                                                django_user_model):
+        code, queries = self.signup(client, 'hashed')
+        assert len(self.user_writes(queries)) == 1
+        user = django_user_model.objects.get(username='hashed')
+        assert code not in user.confirmation.code_hash, (
+            'Проверьте, что код подтверждения хранится только в виде хэша.'
+        )
+        repeated, queries = self.signup(client, 'hashed')
+        assert self.user_writes(queries) == [], (
+            'Проверьте, что повторная регистрация не изменяет строку '
+            'пользователя.'
+        )
+        assert self.get_token(client, 'hashed', code)[0] == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что новый код заменяет выданный ранее.'
+
+        status, queries = self.get_token(client, 'hashed', repeated)
+        assert status == HTTPStatus.OK
+        assert self.user_writes(queries) == [], (
+            'Проверьте, что получение токена не изменяет строку '
+            'пользователя.'
+        )
+        assert self.get_token(client, 'hashed', repeated)[0] == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код подтверждения действует один раз.'
+
+    def test_02_attempts_are_limited(self, client, settings):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 3
+        code, _ = self.signup(client, 'guesser')
+        wrong = '00000' if code != '00000' else '11111'
+        for _ in range(2):
+            assert self.get_token(client, 'guesser', wrong)[0] == (
+                HTTPStatus.BAD_REQUEST
+            )
+        assert self.get_token(client, 'guesser', code)[0] == HTTPStatus.OK
+
+        code, _ = self.signup(client, 'guesser')
+        for _ in range(3):
+            self.get_token(client, 'guesser', wrong)
+        assert self.get_token(client, 'guesser', code)[0] == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что после `CONFIRMATION_CODE_MAX_ATTEMPTS` неверных '
+            'попыток код перестаёт действовать.'
+        )
+
+    def test_03_expired_codes(self, client):
+        from reviews.models import ConfirmationCode
+
+        codes = {
+            username: self.signup(client, username)[0]
+            for username in ('late0', 'late1', 'late2', 'late3', 'fresh')
+        }
+        ConfirmationCode.objects.exclude(user__username='fresh').update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert self.get_token(client, 'late0', codes['late0'])[0] == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что истёкший код не принимается.'
+
+        call_command('purge_confirmation_codes', batch_size=3)
+        assert list(ConfirmationCode.objects.values_list(
+            'user__username', flat=True
+        )) == ['fresh'], (
+            'Проверьте, что команда `purge_confirmation_codes` удаляет все '
+            'истёкшие коды.'
+        )
+        assert self.get_token(client, 'fresh', codes['fresh'])[0] == (
+            HTTPStatus.OK
+        )
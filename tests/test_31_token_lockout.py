@@ -0,0 +1,120 @@
+import time
+import warnings
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache.backends.base import CacheKeyWarning
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31TokenLockout:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture(autouse=True)
+    def lockout(self, settings, monkeypatch):
+        from api import lockout
+
+        settings.AUTH_LOCKOUT_FAILURES = {'username': 3, 'ip': 5}
+        settings.AUTH_LOCKOUT_BASE_DELAY = 10
+        self.now = time.time()
+        monkeypatch.setattr(
+            lockout, 'time', SimpleNamespace(time=lambda: self.now)
+        )
+
+    def post(self, username, code, ip='10.0.0.1', **extra):
+        return APIClient(REMOTE_ADDR=ip, **extra).post(self.URL_TOKEN, {
+            'username': username, 'confirmation_code': code,
+        })
+
+    def test_01_username_lockout(self, user):
+        from reviews.confirmation import store_code
+
+        store_code(user, '13579')
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            assert self.post(user.username, '00000', ip).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(user.username, '13579', '10.0.0.4')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что после `AUTH_LOCKOUT_FAILURES` неверных кодов '
+            'для пользователя запросы с любого адреса получают статус 429.'
+        )
+        assert response['Retry-After'] == '10'
+        assert queries.captured_queries == [], (
+            'Проверьте, что заблокированная попытка отклоняется без '
+            'обращения к базе.'
+        )
+        assert self.post('other', '00000', '10.0.0.4').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+        self.now += 11
+        assert self.post(user.username, '00000').status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert self.post(user.username, '13579')['Retry-After'] == '20', (
+            'Проверьте, что каждая неверная попытка после порога удваивает '
+            'блокировку.'
+        )
+
+        self.now += 21
+        assert self.post(user.username, '13579').status_code == HTTPStatus.OK
+        store_code(user, '13579')
+        for _ in range(2):
+            self.post(user.username, '00000', '10.0.0.2')
+        assert self.post(user.username, '13579', '10.0.0.2').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что верный код сбрасывает счётчик пользователя.'
+
+    def test_02_ip_lockout(self, user):
+        from reviews.confirmation import store_code
+
+        store_code(user, '13579')
+        for index in range(5):
+            assert self.post(f'ghost{index}', '00000').status_code == (
+                HTTPStatus.NOT_FOUND
+            )
+        assert self.post(user.username, '13579').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), (
+            'Проверьте, что перебор имён с одного адреса блокирует этот '
+            'адрес.'
+        )
+        assert self.post(user.username, '13579', '10.0.0.9').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что блокировка адреса не затрагивает другие адреса.'
+
+    def test_03_forwarded_for_is_ignored(self):
+        for index in range(5):
+            self.post(
+                f'ghost{index}', '00000',
+                HTTP_X_FORWARDED_FOR=f'192.0.2.{index}',
+            )
+        response = self.post(
+            'ghost', '00000', HTTP_X_FORWARDED_FOR='192.0.2.99'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подменённый клиентом `X-Forwarded-For` не '
+            'сбрасывает счётчик неверных попыток адреса.'
+        )
+
+    def test_04_any_username_makes_valid_key(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', CacheKeyWarning)
+            for username in ('два слова', 'x\n' * 200):
+                assert self.post(username, '00000').status_code == (
+                    HTTPStatus.BAD_REQUEST
+                )
+        assert not [
+            warning for warning in caught
+            if issubclass(warning.category, CacheKeyWarning)
+        ], (
+            'Проверьте, что присланное имя пользователя не попадает в ключ '
+            'кэша как есть.'
+        )